@@ -0,0 +1,29 @@
+"""
+Admin access control for operational endpoints
+
+Admin endpoints are disabled unless ADMIN_TOKEN is set; callers must send
+the token in the X-Admin-Token header.
+"""
+
+import hmac
+import os
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+
+
+def is_admin(token: Optional[str]) -> bool:
+    """Check a presented token against ADMIN_TOKEN"""
+    if not ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """FastAPI dependency guarding admin endpoints"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_TOKEN not set)")
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
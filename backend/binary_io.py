@@ -0,0 +1,156 @@
+"""
+Binary batch formats: Apache Arrow IPC streams and raw .npy buffers
+
+Request columns are read straight from the received buffer; numeric
+columns are zero-copy views and string columns are encoded to small
+integer codes inside Arrow, so no per-row Python objects are created.
+"""
+
+import io
+from typing import Dict, Optional
+
+import numpy as np
+
+from backend.features import PASSENGER_FIELDS, TEXT_FIELDS
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+ARROW_STREAM = 'application/vnd.apache.arrow.stream'
+NPY = 'application/x-npy'
+BINARY_MEDIA_TYPES = {ARROW_STREAM, NPY}
+
+# String categories, encoded to their index (sex: 1 == male)
+SEX_CATEGORIES = ['FEMALE', 'MALE']
+EMBARKED_CATEGORIES = ['C', 'Q', 'S']
+
+
+class BinaryFormatError(ValueError):
+    """Raised when a binary batch body cannot be decoded"""
+
+
+def media_type(content_type: Optional[str]) -> str:
+    """Strip parameters from a Content-Type / Accept value"""
+    return (content_type or '').split(';')[0].strip().lower()
+
+
+def _is_arrow_numeric(arrow_type) -> bool:
+    return pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type) or pa.types.is_null(arrow_type)
+
+
+def _arrow_codes(field, column, categories) -> np.ndarray:
+    """Encode a string column to category indices (-1 when unknown)"""
+    if pa.types.is_dictionary(column.type):
+        column = column.cast(column.type.value_type)
+    if not (pa.types.is_string(column.type) or pa.types.is_large_string(column.type)):
+        if not _is_arrow_numeric(column.type):
+            raise BinaryFormatError(f"Column '{field}' must be strings or integer codes, got {column.type}")
+        return _arrow_numpy(column)
+    codes = pc.index_in(pc.utf8_upper(column), value_set=pa.array(categories))
+    return _arrow_numpy(codes.fill_null(-1))
+
+
+def _arrow_numpy(column) -> np.ndarray:
+    """View a (chunked) Arrow column as NumPy, zero-copy when it has no nulls"""
+    if isinstance(column, pa.ChunkedArray):
+        column = column.combine_chunks() if column.num_chunks != 1 else column.chunk(0)
+    if column.null_count:
+        column = column.cast(pa.float64())
+    return column.to_numpy(zero_copy_only=False)
+
+
+def read_arrow(body: bytes) -> Dict[str, np.ndarray]:
+    """Decode an Arrow IPC stream into passenger columns (plus ``name``/``cabin`` when sent)"""
+    if not HAS_PYARROW:
+        raise BinaryFormatError("pyarrow is not installed on the server")
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    except pa.ArrowInvalid as e:
+        raise BinaryFormatError(f"Invalid Arrow IPC stream: {e}")
+
+    missing = [field for field in PASSENGER_FIELDS if field not in table.column_names]
+    if missing:
+        raise BinaryFormatError(f"Missing columns: {missing}")
+
+    columns = {}
+    for field in PASSENGER_FIELDS:
+        if field in ('sex', 'embarked'):
+            continue
+        column = table.column(field)
+        if not _is_arrow_numeric(column.type):
+            raise BinaryFormatError(f"Column '{field}' must be integer or floating point, got {column.type}")
+        columns[field] = _arrow_numpy(column)
+    columns['sex'] = _arrow_codes('sex', table.column('sex'), SEX_CATEGORIES)
+    columns['embarked'] = _arrow_codes('embarked', table.column('embarked'), EMBARKED_CATEGORIES)
+    for field in TEXT_FIELDS:
+        if field in table.column_names:
+            try:
+                columns[field] = table.column(field).cast(pa.string()).to_pylist()
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+                raise BinaryFormatError(f"Column '{field}' must be strings: {e}")
+    return columns
+
+
+def read_npy(body: bytes) -> Dict[str, np.ndarray]:
+    """
+    Decode a ``.npy`` buffer into passenger columns without copying
+
+    Accepts a structured array with one field per passenger column (and
+    optional fixed-width string ``name``/``cabin`` fields), or a 2-D
+    numeric array with columns in ``PASSENGER_FIELDS`` order and sex /
+    embarked already encoded (sex_male 0/1, embarked 0=C, 1=Q, 2=S).
+    """
+    stream = io.BytesIO(body)
+    try:
+        version = np.lib.format.read_magic(stream)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+    except ValueError as e:
+        raise BinaryFormatError(f"Invalid .npy buffer: {e}")
+
+    if dtype.hasobject:
+        raise BinaryFormatError("Object arrays are not accepted")
+
+    count = int(np.prod(shape))
+    try:
+        array = np.frombuffer(body, dtype=dtype, count=count, offset=stream.tell())
+    except ValueError as e:
+        raise BinaryFormatError(f"Truncated .npy buffer: {e}")
+    array = array.reshape(shape, order='F' if fortran_order else 'C')
+
+    if dtype.names is not None:
+        missing = [field for field in PASSENGER_FIELDS if field not in dtype.names]
+        if missing:
+            raise BinaryFormatError(f"Missing fields: {missing}")
+        return {field: array[field] for field in PASSENGER_FIELDS + TEXT_FIELDS if field in dtype.names}
+
+    if array.ndim != 2 or array.shape[1] != len(PASSENGER_FIELDS):
+        raise BinaryFormatError(
+            f"Expected a structured array or shape (n, {len(PASSENGER_FIELDS)}), got {array.shape}"
+        )
+    return {field: array[:, i] for i, field in enumerate(PASSENGER_FIELDS)}
+
+
+def write_arrow(survived: np.ndarray, survival_prob: np.ndarray) -> bytes:
+    """Encode results as an Arrow IPC stream"""
+    table = pa.table({
+        'survived': pa.array(survived.astype(np.int8)),
+        'survival_probability': pa.array(survival_prob.astype(np.float32))
+    })
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def write_npy(survival_prob: np.ndarray) -> bytes:
+    """Encode survival probabilities as a float32 ``.npy`` buffer"""
+    buffer = io.BytesIO()
+    np.save(buffer, survival_prob.astype(np.float32), allow_pickle=False)
+    return buffer.getvalue()
@@ -0,0 +1,74 @@
+"""
+Serving-time model tuning: in-process ensembles and per-call thread limits
+
+Trained models keep their training settings (``n_jobs=-1``), so every
+prediction would fan out over all cores: RandomForest dispatches trees
+through joblib threads, XGBoost and LightGBM start OpenMP teams sized to
+the machine. For request-sized batches that coordination costs more than
+the inference. ``prepare_for_serving`` caps each model at the worker's
+thread budget (see ``backend.resources``) and swaps soft-voting
+ensembles for ``ServingEnsemble``.
+"""
+
+from typing import Dict
+
+import numpy as np
+
+from backend.resources import plan_resources
+
+DEFAULT_SERVING_THREADS = 1
+
+
+def limit_threads(model, threads: int):
+    """Cap a fitted model's prediction parallelism in place"""
+    name = type(model).__name__
+    if name in ('XGBClassifier', 'LGBMClassifier', 'RandomForestClassifier', 'ExtraTreesClassifier'):
+        model.set_params(n_jobs=threads)
+    return model
+
+
+class ServingEnsemble:
+    """
+    Soft-voting ensemble evaluated member by member in the calling thread
+
+    Member probabilities are written into one preallocated
+    (members, rows, classes) array and combined with a single weighted
+    ``tensordot``, matching ``VotingClassifier.predict_proba``.
+    """
+
+    voting = 'soft'
+
+    def __init__(self, voting_classifier, threads: int = DEFAULT_SERVING_THREADS):
+        if voting_classifier.voting != 'soft':
+            raise ValueError("ServingEnsemble replaces soft-voting ensembles only")
+        self.estimators_ = [limit_threads(est, threads) for est in voting_classifier.estimators_]
+        self.named_estimators_ = dict(zip(
+            (name for name, _ in voting_classifier.estimators), self.estimators_
+        ))
+        self.classes_ = voting_classifier.classes_
+        weights = voting_classifier.weights
+        weights = np.ones(len(self.estimators_)) if weights is None else np.asarray(weights, dtype=np.float64)
+        self.weights = weights / weights.sum()
+        self.n_features_in_ = getattr(voting_classifier, 'n_features_in_', None)
+        self.threads = threads
+
+    def predict_proba(self, X) -> np.ndarray:
+        probas = np.empty((len(self.estimators_), len(X), len(self.classes_)))
+        for i, estimator in enumerate(self.estimators_):
+            probas[i] = estimator.predict_proba(X)
+        return np.tensordot(self.weights, probas, axes=1)
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def prepare_for_serving(models: Dict, threads: int = None) -> Dict:
+    """Thread-limited serving versions of every model (soft ensembles replaced)"""
+    threads = plan_resources()["model_threads"] if threads is None else threads
+    prepared = {}
+    for name, model in models.items():
+        if type(model).__name__ == 'VotingClassifier' and getattr(model, 'voting', None) == 'soft':
+            prepared[name] = ServingEnsemble(model, threads)
+        else:
+            prepared[name] = limit_threads(model, threads)
+    return prepared
@@ -0,0 +1,133 @@
+"""
+Per-passenger feature contributions for the served model
+
+Contributions are TreeSHAP values in the model's margin (log-odds) space,
+computed for a whole feature matrix at once and cached per input row.
+"""
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    import shap
+    HAS_SHAP = True
+except ImportError:
+    HAS_SHAP = False
+
+# sklearn tree models explained through shap.TreeExplainer
+SHAP_TREE_MODELS = {
+    'RandomForestClassifier',
+    'ExtraTreesClassifier',
+    'DecisionTreeClassifier',
+    'GradientBoostingClassifier',
+}
+
+
+class ContributionExplainer:
+    """Vectorized, cached per-row feature contributions"""
+
+    def __init__(self, model, feature_names: List[str], cache_size: int = 4096):
+        self.model = model
+        self.feature_names = list(feature_names)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = Lock()
+        self._compute = self._select_backend(model)
+
+    @property
+    def supported(self) -> bool:
+        return self._compute is not None
+
+    def _select_backend(self, model):
+        """Pick the cheapest exact contribution method for the model type"""
+        name = type(model).__name__
+
+        if name == 'XGBClassifier':
+            import xgboost as xgb
+            booster = model.get_booster()
+            # Native TreeSHAP; last column is the bias term
+            return lambda X: booster.predict(xgb.DMatrix(X), pred_contribs=True)[:, :-1]
+
+        if name == 'LGBMClassifier':
+            return lambda X: np.asarray(model.predict(X, pred_contrib=True))[:, :-1]
+
+        if name == 'CompactForestClassifier':
+            # Path (Saabas) contributions from the flattened trees
+            return model.contributions
+
+        if name == 'LogisticRegression':
+            # Exact linear SHAP: features are standardized, so E[x] == 0
+            coef = model.coef_[0]
+            return lambda X: X * coef
+
+        if name in ('VotingClassifier', 'ServingEnsemble') and getattr(model, 'voting', None) == 'soft':
+            members = [self._select_backend(est) for est in model.estimators_]
+            if any(member is None for member in members):
+                return None
+            weights = np.asarray(model.weights if model.weights is not None
+                                 else np.ones(len(members)), dtype=np.float64)
+            weights = weights / weights.sum()
+
+            # Weighted mean of member contributions; members mix log-odds and
+            # probability units, so this ranks features rather than summing
+            # exactly to the ensemble output.
+            def compute(X):
+                stacked = np.stack([member(X) for member in members])
+                return np.tensordot(weights, stacked, axes=1)
+            return compute
+
+        if HAS_SHAP and name in SHAP_TREE_MODELS:
+            explainer = shap.TreeExplainer(model)
+
+            def compute(X):
+                values = explainer.shap_values(X, check_additivity=False)
+                if isinstance(values, list):
+                    values = values[1]
+                elif values.ndim == 3:
+                    values = values[:, :, 1]
+                return values
+            return compute
+
+        return None
+
+    def explain(self, X: np.ndarray) -> Optional[np.ndarray]:
+        """Return contributions for every row of ``X``, shape (n_rows, n_features)"""
+        if self._compute is None:
+            return None
+
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        keys = [row.tobytes() for row in X]
+        result = np.empty(X.shape, dtype=np.float64)
+
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is None:
+                    missing.append(i)
+                else:
+                    self._cache.move_to_end(key)
+                    result[i] = cached
+
+        if missing:
+            computed = np.asarray(self._compute(X[missing]), dtype=np.float64)
+            result[missing] = computed
+            with self._lock:
+                for i, row in zip(missing, computed):
+                    self._cache[keys[i]] = row
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return result
+
+    def top_contributions(self, contributions: np.ndarray, k: int = 5) -> Dict[str, float]:
+        """Largest-magnitude contributions of a single row, in descending order"""
+        order = np.argsort(np.abs(contributions))[::-1][:k]
+        return {self.feature_names[i]: float(contributions[i]) for i in order}
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
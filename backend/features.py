@@ -0,0 +1,262 @@
+"""
+Vectorized feature construction and validation for batch scoring
+
+Works on one array per passenger field so large batches never
+materialize a Python object per row.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Serving feature layout, matching emergency training
+FEATURE_NAMES = ['Pclass', 'Age', 'Fare', 'FamilySize', 'IsAlone',
+                 'Sex_male', 'Embarked_Q', 'Embarked_S']
+
+PASSENGER_FIELDS = ['pclass', 'sex', 'age', 'sibsp', 'parch', 'fare', 'embarked']
+
+# Optional free-text fields; TitanicModelTrainer artifacts derive title and cabin deck from them
+TEXT_FIELDS = ['name', 'cabin']
+
+# Offending row indices reported per field
+MAX_REPORTED_ROWS = 100
+
+
+class ColumnValidationError(ValueError):
+    """Raised when one or more rows of a columnar batch are invalid"""
+
+    def __init__(self, errors: List[Dict]):
+        super().__init__(f"{len(errors)} invalid field(s)")
+        self.errors = errors
+
+
+def build_features(pclass, age, fare, sibsp, parch, sex_male, embarked_q, embarked_s) -> np.ndarray:
+    """Assemble the raw (unscaled) feature matrix from per-field arrays"""
+    n = len(pclass)
+    family_size = np.add(sibsp, parch) + 1
+
+    features = np.empty((n, len(FEATURE_NAMES)), dtype=np.float64)
+    features[:, 0] = pclass
+    features[:, 1] = age
+    features[:, 2] = fare
+    features[:, 3] = family_size
+    features[:, 4] = family_size == 1
+    features[:, 5] = sex_male
+    features[:, 6] = embarked_q
+    features[:, 7] = embarked_s
+    return features
+
+
+def synthetic_columns(n: int, seed: int = 0) -> Dict[str, np.ndarray]:
+    """Random but valid passenger columns, for warmup and benchmarks"""
+    rng = np.random.default_rng(seed)
+    embarked = rng.integers(0, 3, n)
+    return {
+        "pclass": rng.integers(1, 4, n),
+        "age": rng.uniform(0, 80, n),
+        "fare": rng.uniform(0, 300, n),
+        "sibsp": rng.integers(0, 4, n),
+        "parch": rng.integers(0, 3, n),
+        "sex_male": rng.integers(0, 2, n).astype(bool),
+        "embarked_q": embarked == 1,
+        "embarked_s": embarked == 2
+    }
+
+
+def synthetic_features(n: int, seed: int = 0) -> np.ndarray:
+    """Random but valid raw feature rows in the serving layout"""
+    return build_features(**synthetic_columns(n, seed))
+
+
+def passenger_frame(columns: Dict[str, np.ndarray], names=None, cabins=None) -> pd.DataFrame:
+    """
+    Rebuild Kaggle-format rows from validated columns
+
+    Used for models trained by ``TitanicModelTrainer``, whose feature
+    pipeline (titles, cabin deck, bins) runs on a DataFrame.
+    """
+    n = len(columns['pclass'])
+    embarked = np.where(columns['embarked_q'], 'Q', np.where(columns['embarked_s'], 'S', 'C'))
+    return pd.DataFrame({
+        'Pclass': columns['pclass'],
+        'Name': names if names is not None else ['Unknown'] * n,
+        'Sex': np.where(columns['sex_male'], 'male', 'female'),
+        'Age': columns['age'],
+        'SibSp': columns['sibsp'],
+        'Parch': columns['parch'],
+        'Fare': columns['fare'],
+        'Cabin': cabins if cabins is not None else [None] * n,
+        'Embarked': embarked
+    })
+
+
+def text_columns(columns: Dict) -> Tuple[Optional[list], Optional[list]]:
+    """
+    The optional ``name`` and ``cabin`` columns of a raw batch as lists
+
+    Either is None when the batch does not have it. Missing entries (null,
+    NaN or empty) become 'Unknown' names and None cabins, as for
+    single-passenger requests.
+    """
+    def values(field, default):
+        column = columns.get(field)
+        if column is None:
+            return None
+        column = column.tolist() if isinstance(column, np.ndarray) else list(column)
+        # Fixed-width bytes ('S' fields of a structured .npy) decode like strings
+        column = [value.decode('utf-8', 'replace') if isinstance(value, bytes) else value for value in column]
+        return [value if isinstance(value, str) and value else default for value in column]
+    return values('name', 'Unknown'), values('cabin', None)
+
+
+def trainer_features(trainer, columns: Dict[str, np.ndarray], names=None, cabins=None) -> np.ndarray:
+    """
+    Scaled feature matrix for a trainer artifact's feature layout
+
+    Emergency-layout artifacts take the vectorized NumPy path; artifacts
+    from TitanicModelTrainer run its own feature pipeline.
+    """
+    if list(trainer.feature_names) == FEATURE_NAMES:
+        return trainer.scaler.transform(build_features(**columns))
+    return trainer.prepare_data(passenger_frame(columns, names, cabins), is_training=False)
+
+
+def sweep_columns(base: Dict, axes: Sequence[Tuple[str, Sequence]]) -> Dict[str, np.ndarray]:
+    """
+    Raw passenger columns for every combination of axis values
+
+    ``base`` holds one value per passenger field; each axis replaces one
+    field with a list of values. Rows are in C order over the axes (the
+    last axis varies fastest), so results reshape to the grid shape.
+    """
+    shape = tuple(len(values) for _, values in axes)
+    grids = np.meshgrid(*[np.arange(size) for size in shape], indexing='ij')
+    n = int(np.prod(shape))
+
+    columns = {field: np.full(n, base[field]) for field in PASSENGER_FIELDS}
+    for (field, values), grid in zip(axes, grids):
+        columns[field] = np.asarray(values)[grid.ravel()]
+    return columns
+
+
+def _report(errors, field, invalid, message):
+    rows = np.flatnonzero(invalid)
+    if len(rows):
+        errors.append({
+            "field": field,
+            "message": message,
+            "count": int(len(rows)),
+            "rows": rows[:MAX_REPORTED_ROWS].tolist()
+        })
+
+
+def _numeric(errors, field, values, dtype=None) -> Optional[np.ndarray]:
+    """
+    A numeric field as an array; None after reporting the rows that are not numbers
+
+    Nulls in object arrays (JSON ``null``) become NaN and fail the range
+    checks instead.
+    """
+    array = np.asarray(values)
+    if array.dtype.kind == 'O':
+        invalid = np.array([
+            value is not None and (isinstance(value, bool) or not isinstance(value, (int, float, np.number)))
+            for value in array
+        ], dtype=bool)
+        if not invalid.any():
+            array = array.astype(np.float64)
+    else:
+        invalid = np.full(len(array), array.dtype.kind not in 'biuf')
+    if invalid.any():
+        _report(errors, field, invalid, f'{field} must be numeric')
+        return None
+    return array if dtype is None else array.astype(dtype, copy=False)
+
+
+def validate_columns(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Validate a columnar batch in one pass per field
+
+    ``sex`` and ``embarked`` may be strings (any case) or already encoded:
+    ``sex_male`` (0/1) and ``embarked`` as 0=C, 1=Q, 2=S. Optional
+    ``name``/``cabin`` columns only need the batch length (see
+    ``text_columns``).
+
+    Returns the numeric arrays needed by ``build_features``; raises
+    ``ColumnValidationError`` listing offending row indices per field.
+    """
+    errors = []
+
+    lengths = {field: len(values) for field, values in columns.items() if values is not None}
+    if len(set(lengths.values())) > 1:
+        raise ColumnValidationError([{
+            "field": "*",
+            "message": f"All columns must have the same length, got {lengths}",
+            "count": 0,
+            "rows": []
+        }])
+
+    pclass = _numeric(errors, 'pclass', columns['pclass'])
+    age = _numeric(errors, 'age', columns['age'], np.float64)
+    sibsp = _numeric(errors, 'sibsp', columns['sibsp'])
+    parch = _numeric(errors, 'parch', columns['parch'])
+    fare = _numeric(errors, 'fare', columns['fare'], np.float64)
+
+    # Range checks only for fields that are numeric at all
+    if pclass is not None:
+        _report(errors, 'pclass', (pclass < 1) | (pclass > 3) | (pclass != np.round(pclass)),
+                'Passenger class must be 1, 2, or 3')
+    if age is not None:
+        _report(errors, 'age', ~((age >= 0) & (age <= 100)), 'Age must be between 0 and 100')
+    if sibsp is not None:
+        _report(errors, 'sibsp', ~(sibsp >= 0), 'sibsp must be >= 0')
+    if parch is not None:
+        _report(errors, 'parch', ~(parch >= 0), 'parch must be >= 0')
+    if fare is not None:
+        _report(errors, 'fare', ~(fare >= 0), 'Fare must be >= 0')
+
+    sex = np.asarray(columns['sex'])
+    if sex.dtype.kind in 'US':
+        sex = np.char.lower(sex.astype(str))
+        sex_male = sex == 'male'
+        _report(errors, 'sex', ~(sex_male | (sex == 'female')), 'Sex must be either male or female')
+    else:
+        sex_male = sex == 1
+        _report(errors, 'sex', ~(sex_male | (sex == 0)), 'Encoded sex_male must be 0 or 1')
+
+    embarked = np.asarray(columns['embarked'])
+    if embarked.dtype.kind in 'US':
+        embarked = np.char.upper(embarked.astype(str))
+        embarked_q = embarked == 'Q'
+        embarked_s = embarked == 'S'
+        _report(errors, 'embarked', ~(embarked_q | embarked_s | (embarked == 'C')),
+                'Embarked must be C, Q, or S')
+    else:
+        embarked_q = embarked == 1
+        embarked_s = embarked == 2
+        _report(errors, 'embarked', ~(embarked_q | embarked_s | (embarked == 0)),
+                'Encoded embarked must be 0 (C), 1 (Q), or 2 (S)')
+
+    if errors:
+        raise ColumnValidationError(errors)
+
+    return {
+        "pclass": pclass,
+        "age": age,
+        "fare": fare,
+        "sibsp": sibsp,
+        "parch": parch,
+        "sex_male": sex_male,
+        "embarked_q": embarked_q,
+        "embarked_s": embarked_s
+    }
+
+
+def risk_levels(survival_prob: np.ndarray) -> np.ndarray:
+    """Vectorized risk buckets, same thresholds as the single-passenger endpoint"""
+    return np.select(
+        [survival_prob >= 0.7, survival_prob >= 0.4],
+        ["Low Risk", "Medium Risk"],
+        default="High Risk"
+    )
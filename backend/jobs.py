@@ -0,0 +1,524 @@
+"""
+Asynchronous batch jobs with a persistent on-disk queue
+
+Submitted batches are validated once, saved as column arrays and recorded
+in a SQLite table. A pool of worker threads claims queued jobs, scores
+them in chunks into a temporary CSV that replaces the result file once
+the job is done, updating progress after every chunk. Several processes
+(WEB_CONCURRENCY > 1) may share the directory: a job is claimed by one
+guarded UPDATE, and every row records the process that owns it, so only
+jobs whose owner has died or stopped are requeued. Finished jobs are
+purged after the retention period.
+"""
+
+import io
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.binary_io import ARROW_STREAM, NPY, BinaryFormatError, read_arrow, read_npy
+from backend.features import (
+    MAX_REPORTED_ROWS, PASSENGER_FIELDS, TEXT_FIELDS, ColumnValidationError, risk_levels
+)
+
+TERMINAL_STATES = ('succeeded', 'failed', 'cancelled')
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY, status TEXT NOT NULL, model TEXT, rows INTEGER NOT NULL,
+    processed INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL,
+    started_at REAL, finished_at REAL, error TEXT, owner TEXT, claim TEXT
+)
+"""
+
+# Columns added after the first release, for databases created without them
+MIGRATED_COLUMNS = {'owner': 'TEXT', 'claim': 'TEXT'}
+
+JOB_COLUMNS = ['id', 'status', 'model', 'rows', 'processed', 'created_at',
+               'started_at', 'finished_at', 'error']
+
+RESULT_COLUMNS = ['survived', 'survival_probability', 'death_probability', 'risk_level']
+
+# Upload formats by file suffix, for multipart uploads without a useful content type
+SUFFIX_MEDIA_TYPES = {
+    '.csv': 'text/csv',
+    '.json': 'application/json',
+    '.arrow': ARROW_STREAM,
+    '.arrows': ARROW_STREAM,
+    '.npy': NPY
+}
+
+NUMERIC_FIELDS = ['pclass', 'age', 'sibsp', 'parch', 'fare']
+
+# Fields filled when missing, with their trainer fill_values key
+FILLED_FIELDS = {'age': 'Age', 'fare': 'Fare'}
+
+# Owners of the queues started (and not yet stopped) in this process
+_live_owners = set()
+
+
+def process_alive(pid: int) -> bool:
+    """Whether a process with this pid is running (on this host)"""
+    if os.name == 'nt':
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        exit_code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+        kernel32.CloseHandle(handle)
+        return exit_code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def owner_alive(owner: Optional[str]) -> bool:
+    """
+    Whether the queue that claimed a job is still running
+
+    Owners are "pid:token". A pid of this process only counts while its
+    token belongs to a started queue here, which also catches a restarted
+    container reusing the pid of the process that claimed the job.
+    """
+    try:
+        pid = int(owner.split(':', 1)[0])
+    except (AttributeError, ValueError):
+        return False
+    if pid == os.getpid():
+        return owner in _live_owners
+    return process_alive(pid)
+
+
+# How often idle workers look for jobs and expired results
+POLL_SECONDS = 1.0
+PURGE_INTERVAL_SECONDS = 60.0
+
+
+class JobInputError(ValueError):
+    """Raised when a submitted batch cannot be decoded"""
+
+
+class JobNotFound(KeyError):
+    """Raised for unknown (or purged) job ids"""
+
+
+def read_job_input(content_type: str, body: bytes, fill_values: Dict = None) -> Dict:
+    """
+    Decode a submitted batch into raw passenger columns
+
+    Accepts JSON (``{"passengers": [...]}`` or one array per field), CSV
+    with the passenger fields as a header (case-insensitive, so Kaggle
+    files work), Arrow IPC streams and .npy buffers. Optional ``name``
+    and ``cabin`` columns are passed through for the trainer's title and
+    cabin features. Missing age, fare and (in JSON and CSV) embarked
+    values are filled as for roster indexes (see ``fill_missing``);
+    other missing or non-numeric values are reported per row by
+    ``ColumnValidationError``.
+    """
+    try:
+        columns = _decode(content_type, body)
+    except BinaryFormatError as e:
+        raise JobInputError(str(e))
+    except (ValueError, pd.errors.ParserError) as e:
+        if isinstance(e, (JobInputError, ColumnValidationError)):
+            raise
+        raise JobInputError(f"Could not parse {content_type} batch: {e}")
+    return fill_missing(columns, fill_values)
+
+
+def _decode(content_type: str, body: bytes) -> Dict:
+    if content_type == ARROW_STREAM:
+        return read_arrow(body)
+    if content_type == NPY:
+        return read_npy(body)
+    if content_type in ('text/csv', 'application/csv'):
+        frame = pd.read_csv(io.BytesIO(body))
+        frame.columns = [str(column).lower() for column in frame.columns]
+        missing = [field for field in PASSENGER_FIELDS if field not in frame.columns]
+        if missing:
+            raise JobInputError(f"CSV is missing columns: {missing}")
+        columns = {
+            field: frame[field].fillna('').to_numpy(dtype=str) if frame[field].dtype.kind not in 'biuf'
+            else frame[field].to_numpy()
+            for field in PASSENGER_FIELDS
+        }
+        columns.update({field: frame[field].to_numpy(dtype=object)
+                        for field in TEXT_FIELDS if field in frame.columns})
+        return columns
+    if content_type == 'application/json':
+        data = json.loads(body)
+        if isinstance(data, dict) and 'passengers' in data:
+            passengers = data['passengers']
+            if not isinstance(passengers, list):
+                raise JobInputError("'passengers' must be an array of objects")
+            invalid = [i for i, passenger in enumerate(passengers) if not isinstance(passenger, dict)]
+            if invalid:
+                raise ColumnValidationError([{
+                    "field": "passengers",
+                    "message": "Each passenger must be an object",
+                    "count": len(invalid),
+                    "rows": invalid[:MAX_REPORTED_ROWS]
+                }])
+            data = {field: [p.get(field) for p in passengers] for field in PASSENGER_FIELDS + TEXT_FIELDS}
+        if not isinstance(data, dict) or any(field not in data for field in PASSENGER_FIELDS):
+            raise JobInputError(f"JSON batches need 'passengers' or the columns {PASSENGER_FIELDS}")
+        fields = [field for field in PASSENGER_FIELDS + TEXT_FIELDS if data.get(field) is not None]
+        not_arrays = [field for field in fields if not isinstance(data[field], list)]
+        if not_arrays:
+            raise JobInputError(f"JSON columns must be arrays: {not_arrays}")
+        return {field: data[field] for field in fields}
+    raise JobInputError(
+        f"Unsupported content type '{content_type}'; use JSON, CSV, Arrow IPC or .npy"
+    )
+
+
+def fill_missing(columns: Dict, fill_values: Dict = None) -> Dict:
+    """
+    Numeric passenger columns with missing age, fare and embarked filled
+
+    Fill values are the trainer's training-set ones, or the batch's own
+    medians and 'S' when the artifact has none. Numeric fields that arrive
+    as text (JSON, or CSV columns with stray values) are parsed; rows that
+    do not parse raise ``ColumnValidationError``. Encoded (numeric)
+    embarked columns are left to ``validate_columns``.
+    """
+    fill_values = fill_values or {}
+    columns = dict(columns)
+    errors = []
+    for field in NUMERIC_FIELDS:
+        values = columns[field]
+        if not (isinstance(values, np.ndarray) and values.dtype.kind in 'biuf'):
+            raw = pd.Series(np.asarray(values, dtype=object))
+            raw = raw.where(raw != '', None)
+            numeric = pd.to_numeric(raw, errors='coerce')
+            invalid = np.flatnonzero((numeric.isna() & raw.notna()).to_numpy())
+            if len(invalid):
+                errors.append({"field": field, "message": f"{field} must be a number",
+                               "count": int(len(invalid)), "rows": invalid[:MAX_REPORTED_ROWS].tolist()})
+            values = numeric.to_numpy() if numeric.dtype.kind in 'biu' else \
+                numeric.to_numpy(dtype=np.float64, na_value=np.nan)
+
+        key = FILLED_FIELDS.get(field)
+        if key is not None and values.dtype.kind == 'f':
+            missing = np.isnan(values)
+            fill = fill_values.get(key)
+            if fill is None and missing.any() and not missing.all():
+                fill = float(np.median(values[~missing]))
+            if fill is not None and missing.any():
+                values = np.where(missing, fill, values)
+        columns[field] = values
+    if errors:
+        raise ColumnValidationError(errors)
+
+    embarked = columns['embarked']
+    if not (isinstance(embarked, np.ndarray) and embarked.dtype.kind in 'biuf'):
+        embarked = pd.Series(np.asarray(embarked, dtype=object))
+        embarked = embarked.where(embarked.notna() & (embarked != ''), fill_values.get('Embarked', 'S'))
+        columns['embarked'] = embarked.to_numpy(dtype=str)
+    return columns
+
+
+class BatchJobQueue:
+    """SQLite-backed job queue drained by a pool of worker threads"""
+
+    def __init__(self, directory, workers: int = 1, chunk_rows: int = 50_000,
+                 retention_seconds: float = 24 * 3600):
+        self.directory = Path(directory)
+        self.workers = max(1, workers)
+        self.chunk_rows = chunk_rows
+        self.retention_seconds = retention_seconds
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self._conn = None
+        self._score = None
+        self._ready = None
+        self._last_purge = 0.0
+        self.owner = None
+
+    @classmethod
+    def from_env(cls) -> 'BatchJobQueue':
+        """Build from BATCH_JOB* settings"""
+        return cls(
+            os.getenv('BATCH_JOBS_DIR', str(Path(__file__).parent.parent / 'data' / 'jobs')),
+            workers=int(os.getenv('BATCH_JOB_WORKERS', '1')),
+            chunk_rows=int(os.getenv('BATCH_JOB_CHUNK_ROWS', '50000')),
+            retention_seconds=float(os.getenv('BATCH_JOB_RETENTION_HOURS', '24')) * 3600
+        )
+
+    def start(self, score: Callable, ready: Callable[[], bool]):
+        """
+        Open the queue and start the workers
+
+        ``score(columns, model_name)`` returns the (rows, 2) probability
+        matrix for one chunk; workers wait while ``ready()`` is False.
+        Jobs whose owner died are requeued from scratch; jobs other live
+        processes are running are left alone.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.directory / 'jobs.db'), check_same_thread=False, timeout=30)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        with self._lock, self._conn:
+            self._conn.execute(SQLITE_SCHEMA)
+            existing = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            for column, kind in MIGRATED_COLUMNS.items():
+                if column not in existing:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+
+        self.owner = f"{os.getpid()}:{uuid.uuid4().hex}"
+        _live_owners.add(self.owner)
+        self.requeue_orphans()
+
+        self._score, self._ready = score, ready
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"batch-job-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        """Stop the workers and requeue the job they were running (from scratch)"""
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if self._conn is not None:
+            _live_owners.discard(self.owner)
+            self._execute(
+                "UPDATE jobs SET status = 'queued', processed = 0, started_at = NULL, owner = NULL, claim = NULL "
+                "WHERE status = 'running' AND owner = ?", (self.owner,)
+            )
+            self._conn.close()
+            self._conn = None
+
+    def requeue_orphans(self) -> int:
+        """Requeue running jobs whose owning process has died or stopped its queue"""
+        orphans = [
+            (job_id, claim) for job_id, owner, claim in
+            self._execute("SELECT id, owner, claim FROM jobs WHERE status = 'running'").fetchall()
+            if not owner_alive(owner)
+        ]
+        requeued = 0
+        for job_id, claim in orphans:
+            requeued += self._execute(
+                "UPDATE jobs SET status = 'queued', processed = 0, started_at = NULL, owner = NULL, claim = NULL "
+                "WHERE id = ? AND status = 'running' AND claim IS ?", (job_id, claim)
+            ).rowcount
+        if requeued:
+            self._wake.set()
+        return requeued
+
+    def _job_dir(self, job_id: str) -> Path:
+        return self.directory / job_id
+
+    def result_path(self, job_id: str) -> Path:
+        return self._job_dir(job_id) / 'result.csv'
+
+    def _execute(self, sql: str, params=()) -> sqlite3.Cursor:
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params)
+
+    def submit(self, columns: Dict[str, np.ndarray], model_name: str) -> Dict:
+        """
+        Persist validated columns (see ``validate_columns``) and queue a job
+
+        Optional ``name``/``cabin`` lists are stored as fixed-width strings,
+        '' when missing, so the input loads without pickle.
+        """
+        job_id = uuid.uuid4().hex
+        job_dir = self._job_dir(job_id)
+        job_dir.mkdir(parents=True)
+        arrays = {name: np.asarray(values) for name, values in columns.items() if name not in TEXT_FIELDS}
+        arrays.update({name: np.asarray([value or '' for value in columns[name]], dtype=str)
+                       for name in TEXT_FIELDS if columns.get(name) is not None})
+        np.savez(job_dir / 'input.npz', **arrays)
+
+        self._execute(
+            "INSERT INTO jobs (id, status, model, rows, created_at) VALUES (?, 'queued', ?, ?, ?)",
+            (job_id, model_name, len(columns['pclass']), time.time())
+        )
+        self._wake.set()
+        return self.get(job_id)
+
+    def _row_to_job(self, row) -> Dict:
+        job = dict(zip(JOB_COLUMNS, row))
+        job['progress'] = round(job['processed'] / job['rows'], 4) if job['rows'] else 1.0
+        return job
+
+    def get(self, job_id: str) -> Dict:
+        row = self._execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            raise JobNotFound(job_id)
+        return self._row_to_job(row)
+
+    def list(self, limit: int = 50) -> List[Dict]:
+        rows = self._execute(
+            f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def cancel_or_delete(self, job_id: str) -> Dict:
+        """
+        Cancel a queued or running job; delete a finished one with its files
+
+        Running jobs stop after their current chunk.
+        """
+        job = self.get(job_id)
+        if job['status'] not in TERMINAL_STATES:
+            self._execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE id = ? AND status IN ('queued', 'running')",
+                (time.time(), job_id)
+            )
+            return self.get(job_id)
+
+        self._execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
+        job['status'] = 'deleted'
+        return job
+
+    def purge_expired(self) -> int:
+        """Delete finished jobs (and their files) older than the retention period"""
+        cutoff = time.time() - self.retention_seconds
+        placeholders = ', '.join('?' * len(TERMINAL_STATES))
+        expired = [row[0] for row in self._execute(
+            f"SELECT id FROM jobs WHERE status IN ({placeholders}) AND finished_at < ?",
+            (*TERMINAL_STATES, cutoff)
+        ).fetchall()]
+        for job_id in expired:
+            self._execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+            shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
+        return len(expired)
+
+    def stats(self) -> Dict:
+        counts = dict(self._execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {
+            "directory": str(self.directory),
+            "workers": self.workers,
+            "chunk_rows": self.chunk_rows,
+            "retention_hours": self.retention_seconds / 3600,
+            "counts": counts
+        }
+
+    def _claim(self) -> Optional[Dict]:
+        """
+        Move the oldest queued job to running, owned by this queue
+
+        The UPDATE only matches a job that is still queued, so when
+        processes race for the same job exactly one of them gets it.
+        """
+        while True:
+            row = self._execute(
+                f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            claim = uuid.uuid4().hex
+            claimed = self._execute(
+                "UPDATE jobs SET status = 'running', started_at = ?, processed = 0, owner = ?, claim = ? "
+                "WHERE id = ? AND status = 'queued'",
+                (time.time(), self.owner, claim, row[0])
+            ).rowcount
+            if claimed == 1:
+                return {**self._row_to_job(row), 'claim': claim}
+
+    def _holds(self, job: Dict) -> bool:
+        """Whether ``job`` is still running under this claim (not cancelled or requeued)"""
+        row = self._execute("SELECT status, claim FROM jobs WHERE id = ?", (job['id'],)).fetchone()
+        return row is not None and row[0] == 'running' and row[1] == job['claim']
+
+    def _run(self):
+        while not self._stop.is_set():
+            if time.time() - self._last_purge > PURGE_INTERVAL_SECONDS:
+                self._last_purge = time.time()
+                self.purge_expired()
+                self.requeue_orphans()
+
+            job = self._claim() if self._ready() else None
+            if job is None:
+                self._wake.wait(POLL_SECONDS)
+                self._wake.clear()
+                continue
+
+            try:
+                self._process(job)
+            except Exception as e:
+                self._execute(
+                    "UPDATE jobs SET status = 'failed', finished_at = ?, error = ? "
+                    "WHERE id = ? AND status = 'running' AND claim = ?",
+                    (time.time(), str(e) or type(e).__name__, job['id'], job['claim'])
+                )
+
+    def _process(self, job: Dict):
+        """
+        Score one job chunk by chunk into a per-claim temporary CSV
+
+        The temporary file replaces result.csv only when every chunk is
+        written and the claim still holds, so a requeued or cancelled run
+        never leaves a partial or mixed result behind.
+        """
+        job_id = job['id']
+        with np.load(self._job_dir(job_id) / 'input.npz') as data:
+            columns = {name: data[name] for name in data.files}
+
+        partial = self._job_dir(job_id) / f"result.{job['claim']}.tmp"
+        try:
+            if self._write_result(job, columns, partial):
+                self._finish(job, partial)
+        finally:
+            partial.unlink(missing_ok=True)
+
+    def _write_result(self, job: Dict, columns: Dict, path: Path) -> bool:
+        job_id = job['id']
+        with open(path, 'w', newline='') as out:
+            out.write(','.join(RESULT_COLUMNS) + '\n')
+            for start in range(0, job['rows'], self.chunk_rows):
+                if self._stop.is_set() or not self._holds(job):
+                    return False
+
+                chunk = {name: values[start:start + self.chunk_rows] for name, values in columns.items()}
+                probabilities = self._score(chunk, job['model'])
+                survival_prob, death_prob = probabilities[:, 1], probabilities[:, 0]
+                pd.DataFrame({
+                    'survived': (survival_prob > death_prob).astype(int),
+                    'survival_probability': survival_prob,
+                    'death_probability': death_prob,
+                    'risk_level': risk_levels(survival_prob)
+                }).to_csv(out, header=False, index=False)
+
+                self._execute("UPDATE jobs SET processed = ? WHERE id = ? AND claim = ?",
+                              (start + len(survival_prob), job_id, job['claim']))
+        return True
+
+    def _finish(self, job: Dict, partial: Path):
+        """Publish the result and mark the job succeeded, if this claim still holds"""
+        with self._lock, self._conn:
+            # Write lock before the check: no process can cancel or requeue between it and the swap
+            self._conn.execute('BEGIN IMMEDIATE')
+            if self._conn.execute("SELECT 1 FROM jobs WHERE id = ? AND status = 'running' AND claim = ?",
+                                  (job['id'], job['claim'])).fetchone() is None:
+                return
+            os.replace(partial, self.result_path(job['id']))
+            self._conn.execute(
+                "UPDATE jobs SET status = 'succeeded', finished_at = ? WHERE id = ? AND claim = ?",
+                (time.time(), job['id'], job['claim'])
+            )
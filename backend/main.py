@@ -2,9 +2,15 @@
 Modern FastAPI Backend for Titanic Survival Prediction
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import BackgroundTasks, Depends, FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
+from fastapi.routing import APIRoute
+from starlette.datastructures import Headers
+from starlette.routing import Match
 from pydantic import BaseModel, Field, validator
 from typing import List, Optional, Dict, Any
 import joblib
@@ -13,10 +19,39 @@ import pandas as pd
 from pathlib import Path
 import sys
 import os
+import asyncio
+import cProfile
+import json
+import threading
+import time
 
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
-from train_model import TitanicModelTrainer
+from train_model import TitanicModelTrainer, default_importance_kind
+from cohort_cube import CohortCube
+from similar_passengers import MAX_NEIGHBORS, SimilarPassengers
+from backend.ensemble import prepare_for_serving
+from backend.explain import ContributionExplainer
+from backend.admin import is_admin, require_admin
+from backend.binary_io import (
+    ARROW_STREAM, BINARY_MEDIA_TYPES, BinaryFormatError,
+    media_type, read_arrow, read_npy, write_arrow, write_npy
+)
+from backend.features import (
+    TEXT_FIELDS, ColumnValidationError, risk_levels, sweep_columns, text_columns, trainer_features,
+    validate_columns
+)
+from backend.jobs import SUFFIX_MEDIA_TYPES, BatchJobQueue, JobInputError, JobNotFound, read_job_input
+from backend.memory import (
+    AllocationTracker, BatchMemoryTracker, MemoryReporter, process_memory, trainer_footprint
+)
+from backend.prediction_log import PredictionLogWriter
+from backend.profiling import MAX_SAMPLE_SECONDS, SamplingProfiler, profile_summary
+from backend.resources import apply_plan, plan_resources
+from backend.score_index import ScoreIndexStore, model_checksum
+from backend.shadow import ShadowScorer
+from backend.streaming import json_batch_chunks, stream_response
+from backend.warmup import warm_up
 
 app = FastAPI(
     title="Titanic Survival Prediction API",
@@ -42,8 +77,129 @@ app.add_middleware(
 
 # Global model instance
 model_trainer = None
+explainers = {}
+# Roll-ups over the artifact's training-set cohort cube (None for older artifacts)
+cohort_cube = None
+# Nearest training passengers (None for artifacts without a neighbour index)
+similar_passengers = None
 MODEL_PATH = Path(__file__).parent.parent / "models" / "titanic_model.pkl"
 
+# CPU split across workers and native thread pools (reported on /health)
+resource_plan = plan_resources()
+
+sampling_profiler = SamplingProfiler()
+shadow_scorer = ShadowScorer()
+prediction_log = PredictionLogWriter.from_env()
+job_queue = BatchJobQueue.from_env()
+score_index = ScoreIndexStore()
+allocation_tracker = AllocationTracker()
+batch_memory = BatchMemoryTracker()
+
+# Batch endpoints whose peak memory is tracked per batch-size bucket
+MEMORY_TRACKED_PATHS = ("/api/v1/predict/batch", "/api/v1/predict/batch/columnar")
+
+# Longest a batch-job worker waits for prediction-log buffer space per slice
+JOB_LOG_WAIT_SECONDS = 10.0
+
+# Largest what-if grid scored by /api/v1/predict/sweep
+SWEEP_MAX_POINTS = int(os.getenv('SWEEP_MAX_POINTS', '10000'))
+
+# Model footprints only change on reload: (model version, report)
+footprint_cache = {"version": None, "report": None}
+
+# Readiness of the serving model (see /health/ready)
+serving_state = {
+    "status": "starting",
+    "ready": False,
+    "error": None,
+    "started_at": None,
+    "ready_at": None,
+    "model_version": None,
+    "warmup": {}
+}
+
+
+def json_safe(value):
+    """Replace inf/nan (not representable in JSON) with their string form"""
+    if isinstance(value, float) and not np.isfinite(value):
+        return str(value)
+    if isinstance(value, dict):
+        return {key: json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(item) for item in value]
+    return value
+
+
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    """FastAPI's 422 body; rejected inputs such as 1e999 are echoed as strings instead of failing to encode"""
+    return JSONResponse(status_code=422, content={"detail": json_safe(jsonable_encoder(exc.errors()))})
+
+
+@app.middleware("http")
+async def profile_request(request: Request, call_next):
+    """
+    Profile a single request with cProfile when asked by an admin
+
+    Triggered by ?profile=true or an X-Profile header together with a valid
+    X-Admin-Token. JSON responses are wrapped as {"result", "profile"};
+    other responses get a Server-Timing header. The profiler covers the
+    event loop thread, so concurrent requests can appear in the summary.
+    """
+    wants_profile = (request.query_params.get('profile', '').lower() in ('1', 'true')
+                     or 'x-profile' in request.headers)
+    if not wants_profile:
+        return await call_next(request)
+    if not is_admin(request.headers.get('x-admin-token')):
+        return JSONResponse(status_code=403, content={"detail": "Profiling requires a valid admin token"})
+
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        response = await call_next(request)
+        body = b''.join([chunk async for chunk in response.body_iterator])
+    finally:
+        profiler.disable()
+    total_ms = (time.perf_counter() - start) * 1e3
+
+    headers = {k: v for k, v in response.headers.items() if k.lower() != 'content-length'}
+    headers['Server-Timing'] = f"total;dur={total_ms:.3f}"
+    is_json = (response.media_type == 'application/json'
+               or headers.get('content-type', '').startswith('application/json'))
+    if is_json and 'content-encoding' not in headers:
+        content = {
+            "result": json.loads(body) if body else None,
+            "profile": {"total_ms": round(total_ms, 3), "functions": profile_summary(profiler)}
+        }
+        return JSONResponse(status_code=response.status_code, content=content, headers=headers)
+    return Response(content=body, status_code=response.status_code, headers=headers)
+
+
+@app.middleware("http")
+async def track_batch_memory(request: Request, call_next):
+    """Record peak RSS growth of batch requests per batch-size bucket (see /admin/memory)"""
+    if request.url.path not in MEMORY_TRACKED_PATHS or request.method != "POST":
+        return await call_next(request)
+    sample = batch_memory.begin(request.url.path)
+    try:
+        response = await call_next(request)
+    except BaseException:
+        batch_memory.finish(sample)
+        raise
+    sample["rows"] = getattr(request.state, "batch_rows", None)
+    # Streamed bodies are serialized after call_next returns; sample the peak after the last chunk
+    response.body_iterator = memory_tracked_body(response.body_iterator, sample)
+    return response
+
+
+async def memory_tracked_body(body_iterator, sample: Dict):
+    try:
+        async for chunk in body_iterator:
+            yield chunk
+    finally:
+        batch_memory.finish(sample)
+
 
 class PassengerInput(BaseModel):
     """Passenger data input schema"""
@@ -116,6 +272,113 @@ class BatchPredictionInput(BaseModel):
     passengers: List[PassengerInput]
 
 
+class ColumnarBatchInput(BaseModel):
+    """Columnar batch input schema: one array per passenger field"""
+    pclass: List[int]
+    sex: List[str]
+    age: List[float]
+    sibsp: List[int]
+    parch: List[int]
+    fare: List[float]
+    embarked: List[str]
+    name: Optional[List[Optional[str]]] = Field(None, description="Passenger names (optional)")
+    cabin: Optional[List[Optional[str]]] = Field(None, description="Cabin numbers (optional)")
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "pclass": [1, 3],
+                "sex": ["female", "male"],
+                "age": [25, 40],
+                "sibsp": [1, 0],
+                "parch": [0, 0],
+                "fare": [100.0, 7.25],
+                "embarked": ["S", "Q"],
+                "name": ["Cumings, Mrs. John Bradley", "Rice, Master. Eugene"],
+                "cabin": ["C85", None]
+            }
+        }
+
+
+class ColumnarBatchResponse(BaseModel):
+    """Columnar batch response schema: one array per output field"""
+    count: int
+    survived: List[int]
+    survival_probability: List[float]
+    death_probability: List[float]
+    risk_level: List[str]
+    confidence: List[float]
+
+
+SWEEP_FIELDS = {
+    "age": float, "fare": float, "pclass": int, "sibsp": int, "parch": int, "sex": str, "embarked": str
+}
+
+
+class SweepAxis(BaseModel):
+    """One varied field: explicit ``values`` or an inclusive ``start``/``stop``/``step`` range"""
+    field: str = Field(..., description="age, fare, pclass, sibsp, parch, sex or embarked")
+    values: Optional[List[Any]] = None
+    start: Optional[float] = None
+    stop: Optional[float] = None
+    step: Optional[float] = Field(None, gt=0)
+
+    @validator('field')
+    def validate_field(cls, v):
+        if v.lower() not in SWEEP_FIELDS:
+            raise ValueError(f"field must be one of {sorted(SWEEP_FIELDS)}")
+        return v.lower()
+
+    @validator('values', each_item=True)
+    def validate_value(cls, v):
+        if isinstance(v, bool) or not isinstance(v, (str, int, float)):
+            raise ValueError("values must be numbers or strings")
+        if isinstance(v, float) and not np.isfinite(v):
+            raise ValueError("values must be finite")
+        return v
+
+    @validator('start', 'stop', 'step')
+    def validate_finite(cls, v):
+        if v is not None and not np.isfinite(v):
+            raise ValueError("must be finite")
+        return v
+
+
+class SweepInput(BaseModel):
+    """What-if sweep: a base passenger and one or two axes to vary"""
+    passenger: PassengerInput
+    axes: List[SweepAxis] = Field(..., min_items=1, max_items=2)
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "passenger": PassengerInput.Config.schema_extra["example"],
+                "axes": [
+                    {"field": "age", "start": 0, "stop": 80, "step": 1},
+                    {"field": "pclass", "values": [1, 2, 3]}
+                ]
+            }
+        }
+
+
+class IndexedPredictionResponse(PredictionResponse):
+    """Precomputed prediction for a known passenger"""
+    passenger_id: int
+    roster: str
+
+
+class IdLookupInput(BaseModel):
+    """Bulk lookup of known passengers by PassengerId"""
+    ids: List[int] = Field(..., max_items=1_000_000)
+    roster: Optional[str] = Field(None, description="Roster to search (default: every roster, in order)")
+
+
+class SimilarPassengersInput(BaseModel):
+    """Passengers to find the nearest training passengers for"""
+    passengers: List[PassengerInput] = Field(..., min_items=1)
+    k: int = Field(5, ge=1, le=MAX_NEIGHBORS, description="Neighbours per passenger")
+
+
 class ModelInfo(BaseModel):
     """Model information schema"""
     model_name: str
@@ -126,28 +389,87 @@ class ModelInfo(BaseModel):
 
 
 def load_model():
-    """Load the trained model"""
-    global model_trainer
+    """Load the trained model, warm it up, then publish it to the endpoints"""
+    global model_trainer, explainers, cohort_cube, similar_passengers
     
     if not MODEL_PATH.exists():
         raise FileNotFoundError(
             f"Model not found at {MODEL_PATH}. Please run train_model.py first."
         )
     
-    model_trainer = TitanicModelTrainer()
-    model_trainer.load_model(str(MODEL_PATH))
-    print(f"✅ Model loaded: {model_trainer.best_model_name}")
+    trainer = TitanicModelTrainer()
+    trainer.load_model(str(MODEL_PATH))
+    trainer.models = prepare_for_serving(trainer.models, resource_plan["model_threads"])
+    trainer.best_model = trainer.models[trainer.best_model_name]
+    model_version = model_checksum(MODEL_PATH)
+    best_explainer = ContributionExplainer(trainer.best_model, trainer.feature_names)
+    print(f"✅ Model loaded: {trainer.best_model_name} ({len(trainer.models)} served, "
+          f"{resource_plan['model_threads']} thread(s) per call)")
+
+    serving_state["status"] = "warming_up"
+    serving_state["warmup"] = warm_up(
+        lambda columns: scaled_features(columns, trainer=trainer),
+        trainer.models,
+        best_explainer
+    )
+    print(f"🔥 Warmup complete: {serving_state['warmup']}")
+
+    # Endpoints only see the model once it is warm
+    serving_state["model_version"] = model_version
+    model_trainer, explainers = trainer, {trainer.best_model_name: best_explainer}
+    cohort_cube = CohortCube(trainer.cohort_cube) if trainer.cohort_cube is not None else None
+    similar_passengers = SimilarPassengers(trainer.neighbor_index) if trainer.neighbor_index is not None else None
+
+    # Known rosters are (re)scored off the startup path
+    threading.Thread(
+        target=score_index.refresh, args=(trainer, trainer.best_model, model_version),
+        name="score-index", daemon=True
+    ).start()
+
+
+def initialize_model():
+    """Background model load; retries until a model is available"""
+    retry_seconds = float(os.getenv('MODEL_LOAD_RETRY_SECONDS', '30'))
+    while True:
+        serving_state["status"] = "loading"
+        try:
+            load_model()
+            serving_state.update(status="ready", ready=True, error=None, ready_at=time.time())
+            print("🚀 Titanic API is ready!")
+            return
+        except Exception as e:
+            serving_state.update(status="failed", error=str(e))
+            print(f"⚠️  Warning: Could not load model - {str(e)}")
+            print("   Please run: python train_model.py")
+            if retry_seconds <= 0:
+                return
+            time.sleep(retry_seconds)
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize model on startup"""
-    try:
-        load_model()
-        print("🚀 Titanic API is ready!")
-    except Exception as e:
-        print(f"⚠️  Warning: Could not load model - {str(e)}")
-        print("   Please run: python train_model.py")
+    """Start loading the model without blocking the server from binding"""
+    serving_state["started_at"] = time.time()
+    apply_plan(resource_plan)
+    print(f"🧮 CPU plan: {resource_plan['cpus']['available']} CPU(s) ({resource_plan['cpus']['source']}), "
+          f"{resource_plan['workers']} worker(s), {resource_plan['threads_per_worker']} thread(s) per worker")
+    if prediction_log is not None:
+        prediction_log.start()
+    tracemalloc_frames = int(os.getenv('MEMORY_TRACEMALLOC_FRAMES', '0'))
+    if tracemalloc_frames > 0:
+        allocation_tracker.start(tracemalloc_frames)
+    memory_reporter.start()
+    job_queue.start(score_job_chunk, lambda: model_trainer is not None)
+    threading.Thread(target=initialize_model, name="model-loader", daemon=True).start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush buffered prediction logs and stop background workers"""
+    if prediction_log is not None:
+        prediction_log.stop()
+    job_queue.stop()
+    memory_reporter.stop()
 
 
 @app.get("/", tags=["Root"])
@@ -161,8 +483,18 @@ async def root():
         "endpoints": {
             "predict": "/api/v1/predict",
             "batch_predict": "/api/v1/predict/batch",
+            "batch_predict_columnar": "/api/v1/predict/batch/columnar",
+            "batch_jobs": "/api/v1/jobs",
+            "predict_by_id": "/api/v1/predict/by-id/{passenger_id}",
+            "predict_sweep": "/api/v1/predict/sweep",
+            "similar_passengers": "/api/v1/passengers/similar",
+            "models": "/api/v1/models",
             "model_info": "/api/v1/model/info",
-            "health": "/health"
+            "plot_data": "/api/v1/visualizations/plot-data",
+            "cohorts": "/api/v1/cohorts",
+            "health": "/health",
+            "liveness": "/health/live",
+            "readiness": "/health/ready"
         }
     }
 
@@ -172,12 +504,169 @@ async def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
-        "model_loaded": model_trainer is not None
+        "model_loaded": model_trainer is not None,
+        "ready": serving_state["ready"],
+        "model_status": serving_state["status"],
+        "resources": resource_plan
     }
 
 
+@app.get("/health/live", tags=["Health"])
+async def liveness():
+    """Liveness: the process is up and serving HTTP"""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready", tags=["Health"])
+async def readiness():
+    """Readiness: the model is loaded and warmed up (503 until then)"""
+    started_at, ready_at = serving_state["started_at"], serving_state["ready_at"]
+    content = {
+        "ready": serving_state["ready"],
+        "status": serving_state["status"],
+        "error": serving_state["error"],
+        "model": model_trainer.best_model_name if model_trainer is not None else None,
+        "startup_seconds": round(ready_at - started_at, 3) if ready_at and started_at else None,
+        "latency": serving_state["warmup"]
+    }
+    return JSONResponse(status_code=200 if serving_state["ready"] else 503, content=content)
+
+
+def resolve_model(name: Optional[str] = None):
+    """Look up a served model by name (default: the deployed best model)"""
+    if name is None or name == model_trainer.best_model_name:
+        return model_trainer.best_model_name, model_trainer.best_model
+    if name not in model_trainer.models:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown model '{name}'. Available: {sorted(model_trainer.models)}"
+        )
+    return name, model_trainer.models[name]
+
+
+def get_explainer(name: str) -> ContributionExplainer:
+    """Per-model explainer, built on first use"""
+    if name not in explainers:
+        explainers[name] = ContributionExplainer(model_trainer.models[name], model_trainer.feature_names)
+    return explainers[name]
+
+
+def passenger_columns(passengers: List[PassengerInput]):
+    """Split validated passengers into feature columns plus names and cabins"""
+    columns = {
+        "pclass": [p.pclass for p in passengers],
+        "age": [p.age for p in passengers],
+        "fare": [p.fare for p in passengers],
+        "sibsp": [p.sibsp for p in passengers],
+        "parch": [p.parch for p in passengers],
+        "sex_male": [p.sex == 'male' for p in passengers],
+        "embarked_q": [p.embarked == 'Q' for p in passengers],
+        "embarked_s": [p.embarked == 'S' for p in passengers]
+    }
+    return columns, [p.name for p in passengers], [p.cabin for p in passengers]
+
+
+def scaled_features(columns: Dict, trainer=None, names=None, cabins=None) -> np.ndarray:
+    """Scaled feature matrix for the serving artifact (see ``trainer_features``)"""
+    return trainer_features(trainer or model_trainer, columns, names, cabins)
+
+
+def score_columns(columns: Dict, model_name: Optional[str], background_tasks: BackgroundTasks,
+                  names=None, cabins=None):
+    """
+    Compute features once, score with the requested model and queue shadows
+
+    Returns (model name, scaled features, probabilities).
+    """
+    name, model = resolve_model(model_name)
+    if not len(columns['pclass']):
+        return name, None, np.empty((0, 2))
+
+    features_scaled = scaled_features(columns, names=names, cabins=cabins)
+    start = time.perf_counter()
+    probabilities = model.predict_proba(features_scaled)
+    latency_ms = (time.perf_counter() - start) * 1e3
+
+    if prediction_log is not None:
+        prediction_log.log(time.time(), name, serving_state["model_version"], latency_ms,
+                           columns, probabilities[:, 1])
+
+    shadow_names = shadow_scorer.targets(name, model_trainer.models)
+    if shadow_names:
+        background_tasks.add_task(
+            shadow_scorer.score,
+            {shadow: model_trainer.models[shadow] for shadow in shadow_names},
+            features_scaled, name, probabilities[:, 1], latency_ms
+        )
+    return name, features_scaled, probabilities
+
+
+def risk_level(survival_prob: float) -> str:
+    """Map a survival probability to a risk bucket"""
+    if survival_prob >= 0.7:
+        return "Low Risk"
+    elif survival_prob >= 0.4:
+        return "Medium Risk"
+    return "High Risk"
+
+
+def batch_contributions(name: str, features_scaled, explain: bool):
+    """(explainer, per-row contributions) when explanations were asked for, else (None, None)"""
+    explainer = get_explainer(name) if explain and features_scaled is not None else None
+    if explainer is None or not explainer.supported:
+        return None, None
+    return explainer, explainer.explain(features_scaled)
+
+
+PREDICTION_ROW = ('{"survived":%d,"survival_probability":%r,"death_probability":%r,'
+                  '"risk_level":"%s","confidence":%r,"feature_contributions":%s}')
+
+
+def prediction_rows(probabilities: np.ndarray, explainer=None, contributions=None):
+    """Serialized PredictionResponse rows, generated lazily for streaming"""
+    risks = risk_levels(probabilities[:, 1]).tolist()
+    for i, (death_prob, survival_prob) in enumerate(probabilities.tolist()):
+        yield PREDICTION_ROW % (
+            survival_prob > death_prob, survival_prob, death_prob, risks[i],
+            max(survival_prob, death_prob),
+            json.dumps(explainer.top_contributions(contributions[i])) if contributions is not None else 'null'
+        )
+
+
+def score_passengers(passengers: List[PassengerInput], background_tasks: BackgroundTasks,
+                     explain: bool = False, model_name: Optional[str] = None) -> List[PredictionResponse]:
+    """Score a batch of passengers with a single model call"""
+    columns, names, cabins = passenger_columns(passengers)
+    name, features_scaled, probabilities = score_columns(
+        columns, model_name, background_tasks, names=names, cabins=cabins
+    )
+    explainer, contributions = batch_contributions(name, features_scaled, explain)
+
+    results = []
+    for i, (death_prob, survival_prob) in enumerate(probabilities.tolist()):
+        results.append(PredictionResponse(
+            survived=int(survival_prob > death_prob),
+            survival_probability=survival_prob,
+            death_probability=death_prob,
+            risk_level=risk_level(survival_prob),
+            confidence=max(survival_prob, death_prob),
+            feature_contributions=(
+                explainer.top_contributions(contributions[i]) if contributions is not None else None
+            )
+        ))
+    return results
+
+
+MODEL_QUERY = Query(None, description="Model to score with (default: deployed best model)")
+
+
 @app.post("/api/v1/predict", response_model=PredictionResponse, tags=["Predictions"])
-async def predict_survival(passenger: PassengerInput):
+async def predict_survival(
+    passenger: PassengerInput,
+    background_tasks: BackgroundTasks,
+    explain: bool = Query(False, description="Include per-passenger SHAP feature contributions"),
+    model: Optional[str] = MODEL_QUERY
+):
     """
     Predict survival for a single passenger
     
@@ -187,100 +676,629 @@ async def predict_survival(passenger: PassengerInput):
         - death_probability: Probability of death (0-1)
         - risk_level: Risk assessment (Low/Medium/High Risk)
         - confidence: Prediction confidence (0-1)
+        - feature_contributions: Top 5 SHAP contributions (only with ?explain=true)
     """
     if model_trainer is None:
         raise HTTPException(status_code=503, detail="Model not loaded. Please train the model first.")
     
     try:
-        # Simple feature engineering matching emergency training
-        family_size = passenger.sibsp + passenger.parch + 1
-        is_alone = 1 if family_size == 1 else 0
-        sex_male = 1 if passenger.sex.lower() == 'male' else 0
-        embarked_q = 1 if passenger.embarked.upper() == 'Q' else 0
-        embarked_s = 1 if passenger.embarked.upper() == 'S' else 0
-        
-        # Create feature array matching training format
-        features = np.array([[
-            passenger.pclass,
-            passenger.age,
-            passenger.fare,
-            family_size,
-            is_alone,
-            sex_male,
-            embarked_q,
-            embarked_s
-        ]])
-        
-        # Load model components
-        import joblib
-        model_data = joblib.load(MODEL_PATH)
-        model = model_data['model']
-        scaler = model_data['scaler']
-        
-        # Scale features
-        features_scaled = scaler.transform(features)
-        
-        # Make prediction
-        prediction = model.predict(features_scaled)[0]
-        probabilities = model.predict_proba(features_scaled)[0]
-        
-        survival_prob = float(probabilities[1])
-        death_prob = float(probabilities[0])
-        confidence = float(max(probabilities))
-        
-        # Determine risk level
-        if survival_prob >= 0.7:
-            risk_level = "Low Risk"
-        elif survival_prob >= 0.4:
-            risk_level = "Medium Risk"
-        else:
-            risk_level = "High Risk"
-        
-        # Calculate feature contributions (simplified)
-        feature_contributions = None
-        if hasattr(model_trainer.best_model, 'feature_importances_'):
-            importance = model_trainer.best_model.feature_importances_
-            top_features = np.argsort(importance)[::-1][:5]
-            feature_contributions = {
-                model_trainer.feature_names[i]: float(importance[i]) 
-                for i in top_features
-            }
-        
-        return PredictionResponse(
-            survived=int(prediction),
-            survival_probability=survival_prob,
-            death_probability=death_prob,
-            risk_level=risk_level,
-            confidence=confidence,
-            feature_contributions=feature_contributions
-        )
-        
+        return score_passengers([passenger], background_tasks, explain=explain, model_name=model)[0]
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
 
+def sweep_axis_values(axis: SweepAxis, max_points: int) -> list:
+    """Concrete values of one sweep axis (ValueError when malformed or too long)"""
+    if axis.values is not None:
+        values = list(axis.values)
+    elif None not in (axis.start, axis.stop, axis.step):
+        count = int(np.floor((axis.stop - axis.start) / axis.step + 1e-9)) + 1
+        if count < 1:
+            raise ValueError(f"{axis.field}: stop must be >= start")
+        if count > max_points:
+            raise ValueError(f"{axis.field}: {count} values exceeds the grid limit of {max_points}")
+        values = (axis.start + axis.step * np.arange(count)).round(10).tolist()
+    else:
+        raise ValueError(f"{axis.field}: give either values or start, stop and step")
+
+    if not values:
+        raise ValueError(f"{axis.field}: no values")
+    kind = SWEEP_FIELDS[axis.field]
+    if kind is str:
+        return [str(value) for value in values]
+    # Numeric strings are accepted, so they are checked again after conversion
+    numbers = [float(value) for value in values]
+    if not np.isfinite(numbers).all():
+        raise ValueError(f"{axis.field} values must be finite numbers")
+    if kind is int and any(number != int(number) for number in numbers):
+        raise ValueError(f"{axis.field} values must be whole numbers")
+    return [kind(number) for number in numbers]
+
+
+@app.post("/api/v1/predict/sweep", tags=["Predictions"])
+async def predict_sweep(sweep: SweepInput, model: Optional[str] = MODEL_QUERY):
+    """
+    What-if survival surface for one passenger
+
+    Varies one or two fields over a grid (e.g. age 0-80 step 1 x pclass
+    1-3), scores every point in a single model call and returns the
+    survival probabilities with shape [len(axis 1), len(axis 2)].
+    At most SWEEP_MAX_POINTS grid points; sweeps are not logged.
+    """
+    if model_trainer is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+
+    fields = [axis.field for axis in sweep.axes]
+    if len(set(fields)) != len(fields):
+        raise HTTPException(status_code=422, detail="Each field can only be swept once")
+    try:
+        axes = [(axis.field, sweep_axis_values(axis, SWEEP_MAX_POINTS)) for axis in sweep.axes]
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    shape = [len(values) for _, values in axes]
+    points = int(np.prod(shape))
+    if points > SWEEP_MAX_POINTS:
+        raise HTTPException(
+            status_code=422, detail=f"Grid has {points} points; the limit is {SWEEP_MAX_POINTS}"
+        )
+
+    try:
+        columns = validate_columns(sweep_columns(sweep.passenger.dict(), axes))
+    except ColumnValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors)
+
+    try:
+        name, scorer = resolve_model(model)
+        names = [sweep.passenger.name] * points
+        cabins = [sweep.passenger.cabin] * points
+        survival_prob = scorer.predict_proba(scaled_features(columns, names=names, cabins=cabins))[:, 1]
+        return {
+            "model": name,
+            "axes": [{"field": field, "values": values} for field, values in axes],
+            "shape": shape,
+            "points": points,
+            "survival_probability": survival_prob.astype(np.float64).reshape(shape).round(4).tolist()
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Sweep error: {str(e)}")
+
+
+def indexed_lookup(ids, roster: Optional[str]) -> Dict:
+    """Look ids up in the score index for the served model (503 while it is being built)"""
+    if model_trainer is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    current = [index for index in score_index.indexes.values()
+               if index.model_version == serving_state["model_version"]]
+    if not current:
+        detail = "Score index is being built" if score_index.building else \
+            f"No score index for the served model ({score_index.last_error or 'no rosters configured'})"
+        raise HTTPException(status_code=503, detail=detail)
+    try:
+        return score_index.lookup(ids, serving_state["model_version"], roster)
+    except KeyError:
+        raise HTTPException(
+            status_code=404, detail=f"Unknown roster '{roster}'. Available: {sorted(score_index.indexes)}"
+        )
+
+
+def indexed_prediction(passenger_id: int, roster: str, survival_prob: float) -> Dict:
+    survival_prob = float(survival_prob)
+    return {
+        "passenger_id": int(passenger_id),
+        "roster": roster,
+        "survived": int(survival_prob > 0.5),
+        "survival_probability": survival_prob,
+        "death_probability": 1.0 - survival_prob,
+        "risk_level": risk_level(survival_prob),
+        "confidence": max(survival_prob, 1.0 - survival_prob)
+    }
+
+
+@app.get("/api/v1/predict/by-id/{passenger_id}", response_model=IndexedPredictionResponse, tags=["Predictions"])
+async def predict_by_id(
+    passenger_id: int,
+    roster: Optional[str] = Query(None, description="Roster to search (default: every roster, in order)")
+):
+    """
+    Precomputed prediction for a known passenger (train.csv, test.csv or a
+    SCORE_INDEX_ROSTERS roster), scored by the deployed model
+    """
+    result = indexed_lookup([passenger_id], roster)
+    if not result["found"][0]:
+        raise HTTPException(status_code=404, detail=f"PassengerId {passenger_id} is not in any indexed roster")
+    return indexed_prediction(passenger_id, result["roster"][0], result["survival_probability"][0])
+
+
+@app.post("/api/v1/predict/by-id", tags=["Predictions"])
+async def predict_by_ids(lookup: IdLookupInput, request: Request):
+    """Bulk precomputed predictions; unknown ids are listed under ``missing``"""
+    ids = np.asarray(lookup.ids, dtype=np.int64)
+    result = indexed_lookup(ids, lookup.roster)
+    found = result["found"]
+    survival_prob = result["survival_probability"][found]
+    death_prob = 1.0 - survival_prob
+
+    body = json.dumps({
+        "count": int(found.sum()),
+        "missing": ids[~found].tolist(),
+        "passenger_id": ids[found].tolist(),
+        "roster": result["roster"][found].tolist(),
+        "survived": (survival_prob > 0.5).astype(int).tolist(),
+        "survival_probability": survival_prob.tolist(),
+        "death_probability": death_prob.tolist(),
+        "risk_level": risk_levels(survival_prob).tolist(),
+        "confidence": np.maximum(survival_prob, death_prob).tolist()
+    }, separators=(',', ':')).encode()
+    return stream_response([body], request.headers.get('accept-encoding'))
+
+
+@app.post("/api/v1/passengers/similar", tags=["Predictions"])
+async def get_similar_passengers(query: SimilarPassengersInput, request: Request):
+    """
+    Most similar real passengers from the training data
+
+    For each passenger, the ``k`` nearest training passengers in the
+    models' scaled feature space (nearest first) with their outcome,
+    answered from the KD-tree stored in the model artifact. All
+    passengers are looked up in one batched query.
+    """
+    if model_trainer is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    if similar_passengers is None:
+        raise HTTPException(
+            status_code=400,
+            detail="No similar-passenger index stored in the model; retrain with train_model.py to build it"
+        )
+
+    request.state.batch_rows = len(query.passengers)
+    try:
+        columns, names, cabins = passenger_columns(query.passengers)
+        features_scaled = scaled_features(columns, names=names, cabins=cabins)
+        return {"k": min(query.k, similar_passengers.size), "results": similar_passengers.query(features_scaled, query.k)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Similar-passenger lookup error: {str(e)}")
+
+
+@app.get("/api/v1/score-index", tags=["Model"])
+async def get_score_index():
+    """Indexed rosters, their size and the model version that scored them"""
+    return {"model_version": serving_state["model_version"], **score_index.stats()}
+
+
+class BinaryBatchRoute(APIRoute):
+    """Route that only matches Arrow IPC / .npy request bodies"""
+
+    def matches(self, scope):
+        match, child_scope = super().matches(scope)
+        if match != Match.NONE and media_type(Headers(scope=scope).get('content-type')) not in BINARY_MEDIA_TYPES:
+            return Match.NONE, {}
+        return match, child_scope
+
+
+async def batch_predict_binary(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    model: Optional[str] = MODEL_QUERY
+):
+    """
+    Predict survival for a binary batch (Arrow IPC stream or .npy buffer)
+
+    The response uses the request format unless Accept names the other
+    binary format: Arrow returns survived (int8) and survival_probability
+    (float32) columns, .npy returns the float32 survival probabilities.
+    """
+    if model_trainer is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+
+    content_type = media_type(request.headers.get('content-type'))
+    body = await request.body()
+    try:
+        raw_columns = read_arrow(body) if content_type == ARROW_STREAM else read_npy(body)
+        columns = validate_columns(raw_columns)
+        request.state.batch_rows = len(columns['pclass'])
+    except BinaryFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ColumnValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors)
+    names, cabins = text_columns(raw_columns)
+
+    accept = media_type(request.headers.get('accept'))
+    output_type = accept if accept in BINARY_MEDIA_TYPES else content_type
+
+    try:
+        _, _, probabilities = score_columns(columns, model, background_tasks, names=names, cabins=cabins)
+        survival_prob = probabilities[:, 1]
+
+        if output_type == ARROW_STREAM:
+            content = write_arrow(survival_prob > probabilities[:, 0], survival_prob)
+        else:
+            content = write_npy(survival_prob)
+        return Response(content=content, media_type=output_type)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch prediction error: {str(e)}")
+
+
+# Registered ahead of the JSON route so binary bodies are dispatched here
+app.router.add_api_route(
+    "/api/v1/predict/batch",
+    batch_predict_binary,
+    methods=["POST"],
+    include_in_schema=False,
+    route_class_override=BinaryBatchRoute
+)
+
+
 @app.post("/api/v1/predict/batch", tags=["Predictions"])
-async def batch_predict(batch_input: BatchPredictionInput):
+async def batch_predict(
+    batch_input: BatchPredictionInput,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    explain: bool = Query(False, description="Include per-passenger SHAP feature contributions"),
+    model: Optional[str] = MODEL_QUERY
+):
     """
     Predict survival for multiple passengers
+
+    Also accepts Arrow IPC streams (Content-Type: application/vnd.apache.arrow.stream)
+    and .npy buffers (Content-Type: application/x-npy) with the same columns.
+
+    Large responses are streamed and compressed per Accept-Encoding
+    (zstd, br or gzip) once they exceed RESPONSE_COMPRESSION_MIN_BYTES.
     """
     if model_trainer is None:
         raise HTTPException(status_code=503, detail="Model not loaded")
     
+    request.state.batch_rows = len(batch_input.passengers)
     try:
-        predictions = []
-        for passenger in batch_input.passengers:
-            result = await predict_survival(passenger)
-            predictions.append(result.dict())
+        columns, names, cabins = passenger_columns(batch_input.passengers)
+        name, features_scaled, probabilities = score_columns(
+            columns, model, background_tasks, names=names, cabins=cabins
+        )
+        explainer, contributions = batch_contributions(name, features_scaled, explain)
         
-        return {
-            "count": len(predictions),
-            "predictions": predictions
-        }
+        rows = prediction_rows(probabilities, explainer, contributions)
+        return stream_response(json_batch_chunks(len(probabilities), rows),
+                               request.headers.get('accept-encoding'))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch prediction error: {str(e)}")
+
+
+@app.post("/api/v1/predict/batch/columnar", response_model=ColumnarBatchResponse, tags=["Predictions"])
+async def batch_predict_columnar(
+    batch_input: ColumnarBatchInput,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    model: Optional[str] = MODEL_QUERY
+):
+    """
+    Predict survival for a columnar batch
+
+    Validation runs once per field over the whole batch; invalid rows are
+    reported as indices per field with a 422.
+    """
+    if model_trainer is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+
+    request.state.batch_rows = len(batch_input.pclass)
+    raw_columns = batch_input.dict()
+    try:
+        columns = validate_columns(raw_columns)
+    except ColumnValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors)
+    names, cabins = text_columns(raw_columns)
+
+    try:
+        _, _, probabilities = score_columns(columns, model, background_tasks, names=names, cabins=cabins)
+        survival_prob = probabilities[:, 1]
+        death_prob = probabilities[:, 0]
+
+        # Bypass per-element response encoding; arrays go straight to json
+        body = json.dumps({
+            "count": int(len(survival_prob)),
+            "survived": (survival_prob > death_prob).astype(int).tolist(),
+            "survival_probability": survival_prob.tolist(),
+            "death_probability": death_prob.tolist(),
+            "risk_level": risk_levels(survival_prob).tolist(),
+            "confidence": np.maximum(survival_prob, death_prob).tolist()
+        }, separators=(',', ':')).encode()
+        return stream_response([body], request.headers.get('accept-encoding'))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Batch prediction error: {str(e)}")
 
 
+def score_job_chunk(columns: Dict, model_name: str) -> np.ndarray:
+    """
+    Probabilities for one chunk of a batch job (called from job workers)
+
+    Rows go to the prediction log like request rows, in slices no larger
+    than its buffer; workers wait up to JOB_LOG_WAIT_SECONDS for room.
+    """
+    name, model = resolve_model(model_name)
+    names, cabins = text_columns(columns)
+    features = {field: values for field, values in columns.items() if field not in TEXT_FIELDS}
+    features_scaled = scaled_features(features, names=names, cabins=cabins)
+    start = time.perf_counter()
+    probabilities = model.predict_proba(features_scaled)
+    latency_ms = (time.perf_counter() - start) * 1e3
+
+    if prediction_log is not None:
+        ts, step = time.time(), max(1, prediction_log.capacity)
+        for offset in range(0, len(probabilities), step):
+            prediction_log.log(
+                ts, name, serving_state["model_version"], latency_ms,
+                {field: values[offset:offset + step] for field, values in features.items()},
+                probabilities[offset:offset + step, 1], timeout=JOB_LOG_WAIT_SECONDS
+            )
+    return probabilities
+
+
+def job_response(job: Dict) -> Dict:
+    """Job status with links to its events and (once finished) its result"""
+    links = {"self": f"/api/v1/jobs/{job['id']}", "events": f"/api/v1/jobs/{job['id']}/events"}
+    if job["status"] == "succeeded":
+        links["result"] = f"/api/v1/jobs/{job['id']}/result"
+    return {**job, "links": links}
+
+
+def get_job_or_404(job_id: str) -> Dict:
+    try:
+        return job_queue.get(job_id)
+    except JobNotFound:
+        raise HTTPException(status_code=404, detail=f"Unknown job '{job_id}'")
+
+
+def submit_job(content_type: str, body: bytes, model_name: str) -> Dict:
+    """Decode, validate and persist a batch (runs in the threadpool)"""
+    raw_columns = read_job_input(content_type, body, model_trainer.fill_values)
+    columns = validate_columns(raw_columns)
+    names, cabins = text_columns(raw_columns)
+    return job_queue.submit({**columns, 'name': names, 'cabin': cabins}, model_name)
+
+
+@app.post("/api/v1/jobs", status_code=202, tags=["Batch Jobs"])
+async def create_batch_job(request: Request, model: Optional[str] = MODEL_QUERY):
+    """
+    Queue an asynchronous batch prediction job
+
+    The body is a batch as JSON ({"passengers": [...]} or one array per
+    field), CSV, Arrow IPC or .npy, or a multipart upload with a ``file``
+    field. Returns the job id right away; poll /api/v1/jobs/{id} or
+    subscribe to /api/v1/jobs/{id}/events, then download
+    /api/v1/jobs/{id}/result (CSV).
+    """
+    if model_trainer is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    name, _ = resolve_model(model)
+
+    content_type = media_type(request.headers.get('content-type'))
+    if content_type == 'multipart/form-data':
+        form = await request.form()
+        upload = form.get('file')
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Multipart uploads need a 'file' field")
+        body = await upload.read()
+        content_type = media_type(upload.content_type)
+        if content_type in ('', 'application/octet-stream'):
+            content_type = SUFFIX_MEDIA_TYPES.get(Path(upload.filename or '').suffix.lower(), content_type)
+    else:
+        body = await request.body()
+
+    try:
+        job = await run_in_threadpool(submit_job, content_type, body, name)
+    except JobInputError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ColumnValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors)
+    return job_response(job)
+
+
+@app.get("/api/v1/jobs", tags=["Batch Jobs"])
+async def list_batch_jobs(limit: int = Query(50, ge=1, le=1000)):
+    """Most recent batch jobs, newest first"""
+    return {"jobs": [job_response(job) for job in job_queue.list(limit)], **job_queue.stats()}
+
+
+@app.get("/api/v1/jobs/{job_id}", tags=["Batch Jobs"])
+async def get_batch_job(job_id: str):
+    """Status and progress of a batch job"""
+    return job_response(get_job_or_404(job_id))
+
+
+@app.get("/api/v1/jobs/{job_id}/events", tags=["Batch Jobs"])
+async def batch_job_events(job_id: str, interval: float = Query(0.5, ge=0.1, le=10)):
+    """Server-Sent Events stream of job status; one event per change, ends when the job finishes"""
+    get_job_or_404(job_id)
+
+    async def events():
+        last = None
+        while True:
+            try:
+                job = job_queue.get(job_id)
+            except JobNotFound:
+                yield 'event: deleted\ndata: {}\n\n'
+                return
+            state = (job["status"], job["processed"])
+            if state != last:
+                last = state
+                yield f'event: {job["status"]}\ndata: {json.dumps(job_response(job))}\n\n'
+            if job["status"] in ('succeeded', 'failed', 'cancelled'):
+                return
+            await asyncio.sleep(interval)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.get("/api/v1/jobs/{job_id}/result", tags=["Batch Jobs"])
+async def get_batch_job_result(job_id: str):
+    """Download a finished job's predictions as CSV (one row per input row, in order)"""
+    job = get_job_or_404(job_id)
+    if job["status"] != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}; results are available once it succeeds")
+    return FileResponse(job_queue.result_path(job_id), media_type="text/csv",
+                        filename=f"predictions-{job_id}.csv")
+
+
+@app.delete("/api/v1/jobs/{job_id}", tags=["Batch Jobs"])
+async def delete_batch_job(job_id: str):
+    """Cancel a queued or running job, or delete a finished one and its result"""
+    get_job_or_404(job_id)
+    try:
+        return job_response(job_queue.cancel_or_delete(job_id))
+    except JobNotFound:
+        raise HTTPException(status_code=404, detail=f"Unknown job '{job_id}'")
+
+
+@app.get("/api/v1/models", tags=["Model"])
+async def list_models():
+    """List every served model and which one is the default"""
+    if model_trainer is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+
+    return {
+        "default": model_trainer.best_model_name,
+        "models": [
+            {"name": name, "type": type(model).__name__}
+            for name, model in model_trainer.models.items()
+        ],
+        "shadow": shadow_scorer.targets(model_trainer.best_model_name, model_trainer.models)
+    }
+
+
+@app.get("/api/v1/models/selection", tags=["Model"])
+async def get_model_selection():
+    """
+    How the default model was chosen at training time
+
+    Held-out accuracy, p50/p99 latency at batch sizes 1, 100 and 10k,
+    pickled size and scoring memory of every model, which ones are on the
+    accuracy/latency Pareto front, and the objective that picked the
+    deployed model.
+    """
+    if model_trainer is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    if model_trainer.model_selection is None:
+        raise HTTPException(
+            status_code=400, detail="No selection report stored in the model; retrain with train_model.py to benchmark"
+        )
+    return model_trainer.model_selection
+
+
+@app.get("/api/v1/models/shadow", tags=["Model"])
+async def get_shadow_report():
+    """Agreement and latency of shadow models against the primary"""
+    return shadow_scorer.report()
+
+
+@app.get("/admin/profile/sample", tags=["Admin"], dependencies=[Depends(require_admin)])
+async def sample_process(
+    seconds: float = Query(10.0, gt=0, le=MAX_SAMPLE_SECONDS, description="Sampling window"),
+    interval_ms: float = Query(5.0, ge=1, le=1000, description="Sampling interval")
+):
+    """
+    Sample every thread's stack for N seconds
+
+    Returns a flamegraph-compatible collapsed-stack file
+    (flamegraph.pl / speedscope / inferno).
+    """
+    if sampling_profiler.running:
+        raise HTTPException(status_code=409, detail="A sampling session is already running")
+
+    collapsed = await run_in_threadpool(sampling_profiler.sample, seconds, interval_ms / 1e3)
+    return PlainTextResponse(
+        collapsed,
+        headers={"Content-Disposition": 'attachment; filename="profile.collapsed"'}
+    )
+
+
+@app.get("/admin/prediction-log", tags=["Admin"], dependencies=[Depends(require_admin)])
+async def get_prediction_log_stats():
+    """Prediction log buffer, drop and flush counters"""
+    if prediction_log is None:
+        return {"enabled": False}
+    return {"enabled": True, **prediction_log.stats()}
+
+
+def model_footprint() -> Optional[Dict]:
+    """Footprint of the served models and encoders, cached per model version"""
+    if model_trainer is None:
+        return None
+    if footprint_cache["version"] != serving_state["model_version"]:
+        footprint_cache.update(version=serving_state["model_version"],
+                               report=trainer_footprint(model_trainer, explainers))
+    return footprint_cache["report"]
+
+
+def memory_summary() -> str:
+    """One-line memory report for periodic logging"""
+    footprint = model_footprint()
+    return json.dumps({
+        **process_memory(),
+        "models_python_bytes": footprint["total_python_bytes"] if footprint else None,
+        "traced_bytes": allocation_tracker.status()["traced_bytes"],
+        "batch_peaks": batch_memory.report()
+    })
+
+
+memory_reporter = MemoryReporter(memory_summary)
+
+
+@app.get("/admin/memory", tags=["Admin"], dependencies=[Depends(require_admin)])
+async def get_memory_report():
+    """
+    Process RSS, per-model/encoder footprints, tracemalloc status and
+    peak RSS growth per batch-size bucket of the batch endpoints
+    """
+    footprint = await run_in_threadpool(model_footprint)
+    return {
+        "process": process_memory(),
+        "footprint": footprint,
+        "tracemalloc": allocation_tracker.status(),
+        "batch_peaks": batch_memory.report()
+    }
+
+
+@app.post("/admin/memory/tracemalloc/start", tags=["Admin"], dependencies=[Depends(require_admin)])
+async def start_tracemalloc(frames: int = Query(1, ge=1, le=50, description="Stack frames kept per allocation")):
+    """Start tracing allocations and take the baseline snapshot (adds overhead while on)"""
+    await run_in_threadpool(allocation_tracker.start, frames)
+    return allocation_tracker.status()
+
+
+@app.get("/admin/memory/tracemalloc/diff", tags=["Admin"], dependencies=[Depends(require_admin)])
+async def diff_tracemalloc(
+    limit: int = Query(25, ge=1, le=500),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    rebase: bool = Query(False, description="Make this snapshot the new baseline")
+):
+    """Top allocation sites by growth since the baseline snapshot"""
+    try:
+        sites = await run_in_threadpool(allocation_tracker.diff, limit, group_by, rebase)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {**allocation_tracker.status(), "sites": sites}
+
+
+@app.post("/admin/memory/tracemalloc/stop", tags=["Admin"], dependencies=[Depends(require_admin)])
+async def stop_tracemalloc():
+    """Stop tracing and drop the baseline"""
+    allocation_tracker.stop()
+    return allocation_tracker.status()
+
+
 @app.get("/api/v1/model/info", response_model=ModelInfo, tags=["Model"])
 async def get_model_info():
     """Get information about the loaded model"""
@@ -325,26 +1343,101 @@ async def get_model_metrics():
 
 
 @app.get("/api/v1/visualizations/feature-importance", tags=["Visualizations"])
-async def get_feature_importance():
-    """Get feature importance data for visualization"""
+async def get_feature_importance(
+    model: Optional[str] = MODEL_QUERY,
+    kind: Optional[str] = Query(
+        None, description="permutation, coefficient or native (default: native when available, else permutation)"
+    )
+):
+    """Get feature importance data for visualization (precomputed at training time)"""
     if model_trainer is None:
         raise HTTPException(status_code=503, detail="Model not loaded")
     
-    if not hasattr(model_trainer.best_model, 'feature_importances_'):
-        raise HTTPException(status_code=400, detail="Model doesn't support feature importance")
+    name, _ = resolve_model(model)
+    importances = model_trainer.importances.get(name, {})
+    if not importances:
+        raise HTTPException(
+            status_code=400,
+            detail=f"No importances stored for '{name}'; retrain with train_model.py to compute them"
+        )
     
-    importance = model_trainer.best_model.feature_importances_
-    indices = np.argsort(importance)[::-1]
+    kind = kind or default_importance_kind(importances)
+    if kind not in importances:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No '{kind}' importances for '{name}'. Available: {sorted(importances)}"
+        )
     
     return {
-        "features": [
-            {
-                "name": model_trainer.feature_names[i],
-                "importance": float(importance[i])
-            }
-            for i in indices
-        ]
+        "model": name,
+        "kind": kind,
+        "available": sorted(importances),
+        "features": importances[kind]
+    }
+
+
+def split_levels(raw: Optional[str]) -> Optional[list]:
+    return [value.strip() for value in raw.split(',') if value.strip()] if raw else None
+
+
+@app.get("/api/v1/cohorts", tags=["Visualizations"])
+async def get_cohorts(
+    group_by: Optional[str] = Query(
+        None, description="Comma-separated dimensions: pclass, sex, embarked, age_group, fare_bin"
+    ),
+    pclass: Optional[str] = Query(None, description="Keep only these classes, e.g. 1,2"),
+    sex: Optional[str] = Query(None, description="female and/or male"),
+    embarked: Optional[str] = Query(None, description="C, Q and/or S"),
+    age_group: Optional[str] = Query(None, description="Child, Teen, Adult, Middle and/or Senior"),
+    fare_bin: Optional[str] = Query(None, description="Very_Low, Low, Medium, High and/or Very_High")
+):
+    """
+    Survival statistics of the training passengers, rolled up on demand
+
+    Answered from the cohort cube precomputed at training time: passenger
+    count, survivors, survival rate and the served model's mean predicted
+    probability per combination of the ``group_by`` dimensions.
+    """
+    if model_trainer is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    if cohort_cube is None:
+        raise HTTPException(
+            status_code=400, detail="No cohort cube stored in the model; retrain with train_model.py to compute it"
+        )
+
+    filters = {
+        name: values for name, values in (
+            ("pclass", split_levels(pclass)), ("sex", split_levels(sex)), ("embarked", split_levels(embarked)),
+            ("age_group", split_levels(age_group)), ("fare_bin", split_levels(fare_bin))
+        ) if values
     }
+    if "pclass" in filters:
+        try:
+            filters["pclass"] = [int(value) for value in filters["pclass"]]
+        except ValueError:
+            raise HTTPException(status_code=422, detail="pclass levels must be 1, 2 or 3")
+
+    try:
+        rollup = cohort_cube.rollup(split_levels(group_by) or [], filters)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    rollup["model"] = model_trainer.best_model_name
+    return rollup
+
+
+@app.get("/api/v1/visualizations/plot-data", tags=["Visualizations"])
+async def get_plot_data():
+    """Confusion matrix, ROC points and importances written by the training visualization stage"""
+    plot_data_path = MODEL_PATH.parent / "visualizations" / "plot_data.json"
+    if not plot_data_path.exists():
+        raise HTTPException(status_code=404, detail="No plot data; run train_model.py without --visualize skip")
+
+    with open(plot_data_path) as f:
+        data = json.load(f)
+    checksum = data.get("model_checksum") or ""
+    data["stale"] = serving_state["model_version"] is not None and \
+        not checksum.startswith(serving_state["model_version"])
+    return data
 
 
 if __name__ == "__main__":
@@ -0,0 +1,340 @@
+"""
+Memory instrumentation for the serving process
+
+Process RSS (current and peak), per-object footprints of the loaded
+models and encoders, tracemalloc allocation-site diffs between two
+snapshots, and peak memory per batch-size bucket. Peak RSS comes from
+/proc (VmHWM, reset through /proc/self/clear_refs before each tracked
+batch); the peak before every reset is kept, so the process-lifetime
+peak survives the resets. Elsewhere only start/end RSS deltas are
+available.
+"""
+
+import os
+import pickle
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+import types
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Upper bounds of the batch-size buckets; larger batches go in the last one
+BATCH_BUCKETS = [1, 10, 100, 1000, 10_000, 100_000]
+
+_SKIPPED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+                  types.MethodType, types.CodeType, types.FrameType)
+
+# Highest kernel peak seen before a reset_peak_rss
+_retired_peak = 0
+_peak_lock = threading.Lock()
+
+
+def _proc_status_bytes(field: str) -> Optional[int]:
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def rss_bytes() -> Optional[int]:
+    """Current resident set size"""
+    return _proc_status_bytes('VmRSS')
+
+
+def peak_rss_since_reset_bytes() -> int:
+    """Kernel peak resident set size since start or the last ``reset_peak_rss``"""
+    peak = _proc_status_bytes('VmHWM')
+    if peak is not None:
+        return peak
+    # ru_maxrss is KB on Linux, bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size over the process lifetime, across resets"""
+    with _peak_lock:
+        return max(peak_rss_since_reset_bytes(), _retired_peak)
+
+
+def reset_peak_rss() -> bool:
+    """Reset the kernel's peak RSS counter to the current RSS (Linux 4.0+)"""
+    global _retired_peak
+    with _peak_lock:
+        peak = peak_rss_since_reset_bytes()
+        try:
+            with open('/proc/self/clear_refs', 'w') as f:
+                f.write('5')
+        except OSError:
+            return False
+        _retired_peak = max(_retired_peak, peak)
+        return True
+
+
+def process_memory() -> Dict:
+    return {
+        "rss_bytes": rss_bytes(),
+        "peak_rss_bytes": peak_rss_bytes(),
+        "peak_rss_since_reset_bytes": peak_rss_since_reset_bytes(),
+        "pid": os.getpid()
+    }
+
+
+def deep_sizeof(obj) -> int:
+    """
+    Bytes reachable from ``obj`` through attributes and containers
+
+    NumPy buffers are counted once (views charge their base), and
+    extension objects without a ``__dict__`` (e.g. sklearn trees) are
+    walked through ``__getstate__``. Memory held by native libraries
+    (XGBoost/LightGBM boosters) is invisible here; see the serialized size.
+    """
+    seen = set()
+    # __getstate__ results are temporaries; keep them alive so ids aren't reused
+    states = []
+    stack = [obj]
+    total = 0
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, _SKIPPED_TYPES):
+            continue
+        seen.add(id(current))
+
+        if isinstance(current, np.ndarray):
+            total += sys.getsizeof(current)
+            if isinstance(current.base, np.ndarray):
+                stack.append(current.base)
+            elif current.base is not None:
+                # Buffer owned by a foreign object (e.g. a Cython tree)
+                total += current.nbytes
+            continue
+
+        total += sys.getsizeof(current)
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        elif isinstance(current, (str, bytes, bytearray, int, float, complex, bool)):
+            continue
+        elif hasattr(current, '__dict__'):
+            stack.append(vars(current))
+        elif type(current).__module__ != 'builtins':
+            try:
+                state = current.__getstate__()
+            except Exception:
+                state = None
+            if state is not None:
+                states.append(state)
+                stack.append(state)
+    return total
+
+
+def footprint(obj) -> Dict:
+    """In-memory and pickled size of one object"""
+    try:
+        serialized = len(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        serialized = None
+    return {
+        "type": type(obj).__name__,
+        "python_bytes": deep_sizeof(obj),
+        "serialized_bytes": serialized
+    }
+
+
+def trainer_footprint(trainer, explainers: Dict = None) -> Dict:
+    """Footprint of every model, the scaler, each label encoder and the explainers"""
+    report = {
+        "models": {name: footprint(model) for name, model in trainer.models.items()},
+        "scaler": footprint(trainer.scaler),
+        "label_encoders": {name: footprint(encoder) for name, encoder in trainer.label_encoders.items()},
+        "explainers": {name: footprint(explainer) for name, explainer in (explainers or {}).items()}
+    }
+    report["total_python_bytes"] = (
+        sum(entry["python_bytes"] for entry in report["models"].values())
+        + report["scaler"]["python_bytes"]
+        + sum(entry["python_bytes"] for entry in report["label_encoders"].values())
+        + sum(entry["python_bytes"] for entry in report["explainers"].values())
+    )
+    return report
+
+
+class AllocationTracker:
+    """tracemalloc with a baseline snapshot to diff against"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.baseline = None
+        self.baseline_at = None
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 1):
+        """Start tracing (if needed) and take the baseline"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self.rebase()
+
+    def stop(self):
+        tracemalloc.stop()
+        self.baseline = self.baseline_at = None
+
+    @staticmethod
+    def _snapshot():
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<unknown>')
+        ])
+
+    def rebase(self):
+        with self._lock:
+            self.baseline = self._snapshot()
+            self.baseline_at = time.time()
+
+    def diff(self, limit: int = 25, group_by: str = 'lineno', rebase: bool = False) -> List[Dict]:
+        """Top allocation sites by growth since the baseline"""
+        if not tracemalloc.is_tracing() or self.baseline is None:
+            raise RuntimeError("tracemalloc is not running; start it first")
+        current = self._snapshot()
+        with self._lock:
+            stats = current.compare_to(self.baseline, group_by)
+            if rebase:
+                self.baseline, self.baseline_at = current, time.time()
+        return [
+            {
+                "site": ' <- '.join(f"{frame.filename}:{frame.lineno}" for frame in stat.traceback),
+                "size_diff_bytes": stat.size_diff,
+                "size_bytes": stat.size,
+                "count_diff": stat.count_diff,
+                "count": stat.count
+            }
+            for stat in stats[:limit]
+        ]
+
+    def status(self) -> Dict:
+        traced, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        return {
+            "tracing": tracemalloc.is_tracing(),
+            "frames": tracemalloc.get_traceback_limit() if tracemalloc.is_tracing() else None,
+            "traced_bytes": traced,
+            "peak_traced_bytes": peak,
+            "baseline_at": self.baseline_at
+        }
+
+
+def batch_bucket(rows: int) -> str:
+    for bound in BATCH_BUCKETS:
+        if rows <= bound:
+            return f"<={bound}"
+    return f">{BATCH_BUCKETS[-1]}"
+
+
+class BatchMemoryTracker:
+    """
+    Peak RSS growth per endpoint and batch-size bucket
+
+    The kernel peak counter is reset when a request starts with no other
+    tracked request in flight, so its peak is exact; requests that overlap
+    another only see their end-minus-start RSS (a lower bound) and are
+    counted as ``overlapped``. ``begin``/``finish`` bracket requests whose
+    body is produced after the handler returns (streamed responses).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active = 0
+        self._stats = {}
+
+    def begin(self, endpoint: str) -> Dict:
+        """Start measuring a request; the caller sets ``sample['rows']`` once known"""
+        with self._lock:
+            self._active += 1
+            exclusive = self._active == 1 and reset_peak_rss()
+        return {"endpoint": endpoint, "rows": None, "exclusive": exclusive,
+                "start": rss_bytes() or 0, "finished": False}
+
+    def finish(self, sample: Dict):
+        """Record the request's peak; later calls for the same sample are ignored"""
+        end = rss_bytes() or 0
+        with self._lock:
+            if sample["finished"]:
+                return
+            sample["finished"] = True
+            self._active -= 1
+            peak = (peak_rss_since_reset_bytes() if sample["exclusive"] else end) - sample["start"]
+            if sample["rows"] is not None:
+                self._record(sample["endpoint"], sample["rows"], max(peak, 0), sample["exclusive"])
+
+    def _record(self, endpoint: str, rows: int, peak: int, exclusive: bool):
+        entry = self._stats.setdefault(endpoint, {}).setdefault(batch_bucket(rows), {
+            "requests": 0,
+            "overlapped": 0,
+            "max_rows": 0,
+            "peak_bytes_max": 0,
+            "peak_bytes_sum": 0,
+            "last_peak_bytes": 0
+        })
+        entry["requests"] += 1
+        entry["overlapped"] += not exclusive
+        entry["max_rows"] = max(entry["max_rows"], rows)
+        entry["peak_bytes_max"] = max(entry["peak_bytes_max"], peak)
+        entry["peak_bytes_sum"] += peak
+        entry["last_peak_bytes"] = peak
+
+    def report(self) -> Dict:
+        with self._lock:
+            return {
+                endpoint: {
+                    bucket: {
+                        **{key: value for key, value in entry.items() if key != "peak_bytes_sum"},
+                        "peak_bytes_mean": entry["peak_bytes_sum"] // entry["requests"]
+                    }
+                    for bucket, entry in sorted(buckets.items(), key=lambda item: _bucket_order(item[0]))
+                }
+                for endpoint, buckets in self._stats.items()
+            }
+
+
+def _bucket_order(label: str) -> int:
+    bound = int(label.lstrip('<=>'))
+    return bound + (label.startswith('>'))
+
+
+class MemoryReporter:
+    """Periodically prints process memory and batch peaks (MEMORY_LOG_INTERVAL_SECONDS)"""
+
+    def __init__(self, summary, interval: float = None):
+        self.summary = summary
+        self.interval = float(os.getenv('MEMORY_LOG_INTERVAL_SECONDS', '0')) if interval is None else interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.interval <= 0:
+            return
+        self._thread = threading.Thread(target=self._run, name="memory-reporter", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                print(f"🧠 Memory: {self.summary()}")
+            except Exception as e:
+                print(f"⚠️  Memory report failed - {e}")
@@ -0,0 +1,317 @@
+"""
+Asynchronous prediction log for auditing and retraining
+
+Requests append one record per call to an in-memory ring buffer (a
+deque append bounded by buffered rows, no I/O); a background thread
+drains it and writes rows in bulk to rotating SQLite databases or
+Parquet files. Rows that do not fit the buffer, or whose flush fails,
+are counted as dropped. Batch-job workers log their chunks too, waiting
+briefly for room instead of dropping.
+
+Several workers may share one log directory: file names carry the
+writer's pid and a per-process token, and retention never deletes the
+file a live writer still has open.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from backend.jobs import process_alive
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+COLUMNS = ['ts', 'model', 'model_version', 'latency_ms', 'pclass', 'sex_male', 'age',
+           'sibsp', 'parch', 'fare', 'embarked', 'survival_probability']
+
+# One schema for every Parquet row group, whatever dtypes a request's columns arrived in
+PARQUET_SCHEMA = pa.schema([
+    ('ts', pa.float64()), ('model', pa.string()), ('model_version', pa.string()),
+    ('latency_ms', pa.float64()), ('pclass', pa.int64()), ('sex_male', pa.int64()),
+    ('age', pa.float64()), ('sibsp', pa.int64()), ('parch', pa.int64()), ('fare', pa.float64()),
+    ('embarked', pa.string()), ('survival_probability', pa.float64())
+]) if HAS_PYARROW else None
+
+# predictions-<stamp>-<pid>-<token>-<counter>.<suffix>
+LOG_FILE_PATTERN = re.compile(r'^predictions-\d{8}-\d{6}-(\d+)-([0-9a-f]+)-(\d+)\.(?:db|parquet)$')
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    ts REAL, model TEXT, model_version TEXT, latency_ms REAL,
+    pclass INTEGER, sex_male INTEGER, age REAL, sibsp INTEGER, parch INTEGER,
+    fare REAL, embarked TEXT, survival_probability REAL
+)
+"""
+
+
+class _SQLiteSink:
+    suffix = '.db'
+
+    def __init__(self, path: Path):
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute(SQLITE_SCHEMA)
+
+    def write(self, columns: Dict[str, list]):
+        rows = zip(*(columns[name] for name in COLUMNS))
+        with self.conn:
+            self.conn.executemany(f"INSERT INTO predictions VALUES ({','.join('?' * len(COLUMNS))})", rows)
+
+    def close(self):
+        self.conn.close()
+
+
+class _ParquetSink:
+    suffix = '.parquet'
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.writer = None
+
+    def write(self, columns: Dict[str, list]):
+        table = pa.table({name: columns[name] for name in COLUMNS}, schema=PARQUET_SCHEMA)
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(str(self.path), PARQUET_SCHEMA)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+class PredictionLogWriter:
+    """Ring-buffered, bulk-flushing prediction log"""
+
+    def __init__(self, backend: str, directory, capacity: int = 10000, flush_records: int = 512,
+                 flush_seconds: float = 1.0, rotate_rows: int = 1_000_000, retention_files: int = 0):
+        if backend not in ('sqlite', 'parquet'):
+            raise ValueError(f"Unknown prediction log backend '{backend}'")
+        if backend == 'parquet' and not HAS_PYARROW:
+            raise ImportError("pyarrow is required for the parquet prediction log")
+
+        self.backend = backend
+        self.directory = Path(directory)
+        self.capacity = capacity
+        self.flush_records = flush_records
+        self.flush_seconds = flush_seconds
+        self.rotate_rows = rotate_rows
+        self.retention_files = retention_files
+        self.token = uuid.uuid4().hex[:8]
+
+        self._buffer = deque()
+        self._buffered_rows = 0
+        self._lock = threading.Lock()
+        self._space = threading.Condition(self._lock)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._sink = None
+        self._sink_path = None
+        self._sink_rows = 0
+
+        self.dropped_rows = 0
+        self.dropped_requests = 0
+        self.written_rows = 0
+        self.flushes = 0
+        self.files = 0
+        self.pruned_files = 0
+        self.last_error = None
+
+    @classmethod
+    def from_env(cls) -> Optional['PredictionLogWriter']:
+        """Build from PREDICTION_LOG* settings; None when logging is off"""
+        backend = os.getenv('PREDICTION_LOG', '').strip().lower()
+        if backend in ('', 'off', 'none'):
+            return None
+        return cls(
+            backend,
+            os.getenv('PREDICTION_LOG_DIR', str(Path(__file__).parent.parent / 'logs' / 'predictions')),
+            capacity=int(os.getenv('PREDICTION_LOG_BUFFER', '10000')),
+            flush_records=int(os.getenv('PREDICTION_LOG_FLUSH_RECORDS', '512')),
+            flush_seconds=float(os.getenv('PREDICTION_LOG_FLUSH_SECONDS', '1.0')),
+            rotate_rows=int(os.getenv('PREDICTION_LOG_ROTATE_ROWS', '1000000')),
+            retention_files=int(os.getenv('PREDICTION_LOG_RETENTION_FILES', '0'))
+        )
+
+    def log(self, ts: float, model: str, model_version: str, latency_ms: float,
+            columns: Dict, survival_prob, timeout: float = 0.0) -> bool:
+        """
+        Queue one request's predictions; never touches disk
+
+        ``columns`` are the request's feature columns (see
+        ``backend.features.validate_columns``). ``capacity`` bounds the
+        buffered rows, so a request that would exceed it (including one
+        batch larger than the whole buffer) is dropped: returns False and
+        counts its rows as dropped. Requests never block (``timeout`` 0);
+        background callers such as batch jobs may wait up to ``timeout``
+        seconds for a flush to make room.
+        """
+        rows = len(survival_prob)
+        deadline = time.monotonic() + timeout
+        with self._space:
+            while self._buffered_rows + rows > self.capacity:
+                remaining = deadline - time.monotonic()
+                if rows > self.capacity or remaining <= 0:
+                    self.dropped_rows += rows
+                    self.dropped_requests += 1
+                    return False
+                self._wake.set()
+                self._space.wait(remaining)
+            self._buffered_rows += rows
+        self._buffer.append((ts, model, model_version, latency_ms, columns, survival_prob))
+        if len(self._buffer) >= self.flush_records:
+            self._wake.set()
+        return True
+
+    def start(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="prediction-log", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Flush everything still buffered and close the current file"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            self.flush()
+        self.flush()
+
+    def _expand(self, records) -> Dict[str, list]:
+        """Turn per-request records into one list per log field"""
+        parts = {name: [] for name in COLUMNS}
+        for ts, model, model_version, latency_ms, columns, survival_prob in records:
+            n = len(survival_prob)
+            parts['ts'].extend([ts] * n)
+            parts['model'].extend([model] * n)
+            parts['model_version'].extend([model_version] * n)
+            parts['latency_ms'].extend([latency_ms] * n)
+            # Cast per field: the same log must hold rows from JSON, float32 .npy and Arrow requests
+            for name, kind in (('pclass', int), ('age', float), ('sibsp', int), ('parch', int),
+                               ('fare', float), ('survival_probability', float)):
+                values = survival_prob if name == 'survival_probability' else columns[name]
+                values = values.tolist() if isinstance(values, np.ndarray) else values
+                parts[name].extend(kind(value) for value in values)
+            parts['sex_male'].extend(int(male) for male in columns['sex_male'])
+            parts['embarked'].extend(
+                'Q' if q else 'S' if s else 'C'
+                for q, s in zip(columns['embarked_q'], columns['embarked_s'])
+            )
+        return parts
+
+    def _rotate(self):
+        if self._sink is not None:
+            self._sink.close()
+        sink_cls = _SQLiteSink if self.backend == 'sqlite' else _ParquetSink
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        path = self.directory / f"predictions-{stamp}-{os.getpid()}-{self.token}-{self.files:04d}{sink_cls.suffix}"
+        self._sink = sink_cls(path)
+        self._sink_path = path
+        self._sink_rows = 0
+        self.files += 1
+        if self.retention_files > 0:
+            try:
+                self.prune()
+            except OSError as e:
+                # Another worker may be pruning the same directory; retry on the next rotation
+                self.last_error = str(e)
+
+    def prune(self) -> int:
+        """
+        Delete the oldest log files beyond ``retention_files``
+
+        Files still open are kept: this writer's current file and the
+        newest file of every other writer whose process is alive.
+        Returns the number of files deleted.
+        """
+        files = []
+        newest = {}
+        for path in self.directory.glob('predictions-*'):
+            match = LOG_FILE_PATTERN.match(path.name)
+            if match is None:
+                continue
+            pid, token, counter = int(match.group(1)), match.group(2), int(match.group(3))
+            files.append((path, pid, token, counter))
+            if counter >= newest.get((pid, token), -1):
+                newest[(pid, token)] = counter
+
+        def in_use(pid, token, counter):
+            if (pid, token) == (os.getpid(), self.token):
+                return False
+            return counter == newest[(pid, token)] and process_alive(pid)
+
+        closed = [path for path, pid, token, counter in files
+                  if path != self._sink_path and not in_use(pid, token, counter)]
+        closed.sort(key=lambda path: path.name)  # oldest rotation stamp first
+        excess = len(files) - self.retention_files
+        removed = 0
+        for path in closed[:max(excess, 0)]:
+            for part in (path, path.with_name(path.name + '-wal'), path.with_name(path.name + '-shm')):
+                part.unlink(missing_ok=True)
+            removed += 1
+        self.pruned_files += removed
+        return removed
+
+    def flush(self):
+        """Write every buffered record in one bulk operation"""
+        records = []
+        while self._buffer:
+            records.append(self._buffer.popleft())
+        if not records:
+            return
+        rows = sum(len(record[-1]) for record in records)
+        with self._space:
+            self._buffered_rows -= rows
+            self._space.notify_all()
+
+        try:
+            columns = self._expand(records)
+            if self._sink is None or self._sink_rows >= self.rotate_rows:
+                self._rotate()
+            self._sink.write(columns)
+            self._sink_rows += rows
+            self.written_rows += rows
+            self.flushes += 1
+        except Exception as e:
+            # The records are already out of the buffer; count them rather than lose them silently
+            self.dropped_rows += rows
+            self.dropped_requests += len(records)
+            self.last_error = str(e)
+
+    def stats(self) -> Dict:
+        return {
+            "backend": self.backend,
+            "directory": str(self.directory),
+            "buffered_records": len(self._buffer),
+            "buffered_rows": self._buffered_rows,
+            "capacity_rows": self.capacity,
+            "dropped_rows": self.dropped_rows,
+            "dropped_requests": self.dropped_requests,
+            "written_rows": self.written_rows,
+            "flushes": self.flushes,
+            "files": self.files,
+            "pruned_files": self.pruned_files,
+            "last_error": self.last_error
+        }
@@ -0,0 +1,77 @@
+"""
+Request profiling and whole-process sampling profiler
+"""
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List
+
+# Longest sampling window accepted by the admin endpoint
+MAX_SAMPLE_SECONDS = 120
+
+
+def profile_summary(profiler: cProfile.Profile, limit: int = 25) -> List[Dict]:
+    """Top functions of a cProfile run, by cumulative time"""
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, func), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            "function": f"{func} ({os.path.basename(filename)}:{line})",
+            "ncalls": ncalls,
+            "tottime_ms": round(tottime * 1e3, 3),
+            "cumtime_ms": round(cumtime * 1e3, 3)
+        })
+    rows.sort(key=lambda row: row["cumtime_ms"], reverse=True)
+    return rows[:limit]
+
+
+class SamplingProfiler:
+    """
+    Low-overhead stack sampler for every thread in the process
+
+    Periodically snapshots ``sys._current_frames()`` and aggregates the
+    stacks into flamegraph.pl "collapsed" format.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    @staticmethod
+    def _frame_label(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(';', ':')
+
+    def sample(self, seconds: float, interval: float = 0.005) -> str:
+        """Sample all threads for ``seconds``; returns collapsed stacks"""
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A sampling session is already running")
+        try:
+            own_thread = threading.get_ident()
+            counts = Counter()
+            deadline = time.monotonic() + seconds
+
+            while time.monotonic() < deadline:
+                names = {t.ident: t.name for t in threading.enumerate()}
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_thread:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        stack.append(self._frame_label(frame))
+                        frame = frame.f_back
+                    stack.append(names.get(thread_id, str(thread_id)))
+                    counts[';'.join(reversed(stack))] += 1
+                time.sleep(interval)
+
+            return ''.join(f"{stack} {count}\n" for stack, count in counts.most_common())
+        finally:
+            self._lock.release()
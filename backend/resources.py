@@ -0,0 +1,130 @@
+"""
+CPU budget planning for multi-worker deployments
+
+Every uvicorn worker loads its own XGBoost, LightGBM, OpenMP and BLAS
+runtimes, each of which sizes its thread pool to the whole machine. The
+planner detects the CPUs this container may actually use (affinity and
+cgroup v1/v2 quota), splits them across WEB_CONCURRENCY workers and caps
+every native pool in this worker at its share.
+"""
+
+import math
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+try:
+    from threadpoolctl import threadpool_info, threadpool_limits
+    HAS_THREADPOOLCTL = True
+except ImportError:
+    HAS_THREADPOOLCTL = False
+
+CGROUP_ROOT = Path('/sys/fs/cgroup')
+
+# Read by OpenMP/BLAS runtimes that load after startup (and by subprocesses)
+THREAD_ENV_VARS = ['OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+                   'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS']
+
+
+def _read(path: Path) -> Optional[str]:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_quota(root: Path = CGROUP_ROOT) -> Optional[Tuple[float, str]]:
+    """CPU quota in cores from cgroup v2 cpu.max or v1 CFS files, with its source"""
+    cpu_max = _read(root / 'cpu.max')
+    if cpu_max:
+        quota, _, period = cpu_max.partition(' ')
+        if quota != 'max' and period:
+            return int(quota) / int(period), 'cgroup v2 cpu.max'
+        return None
+
+    for directory in ('cpu', 'cpu,cpuacct', 'cpuacct,cpu'):
+        quota = _read(root / directory / 'cpu.cfs_quota_us')
+        period = _read(root / directory / 'cpu.cfs_period_us')
+        if quota and period:
+            if int(quota) > 0:
+                return int(quota) / int(period), 'cgroup v1 cpu.cfs_quota_us'
+            return None
+    return None
+
+
+def available_cpus() -> Dict:
+    """CPUs this process can use: the smaller of its affinity mask and cgroup quota"""
+    host = os.cpu_count() or 1
+    try:
+        affinity = len(os.sched_getaffinity(0))
+    except AttributeError:
+        affinity = host
+
+    cpus, source = affinity, 'affinity'
+    quota = cgroup_cpu_quota()
+    if quota is not None:
+        quota_cores, quota_source = quota
+        # Round down: a fractional share still gets throttled at the quota
+        if max(1, math.floor(quota_cores)) < cpus:
+            cpus, source = max(1, math.floor(quota_cores)), quota_source
+
+    override = os.getenv('SERVING_CPUS', '').strip()
+    if override:
+        cpus, source = max(1, int(override)), 'SERVING_CPUS'
+
+    return {
+        "available": cpus,
+        "source": source,
+        "host": host,
+        "affinity": affinity,
+        "cgroup_quota": round(quota[0], 3) if quota else None
+    }
+
+
+def plan_resources() -> Dict:
+    """
+    Split available CPUs across workers and thread pools
+
+    WEB_CONCURRENCY is the number of uvicorn workers sharing the
+    container (uvicorn reads the same variable for --workers).
+    SERVING_THREADS, when set, overrides the per-call model thread count.
+    """
+    cpus = available_cpus()
+    workers = max(1, int(os.getenv('WEB_CONCURRENCY', '').strip() or 1))
+    threads = max(1, cpus["available"] // workers)
+
+    explicit = os.getenv('SERVING_THREADS', '').strip()
+    model_threads = max(1, int(explicit)) if explicit else threads
+
+    return {
+        "cpus": cpus,
+        "workers": workers,
+        "threads_per_worker": threads,
+        "model_threads": model_threads,
+        "native_threads": threads,
+        "oversubscribed": workers * model_threads > cpus["available"],
+        "applied": False,
+        "threadpools": []
+    }
+
+
+def apply_plan(plan: Dict) -> Dict:
+    """
+    Cap OpenMP and BLAS pools for this worker
+
+    Pools already loaded are limited through threadpoolctl; the
+    environment variables cover runtimes loaded later. Model-level
+    ``n_jobs`` is applied separately (see ``backend.ensemble``).
+    """
+    threads = str(plan["native_threads"])
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = threads
+
+    if HAS_THREADPOOLCTL:
+        threadpool_limits(limits=plan["native_threads"])
+        plan["threadpools"] = [
+            {key: pool.get(key) for key in ('user_api', 'internal_api', 'num_threads', 'prefix')}
+            for pool in threadpool_info()
+        ]
+    plan["applied"] = True
+    return plan
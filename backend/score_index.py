@@ -0,0 +1,327 @@
+"""
+Precomputed predictions for known passenger rosters
+
+Each roster CSV (Kaggle format, keyed by PassengerId) is scored once and
+stored as a sorted int64 id array plus a float32 survival-probability
+column, both memory-mapped on load. Lookups are a binary search
+(``np.searchsorted``) over the ids. Every index records the checksum of
+the model that produced it and is rebuilt when the served model changes.
+Workers sharing the index directory build under an exclusive lock, so
+one builds and the others open its result.
+
+Usage: python -m backend.score_index ROSTER.csv [...] [--model PATH] [--index-dir DIR]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.features import PASSENGER_FIELDS, trainer_features, validate_columns
+
+ROOT = Path(__file__).parent.parent
+DEFAULT_INDEX_DIR = ROOT / 'data' / 'score_index'
+DEFAULT_ROSTERS = [ROOT / 'train.csv', ROOT / 'test.csv']
+
+INDEX_VERSION = 1
+
+# Attempts per roster before refresh gives up on it until the next model load
+BUILD_ATTEMPTS = 3
+BUILD_RETRY_SECONDS = 1.0
+
+
+def model_checksum(model_path) -> str:
+    """Short model checksum, the same one the API reports as model_version"""
+    return hashlib.sha256(Path(model_path).read_bytes()).hexdigest()[:12]
+
+
+def roster_paths() -> List[Path]:
+    """Rosters from SCORE_INDEX_ROSTERS (comma separated; "off" disables)"""
+    raw = os.getenv('SCORE_INDEX_ROSTERS')
+    if raw is None:
+        return [path for path in DEFAULT_ROSTERS if path.exists()]
+    if raw.strip().lower() in ('', 'off', 'none'):
+        return []
+    return [Path(path.strip()) for path in raw.split(',') if path.strip()]
+
+
+def index_dir_name(roster_path) -> str:
+    """Index directory of a roster: its file stem plus a hash of its resolved path"""
+    roster_path = Path(roster_path)
+    digest = hashlib.sha256(str(roster_path.resolve()).encode()).hexdigest()[:8]
+    return f"{roster_path.stem}-{digest}"
+
+
+def roster_names(rosters: List[Path]) -> Dict[Path, str]:
+    """Names rosters are looked up by: the file stem, or the index directory name when stems clash"""
+    stems = Counter(Path(path).stem for path in rosters)
+    return {path: Path(path).stem if stems[Path(path).stem] == 1 else index_dir_name(path) for path in rosters}
+
+
+@contextmanager
+def index_lock(index_dir):
+    """Exclusive lock on ``index_dir/.lock`` (a no-op where flock is unavailable)"""
+    index_dir = Path(index_dir)
+    index_dir.mkdir(parents=True, exist_ok=True)
+    with open(index_dir / '.lock', 'a') as lock_file:
+        if HAS_FCNTL:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if HAS_FCNTL:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def roster_columns(frame: pd.DataFrame, fill_values: Dict = None):
+    """
+    Validated passenger columns, names and cabins of a Kaggle-format roster
+
+    Missing Age/Fare/Embarked are filled with the trainer's training-set
+    values (or the roster's own medians) so every listed passenger gets
+    a score.
+    """
+    frame = frame.rename(columns=str.lower)
+    missing = [field for field in PASSENGER_FIELDS + ['passengerid'] if field not in frame.columns]
+    if missing:
+        raise ValueError(f"Roster is missing columns: {missing}")
+
+    fill_values = fill_values or {}
+    frame['age'] = frame['age'].fillna(fill_values.get('Age', frame['age'].median()))
+    frame['fare'] = frame['fare'].fillna(fill_values.get('Fare', frame['fare'].median()))
+    frame['embarked'] = frame['embarked'].fillna(fill_values.get('Embarked', 'S'))
+
+    columns = validate_columns({
+        field: frame[field].to_numpy(dtype=str) if frame[field].dtype.kind not in 'biuf'
+        else frame[field].to_numpy()
+        for field in PASSENGER_FIELDS
+    })
+    names = frame['name'].fillna('Unknown').tolist() if 'name' in frame.columns else None
+    cabins = frame['cabin'].tolist() if 'cabin' in frame.columns else None
+    return frame['passengerid'].to_numpy(dtype=np.int64), columns, names, cabins
+
+
+def current_index(path, model_version: str, name: str = None) -> Optional['ScoreIndex']:
+    """The index at ``path`` if it was built by ``model_version`` in the current layout"""
+    if not (Path(path) / 'meta.json').exists():
+        return None
+    index = ScoreIndex(path, name)
+    if index.model_version != model_version or index.meta.get('index_version') != INDEX_VERSION:
+        return None
+    return index
+
+
+def load_or_build_index(roster_path, trainer, model, model_version: str, index_dir=DEFAULT_INDEX_DIR,
+                        name: str = None) -> Tuple['ScoreIndex', bool]:
+    """
+    A roster's index for ``model_version``, built when missing or stale
+
+    Returns (index, whether it was built here). Building holds
+    ``index_lock`` and re-checks under it, so when several workers start
+    together only the first builds; the rest open the finished index.
+    """
+    path = Path(index_dir) / index_dir_name(roster_path)
+    index = current_index(path, model_version, name)
+    if index is not None:
+        return index, False
+    with index_lock(index_dir):
+        index = current_index(path, model_version, name)
+        if index is not None:
+            return index, False
+        return build_index(roster_path, trainer, model, model_version, index_dir, name), True
+
+
+def build_index(roster_path, trainer, model, model_version: str, index_dir=DEFAULT_INDEX_DIR,
+                name: str = None) -> 'ScoreIndex':
+    """Score a roster and write its index, replacing any previous one (callers hold ``index_lock``)"""
+    roster_path = Path(roster_path)
+    ids, columns, names, cabins = roster_columns(pd.read_csv(roster_path), trainer.fill_values)
+    if len(np.unique(ids)) != len(ids):
+        raise ValueError(f"{roster_path} has duplicate PassengerIds")
+
+    survival_prob = model.predict_proba(trainer_features(trainer, columns, names, cabins))[:, 1]
+    order = np.argsort(ids, kind='stable')
+
+    target = Path(index_dir) / index_dir_name(roster_path)
+    staging = target.with_name(f"{target.name}.tmp-{os.getpid()}")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    np.save(staging / 'ids.npy', ids[order])
+    np.save(staging / 'survival_probability.npy', survival_prob[order].astype(np.float32))
+    with open(staging / 'meta.json', 'w') as f:
+        json.dump({
+            "index_version": INDEX_VERSION,
+            "roster": str(roster_path),
+            "model_version": model_version,
+            "model_name": trainer.best_model_name,
+            "rows": int(len(ids)),
+            "built_at": time.time()
+        }, f, indent=2)
+
+    # Swap directories; open memory maps of the old index stay valid
+    retired = target.with_name(f"{target.name}.old-{os.getpid()}")
+    shutil.rmtree(retired, ignore_errors=True)
+    if target.exists():
+        target.rename(retired)
+    staging.rename(target)
+    shutil.rmtree(retired, ignore_errors=True)
+    return ScoreIndex(target, name)
+
+
+class ScoreIndex:
+    """One roster's memory-mapped index"""
+
+    def __init__(self, path, name: str = None):
+        self.path = Path(path)
+        self.name = name or self.path.name
+        with open(self.path / 'meta.json') as f:
+            self.meta = json.load(f)
+        self.ids = np.load(self.path / 'ids.npy', mmap_mode='r')
+        self.survival_prob = np.load(self.path / 'survival_probability.npy', mmap_mode='r')
+
+    @property
+    def model_version(self) -> str:
+        return self.meta.get('model_version')
+
+    def lookup(self, ids) -> Tuple[np.ndarray, np.ndarray]:
+        """(found mask, survival probabilities with NaN where not found)"""
+        ids = np.asarray(ids, dtype=np.int64)
+        positions = np.searchsorted(self.ids, ids)
+        positions = np.minimum(positions, max(len(self.ids) - 1, 0))
+        found = (self.ids[positions] == ids) if len(self.ids) else np.zeros(len(ids), dtype=bool)
+        survival_prob = np.full(len(ids), np.nan)
+        survival_prob[found] = self.survival_prob[positions[found]]
+        return found, survival_prob
+
+
+class ScoreIndexStore:
+    """Indexes for every configured roster, rebuilt when the model changes"""
+
+    def __init__(self, index_dir=None, rosters: List[Path] = None):
+        self.index_dir = Path(index_dir or os.getenv('SCORE_INDEX_DIR', str(DEFAULT_INDEX_DIR)))
+        self.rosters = roster_paths() if rosters is None else rosters
+        self.indexes: Dict[str, ScoreIndex] = {}
+        self.building = False
+        self.last_error = None
+        self._lock = threading.Lock()
+
+    def refresh(self, trainer, model, model_version: str):
+        """
+        Open every roster's index, rebuilding those made by another model
+
+        Each roster is retried up to BUILD_ATTEMPTS times; one that still
+        fails keeps its previous index (answering only for its own model)
+        and is reported in ``last_error`` without affecting the others.
+        """
+        with self._lock:
+            self.building = True
+            try:
+                indexes, errors = {}, []
+                for roster, name in roster_names(self.rosters).items():
+                    index = self._load_or_build(roster, name, trainer, model, model_version, errors)
+                    if index is None:
+                        index = self.indexes.get(name)
+                    if index is not None:
+                        indexes[name] = index
+                self.indexes = indexes
+                self.last_error = '; '.join(errors) or None
+            finally:
+                self.building = False
+
+    def _load_or_build(self, roster: Path, name: str, trainer, model, model_version: str,
+                       errors: List[str]) -> Optional[ScoreIndex]:
+        for attempt in range(1, BUILD_ATTEMPTS + 1):
+            try:
+                start = time.perf_counter()
+                index, built = load_or_build_index(roster, trainer, model, model_version, self.index_dir, name)
+                if built:
+                    print(f"📇 Indexed {roster.name}: {index.meta['rows']} passengers "
+                          f"in {time.perf_counter() - start:.2f}s")
+                return index
+            except Exception as e:
+                print(f"⚠️  Warning: Could not build score index for {roster} "
+                      f"(attempt {attempt}/{BUILD_ATTEMPTS}) - {e}")
+                if attempt == BUILD_ATTEMPTS:
+                    errors.append(f"{roster}: {e}")
+                else:
+                    time.sleep(BUILD_RETRY_SECONDS)
+        return None
+
+    def lookup(self, ids, model_version: str, roster: Optional[str] = None) -> Dict:
+        """
+        Look ids up in one roster, or in every roster in configured order
+
+        Only indexes built by ``model_version`` answer. Returns arrays
+        ``found``, ``survival_probability`` and ``roster`` (per id).
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        if roster is not None and roster not in self.indexes:
+            raise KeyError(roster)
+        candidates = [self.indexes[roster]] if roster is not None else list(self.indexes.values())
+
+        found = np.zeros(len(ids), dtype=bool)
+        survival_prob = np.full(len(ids), np.nan)
+        rosters = np.full(len(ids), None, dtype=object)
+        for index in candidates:
+            if index.model_version != model_version:
+                continue
+            pending = ~found
+            hit, prob = index.lookup(ids[pending])
+            rows = np.flatnonzero(pending)[hit]
+            found[rows] = True
+            survival_prob[rows] = prob[hit]
+            rosters[rows] = index.name
+        return {"found": found, "survival_probability": survival_prob, "roster": rosters}
+
+    def stats(self) -> Dict:
+        return {
+            "directory": str(self.index_dir),
+            "building": self.building,
+            "last_error": self.last_error,
+            "rosters": {
+                name: {key: index.meta.get(key) for key in ('roster', 'rows', 'model_version', 'built_at')}
+                for name, index in self.indexes.items()
+            }
+        }
+
+
+def main():
+    from backend.ensemble import prepare_for_serving
+    from train_model import TitanicModelTrainer
+
+    parser = argparse.ArgumentParser(description="Precompute predictions for passenger rosters")
+    parser.add_argument('rosters', nargs='*', type=Path, help="roster CSVs (default: train.csv and test.csv)")
+    parser.add_argument('--model', type=Path, default=ROOT / 'models' / 'titanic_model.pkl')
+    parser.add_argument('--index-dir', type=Path, default=None)
+    args = parser.parse_args()
+
+    trainer = TitanicModelTrainer()
+    trainer.load_model(str(args.model))
+    model = prepare_for_serving({trainer.best_model_name: trainer.best_model})[trainer.best_model_name]
+    store = ScoreIndexStore(args.index_dir, args.rosters or [path for path in DEFAULT_ROSTERS if path.exists()])
+    store.refresh(trainer, model, model_checksum(args.model))
+    if store.last_error:
+        sys.exit(1)
+    print(json.dumps(store.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
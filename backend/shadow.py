@@ -0,0 +1,99 @@
+"""
+Shadow scoring: non-primary models score live traffic off the response path
+
+Each request's feature matrix is handed to a background task that runs the
+shadow models and aggregates agreement and latency against the primary.
+"""
+
+import os
+import time
+from collections import deque
+from threading import Lock
+from typing import Dict, List
+
+import numpy as np
+
+# Latency samples kept per model for percentiles
+LATENCY_WINDOW = 2048
+
+
+def _percentile(samples, q):
+    return round(float(np.percentile(samples, q)), 3) if samples else None
+
+
+class ShadowScorer:
+    """Aggregates shadow-model agreement and latency"""
+
+    def __init__(self, setting: str = None):
+        # SHADOW_MODELS: empty (off), "all", or comma-separated model names
+        setting = os.getenv('SHADOW_MODELS', '') if setting is None else setting
+        self.setting = setting.strip()
+        self._lock = Lock()
+        self._stats = {}
+
+    def targets(self, primary_name: str, available: Dict) -> List[str]:
+        """Shadow models to run for a request served by ``primary_name``"""
+        if not self.setting:
+            return []
+        if self.setting == 'all':
+            names = list(available)
+        else:
+            names = [name.strip() for name in self.setting.split(',') if name.strip() in available]
+        return [name for name in names if name != primary_name]
+
+    def _entry(self, key):
+        if key not in self._stats:
+            self._stats[key] = {
+                "requests": 0,
+                "rows": 0,
+                "agreements": 0,
+                "abs_diff_sum": 0.0,
+                "latency_ms": deque(maxlen=LATENCY_WINDOW)
+            }
+        return self._stats[key]
+
+    def score(self, models: Dict, features: np.ndarray, primary_name: str,
+              primary_prob: np.ndarray, primary_latency_ms: float):
+        """Run shadow models on a request's features (background task)"""
+        primary_label = primary_prob > 0.5
+        results = {}
+        for name, model in models.items():
+            start = time.perf_counter()
+            shadow_prob = model.predict_proba(features)[:, 1]
+            results[name] = (shadow_prob, (time.perf_counter() - start) * 1e3)
+
+        with self._lock:
+            primary = self._entry((primary_name, None))
+            primary["requests"] += 1
+            primary["rows"] += len(primary_prob)
+            primary["latency_ms"].append(primary_latency_ms)
+
+            for name, (shadow_prob, latency_ms) in results.items():
+                entry = self._entry((primary_name, name))
+                entry["requests"] += 1
+                entry["rows"] += len(shadow_prob)
+                entry["agreements"] += int(np.sum((shadow_prob > 0.5) == primary_label))
+                entry["abs_diff_sum"] += float(np.sum(np.abs(shadow_prob - primary_prob)))
+                entry["latency_ms"].append(latency_ms)
+
+    def report(self) -> Dict:
+        """Per-primary comparison of every shadow model seen so far"""
+        with self._lock:
+            report = {}
+            for (primary_name, shadow_name), entry in self._stats.items():
+                latency = list(entry["latency_ms"])
+                summary = {
+                    "requests": entry["requests"],
+                    "rows": entry["rows"],
+                    "latency_p50_ms": _percentile(latency, 50),
+                    "latency_p99_ms": _percentile(latency, 99)
+                }
+                group = report.setdefault(primary_name, {"primary": None, "shadows": {}})
+                if shadow_name is None:
+                    group["primary"] = summary
+                else:
+                    rows = max(entry["rows"], 1)
+                    summary["agreement_rate"] = round(entry["agreements"] / rows, 4)
+                    summary["mean_abs_prob_diff"] = round(entry["abs_diff_sum"] / rows, 4)
+                    group["shadows"][shadow_name] = summary
+            return {"setting": self.setting or None, "primaries": report}
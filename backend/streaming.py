@@ -0,0 +1,154 @@
+"""
+Streamed, compressed responses for large batch results
+
+Bodies are produced as byte chunks; anything smaller than
+RESPONSE_COMPRESSION_MIN_BYTES goes out as one plain response, larger
+bodies are streamed and compressed with the best encoding the client
+accepts (zstd, br, gzip). brotli and zstandard are optional.
+"""
+
+import itertools
+import os
+import zlib
+from typing import Iterable, Iterator, Optional
+
+from fastapi.responses import Response, StreamingResponse
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+COMPRESSION_MIN_BYTES = int(os.getenv('RESPONSE_COMPRESSION_MIN_BYTES', '1024'))
+
+# Rows serialized per streamed chunk
+STREAM_CHUNK_ROWS = 1000
+
+# Fast levels: the CPU cost is paid on the request path
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+ZSTD_LEVEL = 3
+
+
+def supported_encodings():
+    """Encodings this server can produce, most preferred first"""
+    encodings = []
+    if HAS_ZSTD:
+        encodings.append('zstd')
+    if HAS_BROTLI:
+        encodings.append('br')
+    encodings.append('gzip')
+    return encodings
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick a content coding from an Accept-Encoding header
+
+    Highest q-value wins; ties go to the server preference order. Returns
+    None for identity.
+    """
+    if not accept_encoding:
+        return None
+
+    weights = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding.strip().lower()] = q
+
+    best, best_q = None, 0.0
+    for encoding in supported_encodings():
+        q = weights.get(encoding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class _BrotliCompressor:
+    """brotli.Compressor with the zlib-style compress/flush interface"""
+
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+def _compressor(encoding: str):
+    """Object with compress(bytes) and flush() for one response"""
+    if encoding == 'gzip':
+        return zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    if encoding == 'br':
+        return _BrotliCompressor()
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+    raise ValueError(f"Unsupported encoding '{encoding}'")
+
+
+def compress_chunks(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    """Compress a chunk stream incrementally"""
+    compressor = _compressor(encoding)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def json_batch_chunks(count: int, rows: Iterable[str], chunk_rows: int = STREAM_CHUNK_ROWS) -> Iterator[bytes]:
+    """``{"count": n, "predictions": [...]}`` as byte chunks of serialized rows"""
+    rows = iter(rows)
+    yield f'{{"count":{count},"predictions":['.encode()
+    separator = ''
+    while True:
+        block = list(itertools.islice(rows, chunk_rows))
+        if not block:
+            break
+        yield (separator + ','.join(block)).encode()
+        separator = ','
+    yield b']}'
+
+
+def stream_response(chunks: Iterable[bytes], accept_encoding: Optional[str],
+                    media_type: str = 'application/json',
+                    min_bytes: int = COMPRESSION_MIN_BYTES) -> Response:
+    """
+    Send a chunked body, compressed and streamed once it reaches ``min_bytes``
+
+    Chunks are buffered until the threshold is crossed, so small bodies are
+    sent whole (with Content-Length) and never compressed.
+    """
+    chunks = iter(chunks)
+    head, size = [], 0
+    for chunk in chunks:
+        head.append(chunk)
+        size += len(chunk)
+        if size >= min_bytes:
+            break
+    else:
+        return Response(content=b''.join(head), media_type=media_type, headers={'Vary': 'Accept-Encoding'})
+
+    body = itertools.chain(head, chunks)
+    headers = {'Vary': 'Accept-Encoding'}
+    encoding = negotiate_encoding(accept_encoding)
+    if encoding is not None:
+        headers['Content-Encoding'] = encoding
+        body = compress_chunks(body, encoding)
+    return StreamingResponse(body, media_type=media_type, headers=headers)
@@ -0,0 +1,50 @@
+"""Shared fixtures; CI runs ``pytest tests/`` from the backend directory"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """API client without the model: requests stop at validation or the 503 check"""
+    monkeypatch.setenv('BATCH_JOBS_DIR', str(tmp_path / 'jobs'))
+    monkeypatch.setenv('SCORE_INDEX_DIR', str(tmp_path / 'score_index'))
+    from fastapi.testclient import TestClient
+    from backend import main
+    # No context manager: startup (model load, job workers) does not run
+    return TestClient(main.app)
+
+
+class RecordingTrainer:
+    """Trainer-layout artifact that records the frames it is asked to featurize"""
+
+    feature_names = ['Title', 'CabinDeck']
+    best_model_name = 'recording'
+    fill_values = {'Age': 28.0, 'Fare': 14.45, 'Embarked': 'S'}
+
+    def __init__(self):
+        self.frames = []
+        self.best_model = self
+        self.models = {self.best_model_name: self}
+
+    def prepare_data(self, frame, is_training=False):
+        self.frames.append(frame)
+        return np.zeros((len(frame), len(self.feature_names)))
+
+    def predict_proba(self, X):
+        return np.tile([0.25, 0.75], (len(X), 1))
+
+
+@pytest.fixture
+def served_trainer(client, monkeypatch):
+    """A RecordingTrainer served as the loaded model"""
+    from backend import main
+    trainer = RecordingTrainer()
+    monkeypatch.setattr(main, 'model_trainer', trainer)
+    return trainer
@@ -0,0 +1,90 @@
+"""Optional name/cabin columns in columnar, binary and batch-job inputs"""
+
+import io
+import json
+
+import numpy as np
+import pytest
+
+from backend.binary_io import read_arrow, read_npy
+from backend.features import text_columns, validate_columns
+from backend.jobs import BatchJobQueue, read_job_input
+
+PASSENGER = {"pclass": 1, "sex": "female", "age": 38.0, "sibsp": 1, "parch": 0, "fare": 71.28,
+             "embarked": "C", "name": "Cumings, Mrs. John Bradley", "cabin": "C85"}
+
+
+def test_text_columns_fill_missing_entries():
+    names, cabins = text_columns({"name": ["A, Mr. B", None, ""],
+                                  "cabin": np.array(["C85", np.nan, ""], dtype=object)})
+    assert names == ["A, Mr. B", "Unknown", "Unknown"]
+    assert cabins == ["C85", None, None]
+    assert text_columns({"name": None}) == (None, None)
+
+
+def test_text_columns_must_match_batch_length():
+    columns = {field: [value] for field, value in PASSENGER.items()}
+    columns["cabin"] = ["C85", "B42"]
+    with pytest.raises(ValueError):
+        validate_columns(columns)
+
+
+def test_arrow_keeps_name_and_cabin():
+    pa = pytest.importorskip('pyarrow')
+    table = pa.table({field: [value] for field, value in PASSENGER.items()})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    columns = read_arrow(sink.getvalue().to_pybytes())
+    assert text_columns(columns) == ([PASSENGER["name"]], [PASSENGER["cabin"]])
+
+
+def test_structured_npy_keeps_name_and_cabin():
+    array = np.array([tuple(PASSENGER.values())], dtype=[
+        ('pclass', 'i8'), ('sex', 'U6'), ('age', 'f8'), ('sibsp', 'i8'), ('parch', 'i8'),
+        ('fare', 'f8'), ('embarked', 'U1'), ('name', 'U40'), ('cabin', 'U8')
+    ])
+    buffer = io.BytesIO()
+    np.save(buffer, array)
+    columns = read_npy(buffer.getvalue())
+    assert text_columns(columns) == ([PASSENGER["name"]], [PASSENGER["cabin"]])
+
+
+def test_structured_npy_bytes_fields_are_decoded():
+    array = np.array([(1, b"female", 38.0, 1, 0, 71.28, b"C", PASSENGER["name"].encode(), b"")], dtype=[
+        ('pclass', 'i8'), ('sex', 'S6'), ('age', 'f8'), ('sibsp', 'i8'), ('parch', 'i8'),
+        ('fare', 'f8'), ('embarked', 'S1'), ('name', 'S40'), ('cabin', 'S8')
+    ])
+    buffer = io.BytesIO()
+    np.save(buffer, array)
+    assert text_columns(read_npy(buffer.getvalue())) == ([PASSENGER["name"]], [None])
+
+
+def test_kaggle_csv_job_keeps_name_and_cabin():
+    body = (b"PassengerId,Survived,Pclass,Name,Sex,Age,SibSp,Parch,Ticket,Fare,Cabin,Embarked\n"
+            b"2,1,1,\"Cumings, Mrs. John Bradley\",female,38,1,0,PC 17599,71.28,C85,C\n"
+            b"3,1,3,\"Heikkinen, Miss. Laina\",female,26,0,0,STON/O2. 3101282,7.925,,S\n")
+    names, cabins = text_columns(read_job_input('text/csv', body))
+    assert names == ["Cumings, Mrs. John Bradley", "Heikkinen, Miss. Laina"]
+    assert cabins == ["C85", None]
+
+
+def test_job_input_round_trips_name_and_cabin(tmp_path):
+    queue = BatchJobQueue(tmp_path)
+    queue.start(lambda columns, model: None, lambda: False)
+    try:
+        raw = read_job_input('application/json', json.dumps({"passengers": [PASSENGER]}).encode())
+        names, cabins = text_columns(raw)
+        job = queue.submit({**validate_columns(raw), 'name': names, 'cabin': cabins}, 'recording')
+        with np.load(tmp_path / job['id'] / 'input.npz') as data:
+            assert text_columns({field: data[field] for field in data.files}) == (names, cabins)
+    finally:
+        queue.stop()
+
+
+def test_columnar_endpoint_passes_name_and_cabin(client, served_trainer):
+    response = client.post('/api/v1/predict/batch/columnar',
+                           json={field: [value] for field, value in PASSENGER.items()})
+    assert response.status_code == 200
+    assert served_trainer.frames[-1]['Name'].tolist() == [PASSENGER["name"]]
+    assert served_trainer.frames[-1]['Cabin'].tolist() == [PASSENGER["cabin"]]
@@ -0,0 +1,100 @@
+"""Arrow IPC and .npy batch decoding"""
+
+import io
+
+import numpy as np
+import pytest
+
+from backend.binary_io import ARROW_STREAM, NPY, BinaryFormatError, read_arrow, read_npy
+from backend.features import ColumnValidationError, validate_columns
+
+pa = pytest.importorskip('pyarrow')
+
+COLUMNS = {"pclass": [1, 3], "sex": ["female", "MALE"], "age": [38.0, None], "sibsp": [1, 0],
+           "parch": [0, 0], "fare": [71.28, 7.25], "embarked": ["C", "s"]}
+
+
+def arrow_body(columns):
+    table = pa.table(columns)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def npy_body(array):
+    buffer = io.BytesIO()
+    np.save(buffer, array)
+    return buffer.getvalue()
+
+
+def test_arrow_strings_are_encoded_and_nulls_become_nan():
+    columns = read_arrow(arrow_body(COLUMNS))
+    assert columns['sex'].tolist() == [0, 1]
+    assert columns['embarked'].tolist() == [0, 2]
+    assert np.isnan(columns['age'][1])
+
+
+def test_arrow_dictionary_columns_decode_like_strings():
+    columns = dict(COLUMNS, sex=pa.array(COLUMNS['sex']).dictionary_encode())
+    assert read_arrow(arrow_body(columns))['sex'].tolist() == [0, 1]
+
+
+def test_arrow_missing_column():
+    with pytest.raises(BinaryFormatError, match='embarked'):
+        read_arrow(arrow_body({field: values for field, values in COLUMNS.items() if field != 'embarked'}))
+
+
+def test_encoded_npy_matrix_validates():
+    matrix = np.array([[1, 0, 38.0, 1, 0, 71.28, 0], [3, 1, 22.0, 0, 0, 7.25, 2]])
+    columns = validate_columns(read_npy(npy_body(matrix)))
+    assert columns['sex_male'].tolist() == [False, True]
+    assert columns['embarked_s'].tolist() == [False, True]
+
+
+@pytest.mark.parametrize("body", [
+    b'not a numpy buffer',
+    npy_body(np.zeros((4, 7)))[:-16],
+    npy_body(np.array([[1, 'male']], dtype=object)),
+    npy_body(np.zeros((4, 3))),
+])
+def test_bad_npy_buffers_are_rejected(body):
+    with pytest.raises(BinaryFormatError):
+        read_npy(body)
+
+
+@pytest.mark.parametrize("content_type, body", [(ARROW_STREAM, b'garbage'), (NPY, b'garbage')])
+def test_undecodable_binary_batch_returns_400(client, served_trainer, content_type, body):
+    response = client.post('/api/v1/predict/batch', content=body, headers={'content-type': content_type})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("field", ["pclass", "sibsp", "age"])
+def test_arrow_string_numeric_columns_are_rejected(field):
+    with pytest.raises(BinaryFormatError, match=field):
+        read_arrow(arrow_body(dict(COLUMNS, **{field: ["1", "3"]})))
+
+
+def test_arrow_string_pclass_returns_400(client, served_trainer):
+    response = client.post('/api/v1/predict/batch', content=arrow_body(dict(COLUMNS, pclass=["1", "3"])),
+                           headers={'content-type': ARROW_STREAM})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("pclass, rows", [
+    (np.array(["1", "3"]), [0, 1]),
+    (np.array([1, "first"], dtype=object), [1]),
+])
+def test_non_numeric_columns_are_column_errors(pclass, rows):
+    with pytest.raises(ColumnValidationError) as error:
+        validate_columns(dict(COLUMNS, pclass=pclass, age=[38.0, 22.0]))
+    assert [(e["field"], e["rows"]) for e in error.value.errors] == [("pclass", rows)]
+
+
+def test_string_pclass_npy_field_returns_422(client, served_trainer):
+    array = np.array([("1", "female", 38.0, 1, 0, 71.28, "C")], dtype=[
+        ('pclass', 'U1'), ('sex', 'U6'), ('age', 'f8'), ('sibsp', 'i8'), ('parch', 'i8'),
+        ('fare', 'f8'), ('embarked', 'U1')
+    ])
+    response = client.post('/api/v1/predict/batch', content=npy_body(array), headers={'content-type': NPY})
+    assert response.status_code == 422
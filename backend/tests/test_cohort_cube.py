@@ -0,0 +1,104 @@
+"""Cohort cube roll-ups and the /api/v1/cohorts endpoint"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cohort_cube import CohortCube, build_cohort_cube
+
+
+@pytest.fixture(scope='module')
+def training():
+    rng = np.random.default_rng(0)
+    n = 400
+    features = pd.DataFrame({
+        'Pclass': rng.integers(1, 4, n),
+        'Sex': rng.choice(['female', 'male'], n),
+        'Embarked': rng.choice(['C', 'Q', 'S'], n),
+        'AgeGroup': rng.choice(['Child', 'Teen', 'Adult', 'Middle', 'Senior'], n),
+        'FareBin': rng.choice(['Very_Low', 'Low', 'Medium', 'High', 'Very_High'], n)
+    })
+    features.loc[:4, 'AgeGroup'] = np.nan
+    survived = rng.integers(0, 2, n)
+    predicted = rng.random(n)
+    return features, survived, predicted
+
+
+@pytest.fixture(scope='module')
+def cube(training):
+    return CohortCube(build_cohort_cube(*training))
+
+
+def expected_groups(training, group_by, query=None):
+    features, survived, predicted = training
+    frame = features.assign(survived=survived, predicted=predicted).dropna()
+    if query:
+        frame = frame.query(query)
+    return frame.groupby(group_by).agg(count=('survived', 'size'), survived=('survived', 'sum'),
+                                       predicted=('predicted', 'sum'))
+
+
+def test_rollup_counts_and_rates_match_a_group_by(training, cube):
+    rollup = cube.rollup(['sex', 'pclass'])
+    expected = expected_groups(training, ['Sex', 'Pclass'])
+
+    assert cube.rows == 395 and cube.excluded_rows == 5
+    assert [(c['sex'], c['pclass']) for c in rollup['cohorts']] == list(expected.index)
+    for cohort, (_, row) in zip(rollup['cohorts'], expected.iterrows()):
+        assert (cohort['count'], cohort['survived']) == (row['count'], row['survived'])
+        assert cohort['survival_rate'] == round(row['survived'] / row['count'], 4)
+        assert cohort['mean_predicted_probability'] == round(row['predicted'] / row['count'], 4)
+    assert rollup['total']['count'] == 395
+
+
+def test_group_order_follows_the_request(cube):
+    forward = cube.rollup(['pclass', 'embarked'])['cohorts']
+    backward = cube.rollup(['embarked', 'pclass'])['cohorts']
+    assert [(c['pclass'], c['embarked']) for c in forward][:3] == [(1, 'C'), (1, 'Q'), (1, 'S')]
+    assert [(c['embarked'], c['pclass']) for c in backward][:3] == [('C', 1), ('C', 2), ('C', 3)]
+    assert sorted((c['pclass'], c['embarked'], c['count']) for c in forward) == \
+        sorted((c['pclass'], c['embarked'], c['count']) for c in backward)
+
+
+def test_filters_keep_only_the_requested_levels(training, cube):
+    rollup = cube.rollup(['fare_bin'], {'pclass': [1, 2], 'sex': ['female']})
+    expected = expected_groups(training, ['FareBin'], "Pclass in [1, 2] and Sex == 'female'")
+
+    assert {c['fare_bin']: c['count'] for c in rollup['cohorts']} == expected['count'].to_dict()
+    assert [c['fare_bin'] for c in rollup['cohorts']] == \
+        [level for level in ['Very_Low', 'Low', 'Medium', 'High', 'Very_High'] if level in expected.index]
+    assert rollup['total']['count'] == expected['count'].sum()
+
+
+@pytest.mark.parametrize("group_by, filters", [
+    (['deck'], None),
+    ([], {'sex': ['other']}),
+    (['sex', 'sex'], None),
+])
+def test_unknown_dimensions_and_levels_raise(cube, group_by, filters):
+    with pytest.raises(ValueError):
+        cube.rollup(group_by, filters)
+
+
+@pytest.mark.parametrize("query, status", [
+    ("group_by=pclass&sex=female", 200),
+    ("group_by=deck", 422),
+    ("embarked=X", 422),
+    ("pclass=first", 422),
+])
+def test_cohorts_endpoint(client, served_trainer, cube, monkeypatch, query, status):
+    from backend import main
+    monkeypatch.setattr(main, 'cohort_cube', cube)
+    response = client.get(f'/api/v1/cohorts?{query}')
+    assert response.status_code == status
+    if status == 200:
+        body = response.json()
+        assert body['model'] == 'recording'
+        assert [c['pclass'] for c in body['cohorts']] == [1, 2, 3]
+        assert sum(c['count'] for c in body['cohorts']) == body['total']['count']
+
+
+def test_cohorts_endpoint_without_a_cube(client, served_trainer, monkeypatch):
+    from backend import main
+    monkeypatch.setattr(main, 'cohort_cube', None)
+    assert client.get('/api/v1/cohorts').status_code == 400
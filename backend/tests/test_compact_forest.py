@@ -0,0 +1,38 @@
+"""Compact forest predictions and path contributions (compact_forest)"""
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from compact_forest import CompactForestClassifier, compact_forest
+
+
+@pytest.fixture(scope='module')
+def forest_data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, 6))
+    y = ((X[:, 0] + X[:, 1] * X[:, 2] + rng.normal(scale=0.5, size=600)) > 0).astype(int)
+    forest = RandomForestClassifier(n_estimators=25, max_depth=8, random_state=0).fit(X[:400], y[:400])
+    return forest, X[400:], y[400:]
+
+
+def test_predict_proba_matches_sklearn(forest_data):
+    forest, X, _ = forest_data
+    compact = CompactForestClassifier(forest).fit()
+    np.testing.assert_allclose(compact.predict_proba(X), forest.predict_proba(X), atol=1e-6)
+    np.testing.assert_array_equal(compact.predict(X), forest.predict(X))
+
+
+def test_contributions_sum_to_the_prediction(forest_data):
+    forest, X, _ = forest_data
+    compact = CompactForestClassifier(forest).fit()
+    roots = compact.value_[compact.tree_offsets_, -1].mean()
+    np.testing.assert_allclose(compact.contributions(X).sum(axis=1) + roots,
+                               compact.predict_proba(X)[:, 1], atol=1e-5)
+
+
+def test_pruned_forest_keeps_accuracy_within_tolerance(forest_data):
+    forest, X, y = forest_data
+    compact, report = compact_forest(forest, X, y, tolerance=0.02)
+    assert compact.n_trees_ == report['trees_after'] <= report['trees_before'] == 25
+    assert report['accuracy_after'] >= report['accuracy_before'] - 0.02
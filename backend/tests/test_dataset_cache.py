@@ -0,0 +1,43 @@
+"""Binary dataset cache dtypes (dataset_cache)"""
+
+import pandas as pd
+import pytest
+
+from dataset_cache import HAS_PYARROW, build_cache, cache_path, iter_dataset_chunks, load_dataset, read_cache
+
+CSV = """PassengerId,Survived,Pclass,Name,Sex,Age,SibSp,Parch,Ticket,Fare,Cabin,Embarked
+1,0,3,"Braund, Mr. Owen Harris",male,22,1,0,A/5 21171,7.25,,S
+2,1,1,"Cumings, Mrs. John Bradley",female,38,1,0,PC 17599,71.2833,C85,C
+3,1,3,"Heikkinen, Miss. Laina",female,26,0,0,STON/O2. 3101282,7.925,,
+"""
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'train.csv'
+    path.write_text(CSV)
+    return path
+
+
+def test_cached_load_matches_first_load(csv_path, tmp_path):
+    cache_dir = tmp_path / 'cache'
+    first = load_dataset(csv_path, cache_dir)
+    second = load_dataset(csv_path, cache_dir)
+    assert first.dtypes.to_dict() == second.dtypes.to_dict()
+    assert isinstance(second['Sex'].dtype, pd.CategoricalDtype)
+
+
+@pytest.mark.skipif(not HAS_PYARROW, reason="pyarrow not installed")
+def test_streamed_cache_restores_categories(csv_path, tmp_path):
+    cache_dir = tmp_path / 'cache'
+    build_cache(csv_path, cache_dir)
+    df = read_cache(cache_path(csv_path, cache_dir))
+    for col in ('Sex', 'Embarked'):
+        assert isinstance(df[col].dtype, pd.CategoricalDtype), col
+    assert df['Embarked'].isna().sum() == 1
+
+    reference = pd.read_csv(csv_path, dtype={'Sex': 'category', 'Embarked': 'category'})
+    assert load_dataset(csv_path, cache_dir)['Sex'].tolist() == reference['Sex'].tolist()
+
+    chunk = next(iter_dataset_chunks(csv_path, chunksize=2, cache_dir=cache_dir))
+    assert isinstance(chunk['Sex'].dtype, pd.CategoricalDtype)
@@ -0,0 +1,43 @@
+"""Serving ensembles match the VotingClassifier they replace (backend.ensemble)"""
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier, VotingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+
+from backend.ensemble import ServingEnsemble, prepare_for_serving
+
+
+def voting(voting, weights=None):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 5))
+    y = np.where(X[:, 0] - X[:, 3] + rng.normal(scale=0.7, size=300) > 0, 'survived', 'died')
+    model = VotingClassifier([
+        ('lr', LogisticRegression()),
+        ('rf', RandomForestClassifier(n_estimators=10, random_state=0, n_jobs=-1)),
+        ('dt', DecisionTreeClassifier(max_depth=3, random_state=0)),
+    ], voting=voting, weights=weights).fit(X[:200], y[:200])
+    return model, X[200:]
+
+
+@pytest.mark.parametrize("weights", [None, [2, 1, 0.5]])
+def test_soft_voting_matches_predict_proba(weights):
+    model, X = voting('soft', weights)
+    serving = prepare_for_serving({'ensemble': model}, threads=1)['ensemble']
+
+    assert isinstance(serving, ServingEnsemble)
+    assert serving.named_estimators_['rf'].n_jobs == 1
+    np.testing.assert_allclose(serving.predict_proba(X), model.predict_proba(X), atol=1e-12)
+    np.testing.assert_array_equal(serving.predict(X), model.predict(X))
+
+
+def test_hard_voting_ensembles_are_served_unchanged():
+    model, X = voting('hard')
+    expected = model.predict(X)
+    serving = prepare_for_serving({'ensemble': model}, threads=1)['ensemble']
+
+    assert serving is model
+    np.testing.assert_array_equal(serving.predict(X), expected)
+    with pytest.raises(ValueError):
+        ServingEnsemble(model)
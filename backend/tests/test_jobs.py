@@ -0,0 +1,195 @@
+"""Batch-job input parsing and prediction logging of job results"""
+
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from backend.features import ColumnValidationError, validate_columns
+from backend.jobs import BatchJobQueue, JobInputError, read_job_input
+from backend.prediction_log import PredictionLogWriter
+
+FILL_VALUES = {'Age': 28.0, 'Fare': 14.45, 'Embarked': 'S'}
+
+KAGGLE_CSV = (b"PassengerId,Pclass,Name,Sex,Age,SibSp,Parch,Ticket,Fare,Cabin,Embarked\n"
+              b"892,3,\"Kelly, Mr. James\",male,34.5,0,0,330911,7.8292,,Q\n"
+              b"902,3,\"Ilieff, Mr. Ylio\",male,,0,0,349220,7.8958,,S\n"
+              b"1044,3,\"Storey, Mr. Thomas\",male,60.5,0,0,3701,,,S\n"
+              b"62,1,\"Icard, Miss. Amelie\",female,38,0,0,113572,80,B28,\n")
+
+PASSENGER = {"pclass": 3, "sex": "male", "age": 22, "sibsp": 1, "parch": 0, "fare": 7.25, "embarked": "S"}
+
+
+def test_kaggle_csv_with_missing_values_is_filled():
+    columns = validate_columns(read_job_input('text/csv', KAGGLE_CSV, FILL_VALUES))
+    assert columns['age'].tolist() == [34.5, 28.0, 60.5, 38.0]
+    assert columns['fare'].tolist() == [7.8292, 7.8958, 14.45, 80.0]
+    assert columns['embarked_s'].tolist() == [False, True, True, True]
+
+
+def test_batch_medians_fill_when_the_artifact_has_none():
+    columns = validate_columns(read_job_input('text/csv', KAGGLE_CSV))
+    assert columns['age'][1] == pytest.approx(38.0)
+    assert columns['fare'][2] == pytest.approx(7.8958)
+
+
+def test_json_nulls_are_filled():
+    body = json.dumps({"passengers": [{**PASSENGER, "age": None, "fare": None, "embarked": None}]}).encode()
+    columns = validate_columns(read_job_input('application/json', body, FILL_VALUES))
+    assert (columns['age'][0], columns['fare'][0], columns['embarked_s'][0]) == (28.0, 14.45, True)
+
+
+@pytest.mark.parametrize("passengers, field, rows", [
+    ([[1, 2], PASSENGER, "x"], "passengers", [0, 2]),
+    ([PASSENGER, {**PASSENGER, "age": "old"}], "age", [1]),
+    ([{**PASSENGER, "pclass": "first"}], "pclass", [0]),
+])
+def test_invalid_passengers_are_reported_by_row(passengers, field, rows):
+    body = json.dumps({"passengers": passengers}).encode()
+    with pytest.raises(ColumnValidationError) as error:
+        read_job_input('application/json', body, FILL_VALUES)
+    assert [(e["field"], e["rows"]) for e in error.value.errors] == [(field, rows)]
+
+
+@pytest.mark.parametrize("data", [{"passengers": {"pclass": 1}}, {**PASSENGER}])
+def test_malformed_json_batches_are_input_errors(data):
+    with pytest.raises(JobInputError):
+        read_job_input('application/json', json.dumps(data).encode())
+
+
+@pytest.mark.parametrize("body", [
+    {"passengers": [[1, 2]]},
+    {"passengers": [{**PASSENGER, "age": "old"}]},
+])
+def test_invalid_job_passengers_return_422(client, served_trainer, body):
+    assert client.post('/api/v1/jobs', json=body).status_code == 422
+
+
+def test_job_chunks_reach_the_prediction_log(client, served_trainer, monkeypatch):
+    from backend import main
+
+    class RecordingLog:
+        capacity = 3
+
+        def __init__(self):
+            self.records = []
+
+        def log(self, ts, model, model_version, latency_ms, columns, survival_prob, timeout=0.0):
+            self.records.append((model, len(columns['pclass']), len(survival_prob), timeout))
+            return True
+
+    log = RecordingLog()
+    monkeypatch.setattr(main, 'prediction_log', log)
+    columns = validate_columns({field: [value] * 7 for field, value in PASSENGER.items()})
+    probabilities = main.score_job_chunk(columns, 'recording')
+
+    assert probabilities.shape == (7, 2)
+    assert [rows for _, rows, _, _ in log.records] == [3, 3, 1]
+    assert all(model == 'recording' and rows == n and timeout > 0 for model, rows, n, timeout in log.records)
+
+
+def test_log_waits_for_room_when_asked(tmp_path):
+    writer = PredictionLogWriter('sqlite', tmp_path, capacity=4, flush_seconds=60)
+    columns = validate_columns({field: [value] * 4 for field, value in PASSENGER.items()})
+    writer.start()
+    try:
+        assert writer.log(0.0, 'm', 'v', 1.0, columns, np.full(4, 0.5))
+        assert not writer.log(0.0, 'm', 'v', 1.0, columns, np.full(4, 0.5))
+
+        results = []
+        waiter = threading.Thread(
+            target=lambda: results.append(writer.log(0.0, 'm', 'v', 1.0, columns, np.full(4, 0.5), timeout=10))
+        )
+        waiter.start()
+        waiter.join(10)
+        assert results == [True]
+    finally:
+        writer.stop()
+    assert writer.written_rows == 8
+    assert writer.dropped_rows == 4
+
+
+def wait_for(predicate, seconds=20.0):
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+class SlowScorer:
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, columns, model_name):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return np.tile([0.25, 0.75], (len(columns['pclass']), 1))
+
+
+def submit_rows(queue, rows):
+    return queue.submit(validate_columns({field: [value] * rows for field, value in PASSENGER.items()}), 'm')
+
+
+def test_two_queues_share_a_directory_without_double_scoring(tmp_path):
+    scorer = SlowScorer()
+    first, second = BatchJobQueue(tmp_path, chunk_rows=10), BatchJobQueue(tmp_path, chunk_rows=10)
+    first.start(scorer, lambda: True)
+    try:
+        jobs = [submit_rows(first, 30) for _ in range(4)]
+        assert wait_for(lambda: scorer.calls > 0)
+        second.start(scorer, lambda: True)
+        assert wait_for(lambda: all(first.get(job['id'])['status'] == 'succeeded' for job in jobs))
+    finally:
+        second.stop()
+        first.stop()
+
+    assert scorer.calls == 4 * 3
+    for job in jobs:
+        finished = BatchJobQueue(tmp_path)
+        finished.start(scorer, lambda: False)
+        try:
+            assert finished.get(job['id'])['processed'] == 30
+        finally:
+            finished.stop()
+        lines = (tmp_path / job['id'] / 'result.csv').read_text().splitlines()
+        assert len(lines) == 31
+        assert list((tmp_path / job['id']).glob('*.tmp')) == []
+
+
+@pytest.mark.parametrize("owner", ["999999999:gone", f"{os.getpid()}:restarted"])
+def test_jobs_of_dead_owners_are_requeued(tmp_path, owner):
+    queue = BatchJobQueue(tmp_path, chunk_rows=10)
+    queue.start(SlowScorer(0), lambda: False)
+    job = submit_rows(queue, 20)
+    queue._execute("UPDATE jobs SET status = 'running', owner = ?, claim = 'old' WHERE id = ?", (owner, job['id']))
+    queue.stop()
+
+    queue.start(SlowScorer(0), lambda: True)
+    try:
+        assert wait_for(lambda: queue.get(job['id'])['status'] == 'succeeded')
+        assert queue.get(job['id'])['processed'] == 20
+    finally:
+        queue.stop()
+
+
+def test_running_job_of_a_live_queue_is_left_alone(tmp_path):
+    scorer = SlowScorer(0.2)
+    first, second = BatchJobQueue(tmp_path, chunk_rows=10), BatchJobQueue(tmp_path, chunk_rows=10)
+    first.start(scorer, lambda: True)
+    try:
+        job = submit_rows(first, 30)
+        assert wait_for(lambda: first.get(job['id'])['status'] == 'running')
+        second.start(scorer, lambda: False)
+        assert second.requeue_orphans() == 0
+        assert second.get(job['id'])['status'] == 'running'
+    finally:
+        second.stop()
+        first.stop()
@@ -0,0 +1,55 @@
+"""Batch memory peaks of streamed responses and the lifetime peak RSS"""
+
+import numpy as np
+import pytest
+
+from backend import memory
+from backend.memory import BatchMemoryTracker
+
+PASSENGER = {"pclass": 3, "sex": "male", "age": 22, "sibsp": 1, "parch": 0, "fare": 7.25, "embarked": "S"}
+
+
+def test_streamed_batch_is_measured_after_the_last_chunk(client, served_trainer, monkeypatch):
+    from backend import main
+    events = []
+
+    class OrderedTracker(BatchMemoryTracker):
+        def finish(self, sample):
+            events.append('finish')
+            super().finish(sample)
+
+    def chunks(count, rows):
+        yield from main_chunks(count, rows)
+        events.append('last chunk')
+
+    main_chunks = main.json_batch_chunks
+    monkeypatch.setattr(main, 'batch_memory', OrderedTracker())
+    monkeypatch.setattr(main, 'json_batch_chunks', chunks)
+
+    response = client.post('/api/v1/predict/batch', json={"passengers": [PASSENGER] * 500})
+    assert response.status_code == 200
+    assert response.json()["count"] == 500
+    assert events == ['last chunk', 'finish']
+    assert main.batch_memory.report()['/api/v1/predict/batch']['<=1000']['requests'] == 1
+
+
+def test_failed_request_releases_the_tracker(client, monkeypatch):
+    from backend import main
+    monkeypatch.setattr(main, 'batch_memory', BatchMemoryTracker())
+    assert client.post('/api/v1/predict/batch', json={"passengers": [PASSENGER]}).status_code == 503
+    assert main.batch_memory._active == 0
+
+
+def test_lifetime_peak_survives_resets():
+    if not memory.reset_peak_rss():
+        pytest.skip("peak RSS cannot be reset on this platform")
+    block = np.ones(64 * 1024 * 1024 // 8)
+    grown_peak = memory.peak_rss_since_reset_bytes()
+    del block
+    assert memory.reset_peak_rss()
+
+    # RSS counters are approximate (per-CPU batches); compare with margins well under the 64 MB block
+    assert memory.peak_rss_since_reset_bytes() < grown_peak - 32 * 1024 * 1024
+    assert memory.peak_rss_bytes() > grown_peak - 4 * 1024 * 1024
+    report = memory.process_memory()
+    assert report["peak_rss_bytes"] >= report["peak_rss_since_reset_bytes"]
@@ -0,0 +1,65 @@
+"""Pareto flags and latency-budget model selection (model_selection)"""
+
+import pytest
+
+from model_selection import mark_pareto, select_model
+
+
+def row(name, accuracy, p99_at_1, p99_at_100=None):
+    return {"name": name, "accuracy": accuracy, "latency": {
+        "1": {"p50_ms": p99_at_1 / 2, "p99_ms": p99_at_1, "rounds": 200},
+        "100": {"p50_ms": 1.0, "p99_ms": p99_at_100 if p99_at_100 is not None else p99_at_1 * 10, "rounds": 50}
+    }}
+
+
+def table():
+    return [
+        row("ensemble", 0.84, 9.0),
+        row("xgboost", 0.83, 2.0),
+        row("random_forest", 0.82, 5.0),
+        row("logistic", 0.80, 0.2),
+    ]
+
+
+def test_pareto_front_drops_dominated_models():
+    flags = {r["name"]: r["pareto"] for r in mark_pareto(table(), 1)}
+    assert flags == {"ensemble": True, "xgboost": True, "random_forest": False, "logistic": True}
+
+
+def test_equal_models_are_both_on_the_front():
+    flags = [r["pareto"] for r in mark_pareto([row("a", 0.8, 1.0), row("b", 0.8, 1.0)], 1)]
+    assert flags == [True, True]
+
+
+@pytest.mark.parametrize("budget_ms, selected", [
+    (None, "ensemble"),
+    (9.0, "ensemble"),
+    (5.0, "xgboost"),
+    (1.0, "logistic"),
+    (0.1, "logistic"),
+])
+def test_budget_picks_the_most_accurate_model_that_fits(budget_ms, selected):
+    selection = select_model(table(), budget_ms, batch_size=1)
+    assert selection["selected"] == selected
+
+
+def test_no_model_within_budget_falls_back_to_the_fastest():
+    selection = select_model(table(), 0.1)
+    assert selection["reason"].startswith("no model meets")
+
+
+def test_budget_applies_at_the_requested_batch_size():
+    models = [row("ensemble", 0.84, 9.0, p99_at_100=20.0), row("xgboost", 0.83, 2.0, p99_at_100=60.0)]
+    assert select_model(models, 30.0, batch_size=100)["selected"] == "ensemble"
+    assert select_model(models, 5.0, batch_size=1)["selected"] == "xgboost"
+
+
+@pytest.mark.parametrize("budget_ms", [None, 10.0])
+def test_accuracy_ties_go_to_the_faster_model(budget_ms):
+    models = [row("slow", 0.83, 4.0), row("fast", 0.83, 1.0), row("worse", 0.80, 0.5)]
+    assert select_model(models, budget_ms)["selected"] == "fast"
+
+
+def test_unmeasured_batch_size_is_rejected():
+    with pytest.raises(ValueError):
+        select_model(table(), 5.0, batch_size=10_000)
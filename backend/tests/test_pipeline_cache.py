@@ -0,0 +1,40 @@
+"""Training stage cache keys and reuse (pipeline_cache)"""
+
+from pipeline_cache import StageCache, code_version
+
+
+def test_stage_is_reused_until_its_inputs_change(tmp_path):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {'value': len(calls)}
+
+    first = StageCache(tmp_path)
+    output, key = first.run('model_x', {'params': {'depth': 3}}, compute)
+    assert output == {'value': 1} and not first.records[0]['cached']
+
+    second = StageCache(tmp_path)
+    cached, cached_key = second.run('model_x', {'params': {'depth': 3}}, compute)
+    assert cached == output and cached_key == key and second.records[0]['cached']
+
+    changed, changed_key = second.run('model_x', {'params': {'depth': 4}}, compute)
+    assert changed == {'value': 2} and changed_key != key
+    assert second.summary()['cached'] == 1 and second.summary()['recomputed'] == 1
+
+
+def test_disabled_cache_recomputes(tmp_path):
+    StageCache(tmp_path).run('features', {'dataset': 'abc'}, lambda: 1)
+    cache = StageCache(tmp_path, enabled=False)
+    assert cache.run('features', {'dataset': 'abc'}, lambda: 2)[0] == 2
+
+
+def test_code_version_tracks_source():
+    def fit_a():
+        return 5
+
+    def fit_b():
+        return 4
+
+    assert code_version(fit_a) == code_version(fit_a)
+    assert code_version(fit_a) != code_version(fit_b)
@@ -0,0 +1,104 @@
+"""Prediction log buffering and sinks (backend.prediction_log)"""
+
+import numpy as np
+import pytest
+
+from backend import prediction_log
+from backend.prediction_log import HAS_PYARROW, PredictionLogWriter
+
+
+def json_columns(n):
+    """Columns as a JSON request produces them: Python ints and floats"""
+    return {
+        'pclass': [3] * n, 'age': [22.0] * n, 'sibsp': [1] * n, 'parch': [0] * n, 'fare': [7.25] * n,
+        'sex_male': [True] * n, 'embarked_q': [False] * n, 'embarked_s': [True] * n
+    }
+
+
+def npy_columns(n):
+    """Columns as a float32 .npy request produces them"""
+    return {name: np.asarray(values, dtype=np.float32) for name, values in json_columns(n).items()}
+
+
+@pytest.mark.skipif(not HAS_PYARROW, reason="pyarrow not installed")
+def test_parquet_accepts_mixed_dtype_batches(tmp_path):
+    import pyarrow.parquet as pq
+    writer = PredictionLogWriter('parquet', tmp_path)
+    writer.log(1.0, 'xgboost', 'abc', 0.5, json_columns(2), [0.1, 0.2])
+    writer.flush()
+    writer.log(2.0, 'xgboost', 'abc', 0.5, npy_columns(3), np.array([0.3, 0.4, 0.5], dtype=np.float32))
+    writer.flush()
+    writer.stop()
+
+    assert writer.last_error is None
+    assert writer.written_rows == 5 and writer.dropped_rows == 0
+    table = pq.read_table(next(tmp_path.glob('*.parquet')))
+    assert table.num_rows == 5
+    assert table.column('pclass').to_pylist() == [3] * 5
+
+
+def test_sqlite_accepts_mixed_dtype_batches(tmp_path):
+    writer = PredictionLogWriter('sqlite', tmp_path)
+    writer.log(1.0, 'xgboost', 'abc', 0.5, json_columns(2), [0.1, 0.2])
+    writer.log(2.0, 'xgboost', 'abc', 0.5, npy_columns(3), np.array([0.3, 0.4, 0.5], dtype=np.float32))
+    writer.flush()
+    writer.stop()
+    assert writer.written_rows == 5 and writer.last_error is None
+
+
+def test_failed_flush_counts_rows_as_dropped(tmp_path):
+    writer = PredictionLogWriter('sqlite', tmp_path)
+    writer.log(1.0, 'xgboost', 'abc', 0.5, json_columns(4), [0.1] * 4)
+
+    def failing_write(columns):
+        raise OSError("disk full")
+    writer._rotate()
+    writer._sink.write = failing_write
+    writer.flush()
+
+    stats = writer.stats()
+    assert stats['dropped_rows'] == 4 and stats['dropped_requests'] == 1
+    assert stats['buffered_rows'] == 0 and stats['written_rows'] == 0
+    assert stats['last_error'] == "disk full"
+
+
+def test_capacity_bounds_rows_not_requests(tmp_path):
+    writer = PredictionLogWriter('sqlite', tmp_path, capacity=10)
+    assert writer.log(1.0, 'm', 'v', 0.5, json_columns(6), [0.1] * 6)
+    assert not writer.log(1.0, 'm', 'v', 0.5, json_columns(6), [0.1] * 6)
+    assert not writer.log(1.0, 'm', 'v', 0.5, json_columns(50), [0.1] * 50)
+    assert writer.log(1.0, 'm', 'v', 0.5, json_columns(4), [0.1] * 4)
+    stats = writer.stats()
+    assert stats['buffered_rows'] == 10 and stats['dropped_rows'] == 56 and stats['dropped_requests'] == 2
+
+
+def test_writers_rotating_in_the_same_second_use_separate_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(prediction_log.time, 'strftime', lambda fmt: '20260101-000000')
+    first, second = PredictionLogWriter('sqlite', tmp_path), PredictionLogWriter('sqlite', tmp_path)
+    for writer in (first, second):
+        writer.log(1.0, 'm', 'v', 0.5, json_columns(2), [0.1, 0.2])
+        writer.flush()
+    first.stop()
+    second.stop()
+    assert len(list(tmp_path.glob('*.db'))) == 2
+    assert first.written_rows == second.written_rows == 2
+
+
+def test_retention_keeps_files_other_live_writers_have_open(tmp_path):
+    dead = tmp_path / 'predictions-20200101-000000-999999999-deadbeef-0000.db'
+    dead.write_bytes(b'')
+    other = PredictionLogWriter('sqlite', tmp_path, rotate_rows=1)
+    other.log(1.0, 'm', 'v', 0.5, json_columns(1), [0.1])
+    other.flush()
+
+    writer = PredictionLogWriter('sqlite', tmp_path, rotate_rows=1, retention_files=2)
+    for _ in range(3):
+        writer.log(1.0, 'm', 'v', 0.5, json_columns(1), [0.1])
+        writer.flush()
+
+    remaining = sorted(path.name for path in tmp_path.glob('*.db'))
+    assert not dead.exists()
+    assert remaining == sorted([other._sink_path.name, writer._sink_path.name])
+    assert writer.stats()['pruned_files'] == 3
+    other.stop()
+    writer.stop()
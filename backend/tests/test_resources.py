@@ -0,0 +1,69 @@
+"""cgroup CPU quotas and the per-worker thread plan (backend.resources)"""
+
+import pytest
+
+from backend import resources
+from backend.resources import cgroup_cpu_quota
+
+
+def write(root, name, text):
+    path = root / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text + '\n')
+
+
+@pytest.mark.parametrize("cpu_max, expected", [
+    ("max 100000", None),
+    ("200000 100000", 2.0),
+    ("150000 100000", 1.5),
+    ("50000 100000", 0.5),
+])
+def test_cgroup_v2_cpu_max(tmp_path, cpu_max, expected):
+    write(tmp_path, 'cpu.max', cpu_max)
+    quota = cgroup_cpu_quota(tmp_path)
+    assert quota == (None if expected is None else (expected, 'cgroup v2 cpu.max'))
+
+
+def test_missing_cgroup_files_mean_no_quota(tmp_path):
+    assert cgroup_cpu_quota(tmp_path) is None
+
+
+@pytest.mark.parametrize("quota, expected", [("-1", None), ("250000", (2.5, 'cgroup v1 cpu.cfs_quota_us'))])
+def test_cgroup_v1_cfs_quota(tmp_path, quota, expected):
+    write(tmp_path, 'cpu,cpuacct/cpu.cfs_quota_us', quota)
+    write(tmp_path, 'cpu,cpuacct/cpu.cfs_period_us', "100000")
+    assert cgroup_cpu_quota(tmp_path) == expected
+
+
+@pytest.fixture
+def eight_cpus(tmp_path, monkeypatch):
+    """An 8-CPU affinity mask with the cgroup files read from tmp_path"""
+    monkeypatch.setattr(resources.os, 'sched_getaffinity', lambda pid: set(range(8)), raising=False)
+    monkeypatch.setattr(resources, 'cgroup_cpu_quota', lambda: cgroup_cpu_quota(tmp_path))
+    for name in ('SERVING_CPUS', 'SERVING_THREADS', 'WEB_CONCURRENCY'):
+        monkeypatch.delenv(name, raising=False)
+    return tmp_path
+
+
+@pytest.mark.parametrize("cpu_max, available, source", [
+    (None, 8, 'affinity'),
+    ("max 100000", 8, 'affinity'),
+    ("250000 100000", 2, 'cgroup v2 cpu.max'),
+    ("50000 100000", 1, 'cgroup v2 cpu.max'),
+])
+def test_fractional_quotas_round_down(eight_cpus, cpu_max, available, source):
+    if cpu_max is not None:
+        write(eight_cpus, 'cpu.max', cpu_max)
+    cpus = resources.available_cpus()
+    assert (cpus["available"], cpus["source"]) == (available, source)
+
+
+def test_workers_split_the_quota(eight_cpus, monkeypatch):
+    write(eight_cpus, 'cpu.max', "400000 100000")
+    monkeypatch.setenv('WEB_CONCURRENCY', '3')
+    plan = resources.plan_resources()
+    assert (plan["workers"], plan["threads_per_worker"], plan["model_threads"]) == (3, 1, 1)
+    assert not plan["oversubscribed"]
+
+    monkeypatch.setenv('SERVING_THREADS', '2')
+    assert resources.plan_resources()["oversubscribed"]
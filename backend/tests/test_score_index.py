@@ -0,0 +1,102 @@
+"""Score index builds shared between workers and rosters with clashing names"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from backend import score_index
+from backend.features import FEATURE_NAMES
+from backend.score_index import ScoreIndexStore, load_or_build_index
+
+ROSTER = "PassengerId,Pclass,Name,Sex,Age,SibSp,Parch,Fare,Cabin,Embarked\n"
+
+
+class IdentityScaler:
+    def transform(self, X):
+        return X
+
+
+class EmergencyTrainer:
+    feature_names = FEATURE_NAMES
+    scaler = IdentityScaler()
+    fill_values = {'Age': 28.0, 'Fare': 14.45, 'Embarked': 'S'}
+    best_model_name = 'counting'
+
+
+class CountingModel:
+    """Survival probability = pclass / 10 + offset; counts (slow) scoring calls"""
+
+    def __init__(self, offset=0.0):
+        self.offset = offset
+        self.calls = 0
+
+    def predict_proba(self, X):
+        self.calls += 1
+        time.sleep(0.05)
+        survival = X[:, 0] / 10 + self.offset
+        return np.column_stack([1 - survival, survival])
+
+
+def write_roster(path, ids, pclass):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rows = [f"{i},{p},\"Doe, Mr. John\",male,30,0,0,10.0,,S" for i, p in zip(ids, pclass)]
+    path.write_text(ROSTER + '\n'.join(rows) + '\n')
+    return path
+
+
+def test_concurrent_workers_build_once(tmp_path):
+    roster = write_roster(tmp_path / 'train.csv', [1, 2, 3], [1, 2, 3])
+    model = CountingModel()
+    results, errors = [], []
+
+    def worker():
+        try:
+            results.append(load_or_build_index(roster, EmergencyTrainer(), model, 'v1', tmp_path / 'index'))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert model.calls == 1
+    assert sum(built for _, built in results) == 1
+    for index, _ in results:
+        found, survival_prob = index.lookup([2])
+        assert found[0] and survival_prob[0] == pytest.approx(0.2)
+
+
+def test_rosters_with_the_same_stem_do_not_collide(tmp_path):
+    first = write_roster(tmp_path / 'a' / 'train.csv', [1, 2], [1, 1])
+    second = write_roster(tmp_path / 'b' / 'train.csv', [1, 2], [3, 3])
+    store = ScoreIndexStore(tmp_path / 'index', [first, second])
+    store.refresh(EmergencyTrainer(), CountingModel(), 'v1')
+
+    assert store.last_error is None
+    assert len(store.indexes) == 2
+    probabilities = [store.lookup([1], 'v1', name)['survival_probability'][0] for name in store.indexes]
+    assert sorted(probabilities) == pytest.approx([0.1, 0.3])
+
+
+def test_failed_roster_keeps_the_others(tmp_path, monkeypatch):
+    monkeypatch.setattr(score_index, 'BUILD_RETRY_SECONDS', 0)
+    good = write_roster(tmp_path / 'train.csv', [1], [1])
+    store = ScoreIndexStore(tmp_path / 'index', [good, tmp_path / 'missing.csv'])
+    store.refresh(EmergencyTrainer(), CountingModel(), 'v1')
+
+    assert list(store.indexes) == ['train']
+    assert 'missing.csv' in store.last_error
+    assert store.lookup([1], 'v1')['found'][0]
+
+
+def test_stale_index_is_rebuilt_for_a_new_model(tmp_path):
+    roster = write_roster(tmp_path / 'train.csv', [1], [1])
+    load_or_build_index(roster, EmergencyTrainer(), CountingModel(), 'v1', tmp_path / 'index')
+    index, built = load_or_build_index(roster, EmergencyTrainer(), CountingModel(0.5), 'v2', tmp_path / 'index')
+    assert built and index.model_version == 'v2'
+    assert index.lookup([1])[1][0] == pytest.approx(0.6)
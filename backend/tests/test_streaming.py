@@ -0,0 +1,67 @@
+"""Accept-Encoding negotiation and compressed streaming (backend.streaming)"""
+
+import asyncio
+import zlib
+
+import pytest
+
+from backend import streaming
+from backend.streaming import negotiate_encoding, stream_response
+
+
+@pytest.fixture
+def all_codecs(monkeypatch):
+    monkeypatch.setattr(streaming, 'HAS_ZSTD', True)
+    monkeypatch.setattr(streaming, 'HAS_BROTLI', True)
+
+
+@pytest.fixture
+def gzip_only(monkeypatch):
+    monkeypatch.setattr(streaming, 'HAS_ZSTD', False)
+    monkeypatch.setattr(streaming, 'HAS_BROTLI', False)
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("", None),
+    ("identity", None),
+    ("gzip, br, zstd", "zstd"),
+    ("GZIP, BR", "br"),
+    ("gzip;q=1.0, zstd;q=0.5", "gzip"),
+    ("br; q=0.9, gzip;q=0.8", "br"),
+    ("gzip;q=0.5, br;q=0.5", "br"),
+    ("zstd;q=0, br;q=0, gzip;q=0", None),
+    ("*", "zstd"),
+    ("*;q=0.5, gzip", "gzip"),
+    ("*, zstd;q=0", "br"),
+    ("gzip;q=oops", None),
+])
+def test_negotiation_with_every_codec(all_codecs, header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("zstd, br", None),
+    ("zstd, br, gzip;q=0.1", "gzip"),
+    ("*", "gzip"),
+    ("*, gzip;q=0", None),
+])
+def test_negotiation_falls_back_without_zstd_and_brotli(gzip_only, header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+async def collect(response):
+    return b''.join([chunk async for chunk in response.body_iterator])
+
+
+def test_large_bodies_are_streamed_compressed(gzip_only):
+    chunks = [b'{"row":%d}' % i for i in range(500)]
+    response = stream_response(iter(chunks), 'gzip', min_bytes=1024)
+    assert response.headers['content-encoding'] == 'gzip'
+    assert zlib.decompress(asyncio.run(collect(response)), 31) == b''.join(chunks)
+
+
+def test_small_bodies_are_sent_whole(all_codecs):
+    response = stream_response(iter([b'{"count":0,', b'"predictions":[]}']), 'gzip', min_bytes=1024)
+    assert 'content-encoding' not in response.headers
+    assert response.body == b'{"count":0,"predictions":[]}'
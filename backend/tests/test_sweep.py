@@ -0,0 +1,48 @@
+"""What-if sweep axis validation (/api/v1/predict/sweep)"""
+
+import pytest
+
+from backend.main import SweepAxis, sweep_axis_values
+
+PASSENGER = {"pclass": 3, "sex": "male", "age": 22, "sibsp": 1, "parch": 0, "fare": 7.25, "embarked": "S"}
+
+
+@pytest.mark.parametrize("axis", [
+    {"field": "age", "values": [None]},
+    {"field": "pclass", "values": [None, 1]},
+    {"field": "age", "values": [[1]]},
+    {"field": "age", "values": [True]},
+    {"field": "age", "start": 0, "stop": float("inf"), "step": 1},
+])
+def test_malformed_axis_is_rejected_by_schema(axis):
+    with pytest.raises(ValueError):
+        SweepAxis(**axis)
+
+
+@pytest.mark.parametrize("body", [
+    '{"passenger": %s, "axes": [{"field": "age", "values": [null]}]}',
+    '{"passenger": %s, "axes": [{"field": "pclass", "values": [1e999]}]}',
+    '{"passenger": %s, "axes": [{"field": "fare", "start": 0, "stop": 1e999, "step": 1}]}',
+])
+def test_malformed_axis_returns_422(client, body):
+    import json
+    response = client.post('/api/v1/predict/sweep', content=body % json.dumps(PASSENGER),
+                           headers={'content-type': 'application/json'})
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize("values", [["1e999"], ["nan"], ["abc"], [1.5]])
+def test_unusable_numbers_raise_value_error(values):
+    with pytest.raises(ValueError):
+        sweep_axis_values(SweepAxis(field="pclass", values=values), 100)
+
+
+def test_range_is_inclusive_and_typed():
+    assert sweep_axis_values(SweepAxis(field="pclass", start=1, stop=3, step=1), 100) == [1, 2, 3]
+    assert sweep_axis_values(SweepAxis(field="age", values=["20", 30]), 100) == [20.0, 30.0]
+    assert sweep_axis_values(SweepAxis(field="sex", values=["male", "female"]), 100) == ["male", "female"]
+
+
+def test_range_over_limit_is_rejected():
+    with pytest.raises(ValueError, match="grid limit"):
+        sweep_axis_values(SweepAxis(field="fare", start=0, stop=100, step=0.01), 1000)
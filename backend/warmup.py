@@ -0,0 +1,58 @@
+"""
+Model warmup: pay cold-path costs before taking traffic
+
+The first calls into XGBoost/LightGBM/sklearn trigger lazy imports,
+thread-pool creation and buffer allocation; running synthetic batches at
+startup moves that cost off real requests.
+"""
+
+import os
+import time
+from typing import Callable, Dict, List
+
+from backend.features import synthetic_columns
+
+DEFAULT_BATCH_SIZES = [1, 32, 1024]
+
+
+def warmup_batch_sizes() -> List[int]:
+    """Batch sizes from WARMUP_BATCH_SIZES (comma separated, empty disables)"""
+    raw = os.getenv('WARMUP_BATCH_SIZES')
+    if raw is None:
+        return DEFAULT_BATCH_SIZES
+    return [int(size) for size in raw.split(',') if size.strip()]
+
+
+def warm_up(featurize: Callable, models: Dict, explainer=None,
+            batch_sizes=None, rounds=None) -> Dict[str, Dict]:
+    """
+    Score synthetic batches with every model and report cold vs warm latency
+
+    ``featurize`` maps passenger columns to the scaled feature matrix. The
+    first round at each batch size is the cold latency (featurization
+    included); the best of the remaining rounds is the warm latency.
+    """
+    batch_sizes = warmup_batch_sizes() if batch_sizes is None else batch_sizes
+    rounds = max(2, int(os.getenv('WARMUP_ROUNDS', '3'))) if rounds is None else rounds
+
+    report = {name: {} for name in models}
+    for size in batch_sizes:
+        columns = synthetic_columns(size, seed=size)
+        for name, model in models.items():
+            timings = []
+            for _ in range(rounds):
+                start = time.perf_counter()
+                model.predict_proba(featurize(columns))
+                timings.append(time.perf_counter() - start)
+            report[name][str(size)] = {
+                "cold_ms": round(timings[0] * 1e3, 3),
+                "warm_ms": round(min(timings[1:]) * 1e3, 3)
+            }
+
+    if explainer is not None and explainer.supported and batch_sizes:
+        start = time.perf_counter()
+        explainer.explain(featurize(synthetic_columns(1)))
+        explainer.clear_cache()
+        report["explain"] = {"cold_ms": round((time.perf_counter() - start) * 1e3, 3)}
+
+    return report
@@ -0,0 +1,71 @@
+"""
+Benchmark streamed, compressed batch responses
+
+Posts /api/v1/predict/batch in-process for 100 to 100k passengers with
+each Accept-Encoding and reports bytes on the wire and end-to-end time
+(request parsing and client-side decompression included).
+
+Usage: python benchmarks/bench_batch_compression.py [model_path]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+import backend.main as api
+from backend.features import synthetic_columns
+from backend.streaming import supported_encodings
+
+BATCH_SIZES = [100, 1000, 10000, 100000]
+REPEATS = 3
+
+
+def passengers(n):
+    columns = synthetic_columns(n, seed=n)
+    embarked = ['S' if s else 'Q' if q else 'C' for q, s in zip(columns['embarked_q'], columns['embarked_s'])]
+    return [
+        {
+            "pclass": int(columns['pclass'][i]),
+            "sex": 'male' if columns['sex_male'][i] else 'female',
+            "age": float(columns['age'][i]),
+            "sibsp": int(columns['sibsp'][i]),
+            "parch": int(columns['parch'][i]),
+            "fare": float(columns['fare'][i]),
+            "embarked": embarked[i]
+        }
+        for i in range(n)
+    ]
+
+
+def main():
+    from fastapi.testclient import TestClient
+
+    if len(sys.argv) > 1:
+        api.MODEL_PATH = Path(sys.argv[1])
+
+    encodings = ['identity'] + supported_encodings()
+    with TestClient(api.app) as client:
+        while client.get('/health/ready').status_code != 200:
+            time.sleep(0.2)
+
+        print(f"{'rows':>8} {'encoding':>9} {'wire bytes':>12} {'ratio':>6} {'ms':>9}")
+        for n in BATCH_SIZES:
+            body = {"passengers": passengers(n)}
+            identity_size = None
+            for encoding in encodings:
+                timings = []
+                for _ in range(REPEATS):
+                    start = time.perf_counter()
+                    response = client.post('/api/v1/predict/batch', json=body,
+                                           headers={'Accept-Encoding': encoding})
+                    response.content
+                    timings.append(time.perf_counter() - start)
+                wire = response.num_bytes_downloaded
+                identity_size = identity_size or wire
+                print(f"{n:>8} {encoding:>9} {wire:>12,} {identity_size / wire:>6.1f} "
+                      f"{min(timings) * 1e3:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark row-wise vs columnar batch prediction endpoints
+
+Runs both endpoints in-process (request parsing, validation, scoring and
+response encoding included).
+
+Usage: python benchmarks/bench_columnar.py
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+from fastapi.testclient import TestClient
+from backend import main
+
+BATCH_SIZES = [100, 1000, 10000, 100000]
+REPEATS = 3
+
+
+def synthetic_columns(n, rng):
+    return {
+        "pclass": rng.integers(1, 4, n).tolist(),
+        "sex": rng.choice(["male", "female"], n).tolist(),
+        "age": rng.uniform(0, 80, n).round(1).tolist(),
+        "sibsp": rng.integers(0, 4, n).tolist(),
+        "parch": rng.integers(0, 3, n).tolist(),
+        "fare": rng.uniform(0, 300, n).round(2).tolist(),
+        "embarked": rng.choice(["C", "Q", "S"], n).tolist()
+    }
+
+
+def best_time(client, url, body):
+    payload = json.dumps(body)
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        response = client.post(url, content=payload, headers={"Content-Type": "application/json"})
+        times.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.text
+    return min(times)
+
+
+def main_bench():
+    rng = np.random.default_rng(42)
+    with TestClient(main.app) as client:
+        print(f"{'batch':>8} {'rows ms':>10} {'columnar ms':>12} {'speedup':>8}")
+        for n in BATCH_SIZES:
+            columns = synthetic_columns(n, rng)
+            rows = [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+            row_time = best_time(client, "/api/v1/predict/batch", {"passengers": rows})
+            col_time = best_time(client, "/api/v1/predict/batch/columnar", columns)
+            print(f"{n:>8} {row_time * 1e3:>10.1f} {col_time * 1e3:>12.1f} {row_time / col_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,59 @@
+"""
+Benchmark per-row cost of SHAP feature contributions
+
+Usage: python benchmarks/bench_explain.py [model_path]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import joblib
+
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.explain import ContributionExplainer
+from backend.features import synthetic_features
+
+BATCH_SIZES = [1, 10, 100, 1000, 10000]
+REPEATS = 5
+
+
+def main():
+    model_path = sys.argv[1] if len(sys.argv) > 1 else 'models/titanic_model.pkl'
+    package = joblib.load(model_path)
+    explainer = ContributionExplainer(package['model'], package['feature_names'], cache_size=20000)
+    if not explainer.supported:
+        print(f"❌ No contribution backend for {type(package['model']).__name__}")
+        return
+
+    print(f"Model: {type(package['model']).__name__}")
+    print(f"{'batch':>8} {'cold us/row':>12} {'cached us/row':>14} {'predict us/row':>15}")
+
+    for n in BATCH_SIZES:
+        X = package['scaler'].transform(synthetic_features(n, seed=n))
+
+        cold = []
+        for _ in range(REPEATS):
+            explainer.clear_cache()
+            start = time.perf_counter()
+            explainer.explain(X)
+            cold.append(time.perf_counter() - start)
+
+        warm = []
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            explainer.explain(X)
+            warm.append(time.perf_counter() - start)
+
+        predict = []
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            package['model'].predict_proba(X)
+            predict.append(time.perf_counter() - start)
+
+        print(f"{n:>8} {min(cold) / n * 1e6:>12.1f} {min(warm) / n * 1e6:>14.1f} "
+              f"{min(predict) / n * 1e6:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
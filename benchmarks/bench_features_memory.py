@@ -0,0 +1,84 @@
+"""
+Benchmark peak memory of create_features / prepare_data, default vs lean
+
+Each (mode, rows) pair runs in a fresh subprocess. The input is train.csv
+resampled to the requested size with the dataset cache dtypes; reported
+memory is peak RSS above the RSS after the input was built (Linux only,
+sampled from /proc/self/statm). Runs that get killed are reported as OOM.
+
+Usage: python benchmarks/bench_features_memory.py [rows ...]
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.append(str(ROOT))
+
+ROW_COUNTS = [1_000_000, 10_000_000, 50_000_000]
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+
+
+def rss_bytes():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * PAGE_SIZE
+
+
+def worker(mode, rows):
+    import numpy as np
+
+    from dataset_cache import load_dataset
+    from train_model import TitanicModelTrainer
+
+    source = load_dataset(ROOT / 'train.csv')
+    index = np.random.default_rng(0).integers(0, len(source), rows)
+    df = source.iloc[index].reset_index(drop=True)
+    del source, index
+
+    baseline = rss_bytes()
+    peak = [baseline]
+    done = threading.Event()
+
+    def sample():
+        while not done.is_set():
+            peak[0] = max(peak[0], rss_bytes())
+            time.sleep(0.005)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    start = time.perf_counter()
+    X = TitanicModelTrainer().prepare_data(df, is_training=True, lean=(mode == 'lean'))
+    elapsed = time.perf_counter() - start
+    done.set()
+    sampler.join()
+    peak[0] = max(peak[0], rss_bytes())
+
+    print(f"{baseline / 2**20:.0f} {(peak[0] - baseline) / 2**20:.0f} {X.nbytes / 2**20:.0f} {elapsed:.2f}")
+
+
+def main():
+    row_counts = [int(n) for n in sys.argv[1:]] or ROW_COUNTS
+    print(f"{'rows':>11} {'mode':>8} {'input MB':>9} {'peak +MB':>9} {'X MB':>7} {'seconds':>8}")
+
+    for rows in row_counts:
+        for mode in ('default', 'lean'):
+            result = subprocess.run(
+                [sys.executable, __file__, '--worker', mode, str(rows)],
+                capture_output=True, text=True
+            )
+            if result.returncode != 0:
+                print(f"{rows:>11,} {mode:>8} {'OOM' if result.returncode < 0 else 'error':>9}")
+                continue
+            baseline, peak, x_size, elapsed = result.stdout.split()[-4:]
+            print(f"{rows:>11,} {mode:>8} {baseline:>9} {peak:>9} {x_size:>7} {elapsed:>8}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == '--worker':
+        worker(sys.argv[2], int(sys.argv[3]))
+    else:
+        main()
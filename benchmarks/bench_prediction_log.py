@@ -0,0 +1,55 @@
+"""
+Benchmark prediction log overhead on the request path
+
+Measures the cost of PredictionLogWriter.log() per request while the
+background writer is flushing, and the resulting write throughput.
+
+Usage: python benchmarks/bench_prediction_log.py [sqlite|parquet]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.features import synthetic_columns
+from backend.prediction_log import PredictionLogWriter
+
+CALLS = 200000
+
+
+def main():
+    backend = sys.argv[1] if len(sys.argv) > 1 else 'sqlite'
+    columns = {name: values.tolist() for name, values in synthetic_columns(1).items()}
+    survival_prob = [0.42]
+
+    with tempfile.TemporaryDirectory() as directory:
+        writer = PredictionLogWriter(backend, directory, capacity=CALLS, flush_records=1024)
+        writer.start()
+
+        ts = time.time()
+        start = time.perf_counter()
+        for _ in range(CALLS):
+            pass
+        loop = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(CALLS):
+            writer.log(ts, 'xgboost', 'abc123', 0.5, columns, survival_prob)
+        elapsed = time.perf_counter() - start - loop
+
+        flush_start = time.perf_counter()
+        writer.stop()
+        drain = time.perf_counter() - flush_start
+        stats = writer.stats()
+
+    print(f"Backend:            {backend}")
+    print(f"log() per request:  {elapsed / CALLS * 1e6:.2f} us")
+    print(f"Rows written:       {stats['written_rows']} in {stats['flushes']} flushes")
+    print(f"Dropped rows:       {stats['dropped_rows']}")
+    print(f"Final drain:        {drain * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
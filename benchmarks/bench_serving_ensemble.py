@@ -0,0 +1,64 @@
+"""
+Benchmark the serving ensemble against VotingClassifier.predict_proba
+
+Loads a trained artifact with an 'ensemble' model and times the stock
+VotingClassifier (members as trained, n_jobs=-1) against
+backend.ensemble.ServingEnsemble at several thread counts, for 1, 100
+and 10k rows. Also reports the largest probability difference.
+
+Usage: python benchmarks/bench_serving_ensemble.py [model_path]
+"""
+
+import copy
+import sys
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.ensemble import ServingEnsemble
+
+BATCH_SIZES = [1, 100, 10_000]
+THREAD_COUNTS = [1, 2, 4]
+ROUNDS = {1: 200, 100: 100, 10_000: 10}
+
+
+def best_ms(func, X, rounds):
+    func(X)
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(X)
+        timings.append(time.perf_counter() - start)
+    return np.median(timings) * 1e3
+
+
+def main():
+    model_path = sys.argv[1] if len(sys.argv) > 1 else 'models/titanic_model.pkl'
+    package = joblib.load(model_path)
+    ensemble = (package.get('models') or {}).get('ensemble')
+    if ensemble is None:
+        print(f"No 'ensemble' model in {model_path}; train one with train_model.py")
+        return
+
+    rng = np.random.default_rng(0)
+    n_features = len(package['feature_names'])
+    variants = [('VotingClassifier', ensemble.predict_proba)]
+    for threads in THREAD_COUNTS:
+        serving = ServingEnsemble(copy.deepcopy(ensemble), threads)
+        variants.append((f'ServingEnsemble[{threads}]', serving.predict_proba))
+
+    print(f"{'rows':>7} {'variant':>20} {'median ms':>10} {'max |diff|':>11}")
+    for rows in BATCH_SIZES:
+        X = rng.normal(size=(rows, n_features))
+        reference = ensemble.predict_proba(X)
+        for label, predict_proba in variants:
+            ms = best_ms(predict_proba, X, ROUNDS[rows])
+            diff = np.abs(predict_proba(X) - reference).max()
+            print(f"{rows:>7} {label:>20} {ms:>10.3f} {diff:>11.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark parallel GridSearchCV with shared memory-mapped training data
+
+Compares three ways of handing X/y to loky CV workers:
+  pickle  - joblib auto-memmapping disabled, data pickled with every task
+  default - joblib's auto-memmapping (one dump per fit call)
+  shared  - shared_dataset.shared_arrays memmap, passed by reference
+
+Each mode runs in a fresh subprocess. Peak memory is the highest summed
+PSS of the process and its workers (Linux only, /proc/*/smaps_rollup),
+so pages shared through the memmap are not double counted.
+
+Usage: python benchmarks/bench_shared_cv.py [rows ...]
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+ROW_COUNTS = [100_000, 1_000_000]
+N_FEATURES = 18
+N_JOBS = 4
+
+
+def _pss_kb(pid):
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                if line.startswith('Pss:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def tree_pss_bytes(root=None):
+    """Summed PSS of ``root`` and all its descendants"""
+    root = root or os.getpid()
+    parents = {}
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    parents[int(entry)] = int(f.read().rsplit(')', 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                pass
+    tree, frontier = {root}, [root]
+    while frontier:
+        pid = frontier.pop()
+        children = [child for child, parent in parents.items() if parent == pid]
+        tree.update(children)
+        frontier.extend(children)
+    return sum(_pss_kb(pid) for pid in tree) * 1024
+
+
+def worker(mode, rows):
+    import numpy as np
+    from joblib import parallel_config
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.model_selection import GridSearchCV
+
+    from shared_dataset import shared_arrays
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(rows, N_FEATURES))
+    y = (X[:, 0] + rng.normal(size=rows) > 0).astype(np.int64)
+
+    baseline = tree_pss_bytes()
+    peak = [baseline]
+    done = threading.Event()
+
+    def sample():
+        while not done.is_set():
+            peak[0] = max(peak[0], tree_pss_bytes())
+            time.sleep(0.05)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+
+    search = GridSearchCV(LogisticRegression(max_iter=200), {'C': [0.01, 0.1, 1, 10]}, cv=5, n_jobs=N_JOBS)
+    start = time.perf_counter()
+    if mode == 'pickle':
+        with parallel_config(max_nbytes=None):
+            search.fit(X, y)
+    elif mode == 'default':
+        search.fit(X, y)
+    else:
+        with shared_arrays(X, y) as (X_shared, y_shared):
+            search.fit(X_shared, y_shared)
+    elapsed = time.perf_counter() - start
+
+    done.set()
+    sampler.join()
+    print(f"{X.nbytes / 2**20:.0f} {(peak[0] - baseline) / 2**20:.0f} {elapsed:.2f}")
+
+
+def main():
+    row_counts = [int(n) for n in sys.argv[1:]] or ROW_COUNTS
+    print(f"{'rows':>11} {'mode':>8} {'X MB':>6} {'peak +MB':>9} {'seconds':>8}")
+
+    for rows in row_counts:
+        for mode in ('pickle', 'default', 'shared'):
+            result = subprocess.run(
+                [sys.executable, __file__, '--worker', mode, str(rows)],
+                capture_output=True, text=True
+            )
+            if result.returncode != 0:
+                print(f"{rows:>11,} {mode:>8} {'error':>6}")
+                continue
+            x_size, peak, elapsed = result.stdout.split()[-3:]
+            print(f"{rows:>11,} {mode:>8} {x_size:>6} {peak:>9} {elapsed:>8}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == '--worker':
+        worker(sys.argv[2], int(sys.argv[3]))
+    else:
+        main()
@@ -0,0 +1,83 @@
+"""
+Benchmark similar-passenger lookups: linear scan vs KD-tree vs ball tree
+
+Enlarges the artifact's training rows (from its neighbour index) with
+small Gaussian jitter to 10k and 100k passengers, then times top-k
+queries for batches of 1 and 100 passengers. The linear scan is the
+numpy baseline (squared distances to every row + argpartition); the
+trees are sklearn's exact KDTree and BallTree at a few leaf sizes.
+Also checks that every method returns the same neighbours.
+
+Usage: python benchmarks/bench_similar_passengers.py [model_path] [k]
+"""
+
+import sys
+import time
+
+import joblib
+import numpy as np
+from sklearn.neighbors import BallTree, KDTree
+
+DATASET_ROWS = [10_000, 100_000]
+BATCH_SIZES = [1, 100]
+LEAF_SIZES = [20, 40, 100]
+ROUNDS = 20
+
+
+def linear_scan(data, k):
+    squared_norms = (data ** 2).sum(axis=1)
+
+    def query(X):
+        distances = squared_norms[None, :] - 2 * X @ data.T + (X ** 2).sum(axis=1)[:, None]
+        nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        order = np.take_along_axis(distances, nearest, axis=1).argsort(axis=1)
+        return np.take_along_axis(nearest, order, axis=1)
+    return query
+
+
+def tree_query(tree, k):
+    return lambda X: tree.query(X, k=k, return_distance=False)
+
+
+def median_ms(func, X):
+    func(X)
+    timings = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        func(X)
+        timings.append(time.perf_counter() - start)
+    return np.median(timings) * 1e3
+
+
+def main():
+    model_path = sys.argv[1] if len(sys.argv) > 1 else 'models/titanic_model.pkl'
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    index = joblib.load(model_path).get('neighbor_index')
+    if index is None:
+        print(f"No neighbour index in {model_path}; retrain with train_model.py")
+        return
+
+    base = np.asarray(index['tree'].data)
+    rng = np.random.default_rng(0)
+    print(f"{'rows':>8} {'batch':>6} {'method':>16} {'build s':>8} {'median ms':>10} {'same':>5}")
+    for rows in DATASET_ROWS:
+        data = base[rng.integers(0, len(base), rows)] + rng.normal(scale=0.05, size=(rows, base.shape[1]))
+        methods = [('linear scan', 0.0, linear_scan(data, k))]
+        for tree_class in (KDTree, BallTree):
+            for leaf_size in LEAF_SIZES:
+                start = time.perf_counter()
+                tree = tree_class(data, leaf_size=leaf_size)
+                methods.append((f"{tree_class.__name__}[{leaf_size}]", time.perf_counter() - start,
+                                tree_query(tree, k)))
+
+        for batch in BATCH_SIZES:
+            X = base[rng.integers(0, len(base), batch)] + rng.normal(scale=0.5, size=(batch, base.shape[1]))
+            reference = methods[0][2](X)
+            for label, build_seconds, query in methods:
+                ms = median_ms(query, X)
+                same = np.array_equal(np.sort(query(X), axis=1), np.sort(reference, axis=1))
+                print(f"{rows:>8} {batch:>6} {label:>16} {build_seconds:>8.2f} {ms:>10.3f} {str(same):>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark tail latency with and without the CPU budget plan
+
+Starts W worker processes (standing in for uvicorn workers), each
+scoring batches in a closed loop for a fixed time, and reports p50/p99
+latency and throughput for two modes:
+  unplanned - models as trained (n_jobs=-1), native pools unlimited
+  planned   - backend.resources plan applied, models prepared for serving
+
+On a machine with few cores, --emulate-cores N makes the unplanned
+workers size their pools as if they saw N cores.
+
+Usage: python benchmarks/bench_thread_budget.py [model_path] [--workers W]
+       [--seconds S] [--model NAME] [--rows R] [--emulate-cores N]
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+
+def worker(mode, args, start_at, results):
+    import joblib
+    from backend.ensemble import limit_threads, prepare_for_serving
+    from backend.resources import apply_plan, plan_resources
+
+    package = joblib.load(args.model_path)
+    models = package.get('models') or {package['model_name']: package['model']}
+    if mode == 'planned':
+        os.environ['WEB_CONCURRENCY'] = str(args.workers)
+        plan = apply_plan(plan_resources())
+        model = prepare_for_serving({args.model: models[args.model]}, plan['model_threads'])[args.model]
+    else:
+        model = models[args.model]
+        if args.emulate_cores:
+            from threadpoolctl import threadpool_limits
+            threadpool_limits(limits=args.emulate_cores)
+            members = getattr(model, 'estimators_', None) if type(model).__name__ == 'VotingClassifier' else None
+            for member in members or [model]:
+                limit_threads(member, args.emulate_cores)
+
+    X = np.random.default_rng(os.getpid()).normal(size=(args.rows, len(package['feature_names'])))
+    model.predict_proba(X)
+
+    while time.time() < start_at:
+        time.sleep(0.01)
+    latencies = []
+    deadline = start_at + args.seconds
+    while time.time() < deadline:
+        begin = time.perf_counter()
+        model.predict_proba(X)
+        latencies.append(time.perf_counter() - begin)
+    results.put(latencies)
+
+
+def run(mode, args):
+    results = mp.Queue()
+    start_at = time.time() + 15
+    processes = [mp.Process(target=worker, args=(mode, args, start_at, results)) for _ in range(args.workers)]
+    for process in processes:
+        process.start()
+    latencies = np.concatenate([results.get() for _ in processes]) * 1e3
+    for process in processes:
+        process.join()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('model_path', nargs='?', default='models/titanic_model.pkl')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--model', default='ensemble')
+    parser.add_argument('--rows', type=int, default=1)
+    parser.add_argument('--emulate-cores', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{args.workers} workers, model={args.model}, rows={args.rows}, "
+          f"cpus={len(os.sched_getaffinity(0))}, emulated cores={args.emulate_cores or '-'}")
+    print(f"{'mode':>10} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for mode in ('unplanned', 'planned'):
+        latencies = run(mode, args)
+        print(f"{mode:>10} {len(latencies):>9} {len(latencies) / args.seconds:>8.1f} "
+              f"{np.percentile(latencies, 50):>8.2f} {np.percentile(latencies, 99):>8.2f} "
+              f"{latencies.max():>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Precomputed survival statistics over the training passengers
+
+The trainer aggregates the training set once into a dense cube over
+Pclass x Sex x Embarked x AgeGroup x FareBin (3 x 2 x 3 x 5 x 5 cells)
+holding passenger counts, survivors and the sum of the best model's
+predicted probabilities. Any roll-up (group by some dimensions, filter
+on others) is then a slice and a sum over at most 450 cells, instead of
+a pandas group-by over the raw data per request.
+
+The cube is stored in the model artifact as plain numpy arrays.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# API name -> (engineered column, levels in display order)
+DIMENSIONS = {
+    'pclass': ('Pclass', [1, 2, 3]),
+    'sex': ('Sex', ['female', 'male']),
+    'embarked': ('Embarked', ['C', 'Q', 'S']),
+    'age_group': ('AgeGroup', ['Child', 'Teen', 'Adult', 'Middle', 'Senior']),
+    'fare_bin': ('FareBin', ['Very_Low', 'Low', 'Medium', 'High', 'Very_High'])
+}
+
+
+def build_cohort_cube(features: pd.DataFrame, survived, predicted_proba) -> Dict:
+    """
+    Aggregate engineered training rows (``create_features`` output) into a cube
+
+    Rows whose value falls outside a dimension's levels (e.g. an age
+    outside the AgeGroup bins) are left out and counted in ``excluded_rows``.
+    """
+    shape = tuple(len(levels) for _, levels in DIMENSIONS.values())
+    codes = []
+    for column, levels in DIMENSIONS.values():
+        values = features[column].astype(object) if column != 'Pclass' else features[column].astype(int)
+        codes.append(pd.Categorical(values, categories=levels).codes.astype(np.int64))
+    codes = np.stack(codes)
+    included = (codes >= 0).all(axis=0)
+
+    cells = np.ravel_multi_index(codes[:, included], shape)
+    size = int(np.prod(shape))
+    survived = np.asarray(survived, dtype=np.float64)[included]
+    predicted_proba = np.asarray(predicted_proba, dtype=np.float64)[included]
+    return {
+        'dimensions': list(DIMENSIONS),
+        'levels': {name: levels for name, (_, levels) in DIMENSIONS.items()},
+        'count': np.bincount(cells, minlength=size).reshape(shape).astype(np.int32),
+        'survived': np.bincount(cells, weights=survived, minlength=size).reshape(shape).astype(np.int32),
+        'predicted_sum': np.bincount(cells, weights=predicted_proba, minlength=size).reshape(shape),
+        'rows': int(included.sum()),
+        'excluded_rows': int((~included).sum())
+    }
+
+
+class CohortCube:
+    """Roll-ups over a cube built by ``build_cohort_cube``"""
+
+    def __init__(self, cube: Dict):
+        self.dimensions: List[str] = cube['dimensions']
+        self.levels: Dict[str, list] = cube['levels']
+        self.count = cube['count']
+        self.survived = cube['survived']
+        self.predicted_sum = cube['predicted_sum']
+        self.rows = cube['rows']
+        self.excluded_rows = cube['excluded_rows']
+
+    def rollup(self, group_by: List[str] = (), filters: Optional[Dict[str, list]] = None) -> Dict:
+        """
+        Statistics per combination of the ``group_by`` dimensions
+
+        ``filters`` maps dimensions to the levels to keep. Raises
+        ValueError for unknown dimensions or levels. Cohorts without
+        passengers are omitted.
+        """
+        group_by = list(group_by)
+        filters = filters or {}
+        for name in list(group_by) + list(filters):
+            if name not in self.levels:
+                raise ValueError(f"Unknown dimension '{name}'. Available: {self.dimensions}")
+        if len(set(group_by)) != len(group_by):
+            raise ValueError("Each dimension can only be grouped once")
+
+        selections = []
+        for name in self.dimensions:
+            levels = self.levels[name]
+            if name not in filters:
+                selections.append(np.arange(len(levels)))
+                continue
+            unknown = [value for value in filters[name] if value not in levels]
+            if unknown:
+                raise ValueError(f"Unknown {name} level(s) {unknown}. Available: {levels}")
+            selections.append(np.array([levels.index(value) for value in filters[name]], dtype=np.int64))
+
+        index = np.ix_(*selections)
+        kept = [self.dimensions.index(name) for name in group_by]
+        summed = tuple(axis for axis in range(len(self.dimensions)) if axis not in kept)
+        # Sums keep cube order; transpose to the order the groups were requested in
+        order = np.argsort(np.argsort(kept))
+        count, survived, predicted = (
+            array[index].sum(axis=summed).transpose(order)
+            for array in (self.count, self.survived, self.predicted_sum)
+        )
+
+        group_levels = [
+            [self.levels[name][i] for i in selections[self.dimensions.index(name)]] for name in group_by
+        ]
+        cohorts = []
+        for position in np.ndindex(*np.shape(count)):
+            if count[position] == 0:
+                continue
+            cohort = {name: group_levels[axis][i] for axis, (name, i) in enumerate(zip(group_by, position))}
+            cohort.update(_statistics(count[position], survived[position], predicted[position]))
+            cohorts.append(cohort)
+
+        return {
+            "group_by": group_by,
+            "filters": filters,
+            "total": _statistics(np.sum(count), np.sum(survived), np.sum(predicted)),
+            "cohorts": cohorts
+        }
+
+
+def _statistics(count, survived, predicted_sum) -> Dict:
+    count = int(count)
+    return {
+        "count": count,
+        "survived": int(survived),
+        "survival_rate": round(float(survived) / count, 4) if count else None,
+        "mean_predicted_probability": round(float(predicted_sum) / count, 4) if count else None
+    }
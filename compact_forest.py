@@ -0,0 +1,176 @@
+"""
+Compact random-forest representation for smaller, faster-loading artifacts
+
+A fitted RandomForestClassifier is flattened into a handful of numpy
+arrays: int8/int16 split features, float32 thresholds, int16 per-tree
+child indices and float32 node class probabilities. Thresholds are
+rounded *down* to float32; sklearn already casts inputs to float32, so
+``x <= threshold`` gives the same decisions as the original trees.
+
+All trees are walked at once with vectorized numpy, which beats per-tree
+dispatch for small batches and loses to sklearn's Cython traversal on
+large ones.
+
+Optionally keeps only the first k trees, with k the smallest count whose
+held-out accuracy is within a tolerance of the full forest.
+"""
+
+import io
+import time
+
+import joblib
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.metrics import accuracy_score
+
+# Rows traversed at once; bounds the (rows x trees) node-index buffer
+PREDICT_BLOCK_ROWS = 4096
+
+
+def _smallest_int(max_value):
+    for dtype in (np.int8, np.int16, np.int32):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def _round_down_float32(values):
+    rounded = values.astype(np.float32)
+    too_high = rounded.astype(np.float64) > values
+    rounded[too_high] = np.nextafter(rounded[too_high], np.float32(-np.inf))
+    return rounded
+
+
+class CompactForestClassifier(ClassifierMixin, BaseEstimator):
+    """Array-backed, prediction-only copy of a fitted random forest"""
+
+    def __init__(self, forest=None, n_trees=None):
+        self.forest = forest
+        self.n_trees = n_trees
+
+    def fit(self, X=None, y=None):
+        """Flatten ``forest`` (its first ``n_trees`` trees); X and y are unused"""
+        trees = self.forest.estimators_[:self.n_trees]
+        self.classes_ = self.forest.classes_
+        self.n_features_in_ = self.forest.n_features_in_
+        self.n_trees_ = len(trees)
+
+        node_counts = np.array([tree.tree_.node_count for tree in trees])
+        self.tree_offsets_ = np.concatenate([[0], np.cumsum(node_counts)[:-1]]).astype(np.int32)
+        self.max_depth_ = max(tree.tree_.max_depth for tree in trees)
+
+        # Leaves point back at themselves (split on feature 0), so traversal
+        # runs a fixed max_depth steps with no leaf masking
+        index_dtype = _smallest_int(node_counts.max())
+        feature_dtype = _smallest_int(self.n_features_in_)
+        feature, left, right = [], [], []
+        for tree in trees:
+            leaf = tree.tree_.children_left < 0
+            local = np.arange(tree.tree_.node_count)
+            feature.append(np.where(leaf, 0, tree.tree_.feature))
+            left.append(np.where(leaf, local, tree.tree_.children_left))
+            right.append(np.where(leaf, local, tree.tree_.children_right))
+        self.feature_ = np.concatenate(feature).astype(feature_dtype)
+        self.threshold_ = np.concatenate([_round_down_float32(t.tree_.threshold) for t in trees])
+        self.children_left_ = np.concatenate(left).astype(index_dtype)
+        self.children_right_ = np.concatenate(right).astype(index_dtype)
+
+        # Every node keeps its class distribution (leaves for predictions,
+        # internal nodes for path contributions)
+        values = np.concatenate([t.tree_.value[:, 0, :] for t in trees])
+        self.value_ = (values / values.sum(axis=1, keepdims=True)).astype(np.float32)
+
+        self.feature_importances_ = np.mean([t.feature_importances_ for t in trees], axis=0)
+        self.forest = None
+        return self
+
+    def _leaf_nodes(self, X):
+        """Global leaf index reached in every tree, shape (rows, trees)"""
+        n, n_features = X.shape
+        flat = X.ravel()
+        row_base = (np.arange(n) * n_features)[:, None]
+        nodes = np.broadcast_to(self.tree_offsets_, (n, self.n_trees_)).copy()
+        for _ in range(self.max_depth_):
+            go_left = flat[row_base + self.feature_[nodes]] <= self.threshold_[nodes]
+            nodes = self.tree_offsets_ + np.where(go_left, self.children_left_[nodes], self.children_right_[nodes])
+        return nodes
+
+    def predict_proba(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        proba = np.empty((len(X), len(self.classes_)))
+        for start in range(0, len(X), PREDICT_BLOCK_ROWS):
+            leaves = self._leaf_nodes(X[start:start + PREDICT_BLOCK_ROWS])
+            proba[start:start + PREDICT_BLOCK_ROWS] = self.value_[leaves].mean(axis=1)
+        return proba
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def contributions(self, X):
+        """
+        Per-feature path contributions to the positive-class probability
+
+        Sums the probability change of every split along each row's path
+        (Saabas attribution), averaged over trees; rows add up to the
+        prediction minus the mean root probability.
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n, n_features = X.shape
+        flat = X.ravel()
+        row_base = (np.arange(n) * n_features)[:, None]
+        out = np.zeros(n * n_features)
+        nodes = np.broadcast_to(self.tree_offsets_, (n, self.n_trees_)).copy()
+        for _ in range(self.max_depth_):
+            feature = self.feature_[nodes]
+            go_left = flat[row_base + feature] <= self.threshold_[nodes]
+            children = self.tree_offsets_ + np.where(go_left, self.children_left_[nodes], self.children_right_[nodes])
+            delta = self.value_[children, -1] - self.value_[nodes, -1]
+            out += np.bincount((row_base + feature).ravel(), weights=delta.ravel(), minlength=n * n_features)
+            nodes = children
+        return out.reshape(n, n_features) / self.n_trees_
+
+
+def prune_tree_count(forest, X_val, y_val, tolerance=0.005):
+    """
+    Smallest k such that the first k trees score within ``tolerance`` of all trees
+
+    Per-tree probabilities are computed once; accuracy for every prefix
+    comes from a running mean.
+    """
+    tree_proba = np.stack([tree.predict_proba(np.asarray(X_val, dtype=np.float32))
+                           for tree in forest.estimators_])
+    prefix_mean = np.cumsum(tree_proba, axis=0) / np.arange(1, len(tree_proba) + 1)[:, None, None]
+    y_val = np.asarray(y_val)
+    accuracy = np.array([
+        accuracy_score(y_val, forest.classes_[np.argmax(mean, axis=1)]) for mean in prefix_mean
+    ])
+    return int(np.argmax(accuracy >= accuracy[-1] - tolerance)) + 1
+
+
+def _size_and_load_time(obj):
+    buffer = io.BytesIO()
+    joblib.dump(obj, buffer)
+    size = buffer.tell()
+    buffer.seek(0)
+    start = time.perf_counter()
+    joblib.load(buffer)
+    return size, time.perf_counter() - start
+
+
+def compact_forest(forest, X_val, y_val, tolerance=0.005):
+    """
+    Prune and flatten a fitted forest
+
+    Returns (compact model, report) where the report has serialized size,
+    load time and held-out accuracy before and after.
+    """
+    n_trees = prune_tree_count(forest, X_val, y_val, tolerance) if tolerance is not None else None
+    compact = CompactForestClassifier(forest, n_trees).fit()
+
+    report = {'tolerance': tolerance, 'trees_before': len(forest.estimators_), 'trees_after': compact.n_trees_}
+    for label, model in (('before', forest), ('after', compact)):
+        size, load_seconds = _size_and_load_time(model)
+        report[f'size_bytes_{label}'] = size
+        report[f'load_ms_{label}'] = round(load_seconds * 1e3, 2)
+        report[f'accuracy_{label}'] = float(accuracy_score(y_val, model.predict(X_val)))
+    return compact, report
@@ -0,0 +1,167 @@
+"""
+Cached binary dataset store for training data
+
+The first load of a CSV parses it once with explicit dtypes and writes a
+typed columnar copy (Arrow/Feather) keyed by the source file's hash;
+later loads memory-map that copy instead of re-parsing the CSV.
+
+Usage: python dataset_cache.py train.csv [test.csv ...]
+"""
+
+import hashlib
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+CACHE_DIR = Path('data') / 'cache'
+
+# Bump when TITANIC_DTYPES changes so old cache files are not reused
+CACHE_VERSION = 1
+
+TITANIC_DTYPES = {
+    'PassengerId': 'int32',
+    'Survived': 'int8',
+    'Pclass': 'int8',
+    'Name': 'string',
+    'Sex': 'category',
+    'Age': 'float64',
+    'SibSp': 'int8',
+    'Parch': 'int8',
+    'Ticket': 'string',
+    'Fare': 'float64',
+    'Cabin': 'string',
+    'Embarked': 'category',
+}
+
+# Rows per record batch in the cache file (unit of chunked reads)
+CACHE_CHUNK_ROWS = 1_000_000
+
+
+def file_hash(path, block_size=1 << 20):
+    """SHA-256 of a file, streamed in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def csv_dtypes(csv_path):
+    """Explicit dtypes for the columns actually present in a CSV"""
+    columns = pd.read_csv(csv_path, nrows=0).columns
+    return {col: TITANIC_DTYPES[col] for col in columns if col in TITANIC_DTYPES}
+
+
+def cache_path(csv_path, cache_dir=CACHE_DIR):
+    """Cache file for a CSV, keyed by its content hash"""
+    csv_path = Path(csv_path)
+    key = file_hash(csv_path)[:16]
+    suffix = '.feather' if HAS_PYARROW else '.pkl'
+    return Path(cache_dir) / f"{csv_path.stem}-v{CACHE_VERSION}-{key}{suffix}"
+
+
+def write_cache(df, path):
+    """Write a DataFrame to the binary cache format"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    if HAS_PYARROW:
+        # Uncompressed so the file can be memory-mapped
+        feather.write_feather(df, tmp_path, compression='uncompressed', chunksize=CACHE_CHUNK_ROWS)
+    else:
+        df.to_pickle(tmp_path)
+    tmp_path.replace(path)
+
+
+def restore_dtypes(df):
+    """Cast columns back to their TITANIC_DTYPES (build_cache stores categories as strings)"""
+    for col, dtype in TITANIC_DTYPES.items():
+        if dtype == 'category' and col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def read_cache(path):
+    """Load a cache file, memory-mapped when stored as Feather, with the dtypes load_dataset gives"""
+    path = Path(path)
+    if path.suffix == '.feather':
+        return restore_dtypes(feather.read_table(path, memory_map=True).to_pandas())
+    return restore_dtypes(pd.read_pickle(path))
+
+
+def load_dataset(csv_path, cache_dir=CACHE_DIR):
+    """Load a CSV through the binary cache, building the cache on first use"""
+    cached = cache_path(csv_path, cache_dir)
+    if cached.exists():
+        return read_cache(cached)
+
+    df = pd.read_csv(csv_path, dtype=csv_dtypes(csv_path))
+    write_cache(df, cached)
+    return df
+
+
+def iter_dataset_chunks(csv_path, chunksize=100_000, cache_dir=CACHE_DIR):
+    """
+    Yield DataFrame chunks of a dataset that may not fit in memory
+
+    Reads record batches from the memory-mapped cache when it exists,
+    otherwise streams the CSV itself with explicit dtypes.
+    """
+    cached = cache_path(csv_path, cache_dir)
+    if cached.exists() and cached.suffix == '.feather':
+        with pa.memory_map(str(cached)) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                for offset in range(0, batch.num_rows, chunksize):
+                    yield restore_dtypes(batch.slice(offset, chunksize).to_pandas())
+        return
+
+    yield from pd.read_csv(csv_path, dtype=csv_dtypes(csv_path), chunksize=chunksize)
+
+
+def build_cache(csv_path, cache_dir=CACHE_DIR, chunksize=CACHE_CHUNK_ROWS):
+    """
+    Convert a CSV to the cache without holding it all in memory
+
+    Streams CSV chunks into a Feather (Arrow IPC) file one record batch at
+    a time. Categorical columns become plain strings in the file and are
+    restored as categories on load.
+    """
+    cached = cache_path(csv_path, cache_dir)
+    if cached.exists():
+        return cached
+    if not HAS_PYARROW:
+        write_cache(pd.read_csv(csv_path, dtype=csv_dtypes(csv_path)), cached)
+        return cached
+
+    dtypes = {col: ('string' if dtype == 'category' else dtype)
+              for col, dtype in csv_dtypes(csv_path).items()}
+    cached.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cached.with_suffix(cached.suffix + '.tmp')
+
+    writer = None
+    try:
+        for chunk in pd.read_csv(csv_path, dtype=dtypes, chunksize=chunksize):
+            batch = pa.RecordBatch.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pa.ipc.new_file(str(tmp_path), batch.schema)
+            writer.write_batch(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+    tmp_path.replace(cached)
+    return cached
+
+
+if __name__ == "__main__":
+    for csv_file in sys.argv[1:] or ['train.csv']:
+        print(f"✅ {csv_file} -> {build_cache(csv_file)}")
@@ -2,14 +2,32 @@ import React, { useState, useEffect } from 'react';
 import { motion } from 'framer-motion';
 import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer, PieChart, Pie, Cell } from 'recharts';
 import { FaChartBar, FaUsers, FaPercent, FaBrain } from 'react-icons/fa';
-import { getFeatureImportance } from '../services/api';
+import { getCohorts, getFeatureImportance } from '../services/api';
 
 const Dashboard = () => {
   const [featureImportance, setFeatureImportance] = useState([]);
   const [loading, setLoading] = useState(true);
+  // Sample survival data by demographics, replaced by the model's cohort statistics once loaded
+  const [survivalByClass, setSurvivalByClass] = useState([
+    { name: '1st Class', survived: 62.96, died: 37.04 },
+    { name: '2nd Class', survived: 47.28, died: 52.72 },
+    { name: '3rd Class', survived: 24.24, died: 75.76 }
+  ]);
+  const [survivalByGender, setSurvivalByGender] = useState([
+    { name: 'Female', value: 74.20, color: '#ec4899' },
+    { name: 'Male', value: 18.89, color: '#3b82f6' }
+  ]);
+  const [survivalByAge, setSurvivalByAge] = useState([
+    { name: 'Children (0-12)', survived: 54 },
+    { name: 'Teens (13-18)', survived: 42 },
+    { name: 'Adults (19-35)', survived: 38 },
+    { name: 'Middle (36-60)', survived: 41 },
+    { name: 'Seniors (60+)', survived: 22 }
+  ]);
 
   useEffect(() => {
     loadFeatureImportance();
+    loadCohorts();
   }, []);
 
   const loadFeatureImportance = async () => {
@@ -23,25 +41,39 @@ const Dashboard = () => {
     }
   };
 
-  // Sample survival data by demographics
-  const survivalByClass = [
-    { name: '1st Class', survived: 62.96, died: 37.04 },
-    { name: '2nd Class', survived: 47.28, died: 52.72 },
-    { name: '3rd Class', survived: 24.24, died: 75.76 }
-  ];
-
-  const survivalByGender = [
-    { name: 'Female', value: 74.20, color: '#ec4899' },
-    { name: 'Male', value: 18.89, color: '#3b82f6' }
-  ];
-
-  const survivalByAge = [
-    { name: 'Children (0-12)', survived: 54 },
-    { name: 'Teens (13-18)', survived: 42 },
-    { name: 'Adults (19-35)', survived: 38 },
-    { name: 'Middle (36-60)', survived: 41 },
-    { name: 'Seniors (60+)', survived: 22 }
-  ];
+  const loadCohorts = async () => {
+    const percent = (rate) => Math.round(rate * 10000) / 100;
+    try {
+      const [byClass, byGender, byAge] = await Promise.all([
+        getCohorts(['pclass']),
+        getCohorts(['sex']),
+        getCohorts(['age_group'])
+      ]);
+      const classNames = { 1: '1st Class', 2: '2nd Class', 3: '3rd Class' };
+      setSurvivalByClass(byClass.cohorts.map((cohort) => ({
+        name: classNames[cohort.pclass],
+        survived: percent(cohort.survival_rate),
+        died: Math.round((100 - percent(cohort.survival_rate)) * 100) / 100
+      })));
+      const genderColors = { female: '#ec4899', male: '#3b82f6' };
+      setSurvivalByGender(byGender.cohorts.map((cohort) => ({
+        name: cohort.sex === 'female' ? 'Female' : 'Male',
+        value: percent(cohort.survival_rate),
+        color: genderColors[cohort.sex]
+      })));
+      const ageNames = {
+        Child: 'Children (0-12)', Teen: 'Teens (13-18)', Adult: 'Adults (19-35)',
+        Middle: 'Middle (36-60)', Senior: 'Seniors (60+)'
+      };
+      setSurvivalByAge(byAge.cohorts.map((cohort) => ({
+        name: ageNames[cohort.age_group],
+        survived: percent(cohort.survival_rate)
+      })));
+    } catch (error) {
+      // Older model artifacts have no cohort cube; keep the sample figures
+      console.error('Failed to load cohort statistics:', error);
+    }
+  };
 
   const statCards = [
     {
@@ -122,7 +122,7 @@ const PredictionResult = ({ prediction }) => {
             Top Influencing Factors
           </h4>
           <div className="space-y-3">
-            {Object.entries(prediction.feature_contributions).slice(0, 5).map(([feature, importance], index) => (
+            {Object.entries(prediction.feature_contributions).slice(0, 5).map(([feature, contribution], index) => (
               <motion.div
                 key={feature}
                 initial={{ width: 0 }}
@@ -131,14 +131,18 @@ const PredictionResult = ({ prediction }) => {
               >
                 <div className="flex justify-between text-sm mb-1">
                   <span className="font-medium text-gray-700 dark:text-gray-300">{feature}</span>
-                  <span className="text-gray-600 dark:text-gray-400">{(importance * 100).toFixed(1)}%</span>
+                  <span className={contribution >= 0 ? 'text-green-600 dark:text-green-400' : 'text-red-600 dark:text-red-400'}>
+                    {contribution >= 0 ? '+' : ''}{contribution.toFixed(2)}
+                  </span>
                 </div>
                 <div className="w-full bg-gray-200 dark:bg-gray-700 rounded-full h-2">
                   <motion.div
                     initial={{ width: 0 }}
-                    animate={{ width: `${importance * 100}%` }}
+                    animate={{ width: `${Math.min(Math.abs(contribution) * 25, 100)}%` }}
                     transition={{ delay: 0.1 * index, duration: 0.8 }}
-                    className="bg-gradient-to-r from-blue-500 to-purple-500 h-2 rounded-full"
+                    className={`bg-gradient-to-r h-2 rounded-full ${
+                      contribution >= 0 ? 'from-green-500 to-emerald-500' : 'from-red-500 to-pink-500'
+                    }`}
                   />
                 </div>
               </motion.div>
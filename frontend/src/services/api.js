@@ -12,7 +12,9 @@ const api = axios.create({
 
 export const predictSurvival = async (passengerData) => {
   try {
-    const response = await api.post('/api/v1/predict', passengerData);
+    const response = await api.post('/api/v1/predict', passengerData, {
+      params: { explain: true },
+    });
     return response.data;
   } catch (error) {
     throw error.response?.data?.detail || 'Failed to make prediction';
@@ -28,6 +30,74 @@ export const batchPredict = async (passengers) => {
   }
 };
 
+export const batchPredictColumnar = async (columns) => {
+  try {
+    const response = await api.post('/api/v1/predict/batch/columnar', columns);
+    return response.data;
+  } catch (error) {
+    throw error.response?.data?.detail || 'Failed to make batch prediction';
+  }
+};
+
+export const predictSweep = async (passenger, axes) => {
+  try {
+    const response = await api.post('/api/v1/predict/sweep', { passenger, axes });
+    return response.data;
+  } catch (error) {
+    throw error.response?.data?.detail || 'Failed to run what-if sweep';
+  }
+};
+
+export const getSimilarPassengers = async (passengers, k = 5) => {
+  try {
+    const response = await api.post('/api/v1/passengers/similar', { passengers, k });
+    return response.data;
+  } catch (error) {
+    throw error.response?.data?.detail || 'Failed to find similar passengers';
+  }
+};
+
+export const submitBatchJob = async (file) => {
+  try {
+    const form = new FormData();
+    form.append('file', file);
+    const response = await api.post('/api/v1/jobs', form, {
+      headers: { 'Content-Type': 'multipart/form-data' },
+      timeout: 0,
+    });
+    return response.data;
+  } catch (error) {
+    throw error.response?.data?.detail || 'Failed to submit batch job';
+  }
+};
+
+export const getBatchJob = async (jobId) => {
+  try {
+    const response = await api.get(`/api/v1/jobs/${jobId}`);
+    return response.data;
+  } catch (error) {
+    throw error.response?.data?.detail || 'Failed to fetch batch job';
+  }
+};
+
+export const watchBatchJob = (jobId, onUpdate) => {
+  const source = new EventSource(`${API_BASE_URL}/api/v1/jobs/${jobId}/events`);
+  const handle = (event) => {
+    const job = JSON.parse(event.data);
+    onUpdate(job);
+    if (['succeeded', 'failed', 'cancelled'].includes(job.status)) {
+      source.close();
+    }
+  };
+  ['queued', 'running', 'succeeded', 'failed', 'cancelled'].forEach((status) =>
+    source.addEventListener(status, handle)
+  );
+  source.addEventListener('deleted', () => source.close());
+  return () => source.close();
+};
+
+export const batchJobResultUrl = (jobId) => `${API_BASE_URL}/api/v1/jobs/${jobId}/result`;
+
 export const getModelInfo = async () => {
   try {
     const response = await api.get('/api/v1/model/info');
@@ -55,6 +125,17 @@ export const getFeatureImportance = async () => {
   }
 };
 
+export const getCohorts = async (groupBy, filters = {}) => {
+  try {
+    const response = await api.get('/api/v1/cohorts', {
+      params: { group_by: groupBy.join(','), ...filters }
+    });
+    return response.data;
+  } catch (error) {
+    throw error.response?.data?.detail || 'Failed to fetch cohort statistics';
+  }
+};
+
 export const checkHealth = async () => {
   try {
     const response = await api.get('/health');
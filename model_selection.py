@@ -0,0 +1,148 @@
+"""
+Latency-aware model selection
+
+Every trained model is benchmarked as it will be served (through
+``backend.ensemble.prepare_for_serving``, at the worker's thread budget)
+for batches of 1, 100 and 10k rows: p50/p99 latency of
+``predict_proba``, pickled size and peak Python-heap allocation while
+scoring the largest batch (tracemalloc; native XGBoost/LightGBM buffers
+are not visible to it). Together with held-out accuracy this gives a
+Pareto table of accuracy against p99 latency, from which the deployed
+model is chosen: the most accurate one overall, or the most accurate
+one within a p99 budget at a chosen batch size.
+"""
+
+import copy
+import pickle
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+import numpy as np
+from sklearn.metrics import accuracy_score
+
+from backend.ensemble import prepare_for_serving
+from backend.resources import plan_resources
+
+LATENCY_BATCH_SIZES = [1, 100, 10_000]
+LATENCY_ROUNDS = {1: 200, 100: 50, 10_000: 5}
+# Slow models stop early: at most this long per (model, batch size), but never under MIN_ROUNDS
+LATENCY_MAX_SECONDS = 2.0
+MIN_ROUNDS = 5
+
+
+def _latencies_ms(predict_proba, X, rounds: int) -> np.ndarray:
+    predict_proba(X)
+    timings = []
+    deadline = time.perf_counter() + LATENCY_MAX_SECONDS
+    while len(timings) < rounds and (len(timings) < MIN_ROUNDS or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        predict_proba(X)
+        timings.append(time.perf_counter() - start)
+    return np.array(timings) * 1e3
+
+
+def _peak_allocation(predict_proba, X) -> int:
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    predict_proba(X)
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    if started:
+        tracemalloc.stop()
+    return max(peak, 0)
+
+
+def latency_table(models: Dict, X_test, y_test, batch_sizes: List[int] = LATENCY_BATCH_SIZES,
+                  threads: int = None, seed: int = 42) -> List[Dict]:
+    """Accuracy, latency per batch size and memory for every model"""
+    threads = plan_resources()["model_threads"] if threads is None else threads
+    rng = np.random.default_rng(seed)
+    batches = {size: X_test[rng.integers(0, len(X_test), size)] for size in batch_sizes}
+
+    table = []
+    for name, model in models.items():
+        served = prepare_for_serving({name: copy.deepcopy(model)}, threads)[name]
+        latency = {}
+        for size in batch_sizes:
+            timings = _latencies_ms(served.predict_proba, batches[size], LATENCY_ROUNDS.get(size, 10))
+            latency[str(size)] = {
+                "p50_ms": round(float(np.percentile(timings, 50)), 4),
+                "p99_ms": round(float(np.percentile(timings, 99)), 4),
+                "rounds": len(timings)
+            }
+        table.append({
+            "name": name,
+            "accuracy": round(float(accuracy_score(y_test, model.predict(X_test))), 4),
+            "latency": latency,
+            "serialized_bytes": len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)),
+            "predict_peak_bytes": _peak_allocation(served.predict_proba, batches[max(batch_sizes)])
+        })
+    return table
+
+
+def p99_ms(row: Dict, batch_size: int) -> float:
+    return row["latency"][str(batch_size)]["p99_ms"]
+
+
+def mark_pareto(table: List[Dict], batch_size: int) -> List[Dict]:
+    """Flag models no other model beats on both accuracy and p99 latency at ``batch_size``"""
+    for row in table:
+        row["pareto"] = not any(
+            other["accuracy"] >= row["accuracy"] and p99_ms(other, batch_size) <= p99_ms(row, batch_size)
+            and (other["accuracy"] > row["accuracy"] or p99_ms(other, batch_size) < p99_ms(row, batch_size))
+            for other in table
+        )
+    return table
+
+
+def select_model(table: List[Dict], budget_ms: Optional[float] = None, batch_size: int = 1) -> Dict:
+    """
+    Pick the deployed model from a latency table
+
+    Without a budget: the most accurate model. With one: the most
+    accurate model whose p99 at ``batch_size`` fits the budget, falling
+    back to the fastest model when none does. Accuracy ties go to the
+    faster model.
+    """
+    if str(batch_size) not in table[0]["latency"]:
+        raise ValueError(f"No latency measured at batch size {batch_size}")
+    mark_pareto(table, batch_size)
+
+    candidates = table if budget_ms is None else [row for row in table if p99_ms(row, batch_size) <= budget_ms]
+    if candidates:
+        chosen = max(candidates, key=lambda row: (row["accuracy"], -p99_ms(row, batch_size)))
+        reason = "most accurate" if budget_ms is None else \
+            f"most accurate with p99 <= {budget_ms:g} ms at batch size {batch_size}"
+    else:
+        chosen = min(table, key=lambda row: p99_ms(row, batch_size))
+        reason = f"no model meets p99 <= {budget_ms:g} ms at batch size {batch_size}; fastest"
+
+    return {
+        "objective": "accuracy" if budget_ms is None else "accuracy_within_p99_budget",
+        "budget_ms": budget_ms,
+        "batch_size": batch_size,
+        "selected": chosen["name"],
+        "reason": reason,
+        "table": table
+    }
+
+
+def format_table(selection: Dict) -> List[str]:
+    """Printable lines of the Pareto table, sorted by p99 at the objective's batch size"""
+    batch_size = selection["batch_size"]
+    sizes = list(selection["table"][0]["latency"])
+    header = f"  {'model':<20} {'accuracy':>8} " + ' '.join(f"{'p99@' + size:>10}" for size in sizes) \
+        + f" {'pickle KB':>10} {'peak KB':>9}  pareto"
+    lines = [header]
+    for row in sorted(selection["table"], key=lambda row: p99_ms(row, batch_size)):
+        marker = '★' if row["name"] == selection["selected"] else ' '
+        lines.append(
+            f"{marker} {row['name']:<20} {row['accuracy']:>8.4f} "
+            + ' '.join(f"{row['latency'][size]['p99_ms']:>8.3f}ms" for size in sizes)
+            + f" {row['serialized_bytes'] / 1024:>10.0f} {row['predict_peak_bytes'] / 1024:>9.0f}  "
+            + ('yes' if row.get("pareto") else '')
+        )
+    return lines
@@ -0,0 +1,119 @@
+"""
+On-disk cache for training pipeline stages
+
+Each stage's output is stored under a key hashed from its name and
+inputs: configuration (model parameters, flags), the keys of the stages
+it consumes, the dataset hash and a version of the code that computes
+it. A rerun loads every stage whose key is unchanged and recomputes the
+rest, so changing one model's parameters only retrains that model and
+the stages downstream of it.
+
+Stage files live in data/cache/stages (``--no-cache`` ignores them).
+"""
+
+import hashlib
+import inspect
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import joblib
+import pandas as pd
+
+from dataset_cache import CACHE_DIR
+
+STAGE_CACHE_DIR = CACHE_DIR / 'stages'
+
+# Bump to invalidate every cached stage (e.g. when the payload layout changes)
+STAGE_CACHE_VERSION = 1
+
+
+def code_version(*objects) -> str:
+    """Hash of the source of functions, classes or modules; changes when their code does"""
+    digest = hashlib.sha256()
+    for obj in objects:
+        digest.update(inspect.getsource(obj).encode())
+    return digest.hexdigest()[:16]
+
+
+def frame_hash(df: pd.DataFrame) -> str:
+    """Content hash of a DataFrame, for datasets that did not come from a file"""
+    digest = hashlib.sha256(','.join(map(str, df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def stage_key(name: str, inputs: Dict) -> str:
+    payload = json.dumps({'stage': name, 'version': STAGE_CACHE_VERSION, 'inputs': inputs},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+class StageCache:
+    """Runs stages through the cache and records which were reused"""
+
+    def __init__(self, cache_dir=STAGE_CACHE_DIR, enabled: bool = True):
+        self.cache_dir = Path(cache_dir)
+        self.enabled = enabled
+        self.records: List[Dict] = []
+
+    def path(self, name: str, key: str) -> Path:
+        return self.cache_dir / f"{name}-{key}.joblib"
+
+    def run(self, name: str, inputs: Dict, compute: Callable[[], Any]):
+        """
+        Output of a stage and its key, loaded from the cache when possible
+
+        ``compute`` takes no arguments and returns the stage output, which
+        must be picklable. Cache files are written atomically.
+        """
+        key = stage_key(name, inputs)
+        path = self.path(name, key)
+        start = time.perf_counter()
+        if self.enabled and path.exists():
+            try:
+                payload = joblib.load(path)
+                self._record(name, key, True, time.perf_counter() - start, payload['seconds'])
+                return payload['output'], key
+            except Exception as e:
+                print(f"⚠️  Cached stage {name} unreadable, recomputing - {e}")
+
+        output = compute()
+        seconds = time.perf_counter() - start
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        joblib.dump({'output': output, 'seconds': seconds, 'created_at': time.time()}, tmp_path)
+        tmp_path.replace(path)
+        self._record(name, key, False, seconds, seconds)
+        return output, key
+
+    def _record(self, name: str, key: str, cached: bool, seconds: float, compute_seconds: float):
+        self.records.append({
+            'stage': name,
+            'key': key,
+            'cached': cached,
+            'seconds': seconds,
+            'compute_seconds': compute_seconds
+        })
+
+    def summary(self) -> Dict:
+        cached = [record for record in self.records if record['cached']]
+        return {
+            'stages': self.records,
+            'cached': len(cached),
+            'recomputed': len(self.records) - len(cached),
+            'seconds': sum(record['seconds'] for record in self.records),
+            'saved_seconds': sum(record['compute_seconds'] - record['seconds'] for record in cached)
+        }
+
+    def print_summary(self):
+        summary = self.summary()
+        print("\n" + "="*60)
+        print("🗂️  PIPELINE STAGES")
+        print("="*60)
+        for record in self.records:
+            status = '♻️  cached    ' if record['cached'] else '🔨 recomputed'
+            print(f"  {status} {record['stage']:<28} {record['seconds']:>8.2f}s  [{record['key']}]")
+        print(f"\n  {summary['cached']} cached, {summary['recomputed']} recomputed; "
+              f"{summary['seconds']:.1f}s spent, ~{summary['saved_seconds']:.1f}s saved by the cache")
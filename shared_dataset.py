@@ -0,0 +1,48 @@
+"""
+Memory-mapped training arrays shared with parallel CV workers
+
+joblib pickles ``np.memmap`` arguments as a reference (file name, offset,
+shape), so GridSearchCV / VotingClassifier workers attach to one copy of
+the training matrix instead of receiving it with every task.
+"""
+
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+
+# Below this, pickling is cheaper than a file round-trip (joblib's own cutoff)
+SHARED_MIN_BYTES = 1 << 20
+
+
+def _shared_dir():
+    """RAM-backed /dev/shm when available, else the default temp dir"""
+    if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+        return '/dev/shm'
+    return None
+
+
+@contextmanager
+def shared_arrays(*arrays, min_bytes=SHARED_MIN_BYTES):
+    """
+    Yield read-only memory-mapped copies of ``arrays`` for parallel fits
+
+    Arrays smaller than ``min_bytes`` are passed through as plain ndarrays.
+    The backing files are removed on exit.
+    """
+    directory = tempfile.mkdtemp(prefix='titanic-shared-', dir=_shared_dir())
+    try:
+        shared = []
+        for i, array in enumerate(arrays):
+            array = np.asarray(array)
+            if array.nbytes < min_bytes:
+                shared.append(array)
+                continue
+            path = os.path.join(directory, f'array-{i}.npy')
+            np.save(path, np.ascontiguousarray(array))
+            shared.append(np.load(path, mmap_mode='r'))
+        yield shared
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,72 @@
+"""
+Nearest training passengers for a prediction
+
+The trainer builds an exact KD-tree over the scaled feature matrix from
+``prepare_data`` (the space the models see) and stores it in the
+artifact with each training passenger's id, name, class, sex, age and
+outcome. A query is the passenger's scaled features; ``KDTree.query``
+answers a whole batch in one call, in roughly O(log n) per passenger
+instead of a scan over every training row.
+"""
+
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import KDTree
+
+# Points per leaf; sklearn's default, re-checked with benchmarks/bench_similar_passengers.py
+LEAF_SIZE = 40
+
+# Largest k served per query
+MAX_NEIGHBORS = 50
+
+
+def build_neighbor_index(X, df: pd.DataFrame, leaf_size: int = LEAF_SIZE) -> Dict:
+    """KD-tree over scaled training rows plus what to show for each neighbour"""
+    return {
+        'tree': KDTree(np.asarray(X, dtype=np.float64), leaf_size=leaf_size),
+        'passenger_id': df['PassengerId'].to_numpy(dtype=np.int64) if 'PassengerId' in df.columns
+        else np.arange(1, len(df) + 1, dtype=np.int64),
+        'name': df['Name'].fillna('Unknown').to_numpy(dtype=object),
+        'pclass': df['Pclass'].to_numpy(dtype=np.int8),
+        'sex': df['Sex'].to_numpy(dtype=object),
+        'age': df['Age'].to_numpy(dtype=np.float64),
+        'survived': df['Survived'].to_numpy(dtype=np.int8)
+    }
+
+
+class SimilarPassengers:
+    """Top-k queries against an index built by ``build_neighbor_index``"""
+
+    def __init__(self, index: Dict):
+        self.tree = index['tree']
+        self.columns = {key: value for key, value in index.items() if key != 'tree'}
+
+    @property
+    def size(self) -> int:
+        return len(self.columns['survived'])
+
+    def query(self, X, k: int) -> List[Dict]:
+        """Neighbours (nearest first) and their survival rate for every row of X"""
+        k = min(k, self.size)
+        distances, rows = self.tree.query(np.asarray(X, dtype=np.float64), k=k)
+        results = []
+        for query_distances, query_rows in zip(distances, rows):
+            neighbours = [
+                {
+                    "passenger_id": int(self.columns['passenger_id'][row]),
+                    "name": self.columns['name'][row],
+                    "pclass": int(self.columns['pclass'][row]),
+                    "sex": self.columns['sex'][row],
+                    "age": None if np.isnan(self.columns['age'][row]) else float(self.columns['age'][row]),
+                    "survived": bool(self.columns['survived'][row]),
+                    "distance": round(float(distance), 4)
+                }
+                for distance, row in zip(query_distances, query_rows)
+            ]
+            results.append({
+                "neighbours": neighbours,
+                "neighbour_survival_rate": round(float(self.columns['survived'][query_rows].mean()), 4)
+            })
+        return results
@@ -3,14 +3,20 @@ Advanced Titanic Survival Prediction Model Training
 Features: XGBoost, LightGBM, Feature Engineering, Hyperparameter Tuning
 """
 
+import argparse
+import json
+import subprocess
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 import os
 os.environ['PYTHONWARNINGS'] = 'ignore'
 
 import pandas as pd
+from pandas.api.types import union_categoricals
 import numpy as np
 from sklearn.model_selection import train_test_split, GridSearchCV, cross_val_score
+from sklearn.inspection import permutation_importance
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.ensemble import RandomForestClassifier, VotingClassifier
 from sklearn.linear_model import LogisticRegression
@@ -18,6 +24,7 @@ from sklearn.metrics import (
     accuracy_score, precision_score, recall_score, f1_score,
     confusion_matrix, classification_report, roc_auc_score, roc_curve
 )
+import sklearn
 import xgboost as xgb
 import lightgbm as lgb
 import joblib
@@ -25,10 +32,153 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import warnings
 import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from backend.resources import available_cpus, plan_resources
+from cohort_cube import build_cohort_cube
+from compact_forest import CompactForestClassifier, compact_forest, prune_tree_count
+from dataset_cache import CACHE_DIR, HAS_PYARROW, file_hash, iter_dataset_chunks, load_dataset, read_cache, write_cache
+from model_selection import LATENCY_BATCH_SIZES, format_table, latency_table, select_model
+from pipeline_cache import StageCache, code_version, frame_hash
+from shared_dataset import shared_arrays
+from similar_passengers import build_neighbor_index
+
 warnings.filterwarnings('ignore')
 
+CATEGORICAL_FEATURES = ['Embarked', 'Title', 'AgeGroup', 'FareBin', 'CabinDeck']
+NUMERICAL_FEATURES = ['Pclass', 'Age', 'SibSp', 'Parch', 'Fare',
+                      'FamilySize', 'IsAlone', 'SmallFamily', 'LargeFamily',
+                      'Age_Class', 'Fare_Per_Person', 'HasCabin', 'Sex_Binary']
+
+TITLE_REPLACEMENTS = {
+    **{title: 'Rare' for title in ['Lady', 'Countess', 'Capt', 'Col', 'Don', 'Dr',
+                                   'Major', 'Rev', 'Sir', 'Jonkheer', 'Dona']},
+    'Mlle': 'Miss', 'Ms': 'Miss', 'Mme': 'Mrs'
+}
+
+# Hyperparameters per model, in training order (the logistic regression
+# entry is its grid search space). Part of each model stage's cache key.
+MODEL_PARAMS = {
+    'logistic_regression': {
+        'C': [0.01, 0.1, 1, 10],
+        'penalty': ['l2'],
+        'solver': ['lbfgs'],
+        'max_iter': [1000]
+    },
+    'random_forest': {
+        'n_estimators': 300,
+        'max_depth': 10,
+        'min_samples_split': 5,
+        'min_samples_leaf': 2,
+        'random_state': 42,
+        'n_jobs': -1
+    },
+    'xgboost': {
+        'n_estimators': 300,
+        'learning_rate': 0.05,
+        'max_depth': 6,
+        'min_child_weight': 3,
+        'gamma': 0.1,
+        'subsample': 0.8,
+        'colsample_bytree': 0.8,
+        'objective': 'binary:logistic',
+        'random_state': 42,
+        'n_jobs': -1
+    },
+    'lightgbm': {
+        'n_estimators': 300,
+        'learning_rate': 0.05,
+        'max_depth': 6,
+        'num_leaves': 31,
+        'min_child_samples': 20,
+        'subsample': 0.8,
+        'colsample_bytree': 0.8,
+        'random_state': 42,
+        'n_jobs': -1,
+        'verbose': -1
+    },
+    'ensemble': {
+        'members': [('lr', 'logistic_regression'), ('rf', 'random_forest'),
+                    ('xgb', 'xgboost'), ('lgb', 'lightgbm')],
+        'voting': 'soft',
+        'n_jobs': -1
+    }
+}
+
+# Rows per string-parsing chunk in lean feature mode
+LEAN_CHUNK_ROWS = 200_000
+
+
+def _chunked_categorical(series, func, chunksize=LEAN_CHUNK_ROWS):
+    """Apply a string transform chunk by chunk, keeping only categorical results"""
+    parts = [func(series.iloc[start:start + chunksize]).astype('category')
+             for start in range(0, len(series), chunksize)]
+    if not parts:
+        return pd.Categorical([])
+    return union_categoricals(parts)
+
+
+def ranked_importances(feature_names, values, std=None):
+    """Importances as [{name, importance[, std]}], most important first"""
+    ranked = []
+    for i in np.argsort(values)[::-1]:
+        item = {'name': feature_names[i], 'importance': float(values[i])}
+        if std is not None:
+            item['std'] = float(std[i])
+        ranked.append(item)
+    return ranked
+
+
+def default_importance_kind(importances):
+    """The model's own measure when it has one, else permutation"""
+    for kind in ('native', 'permutation', 'coefficient'):
+        if kind in importances:
+            return kind
+    return None
+
+
+# Out-of-core training: bounded sample used for medians and fare quantiles
+OUT_OF_CORE_SAMPLE_ROWS = 1_000_000
+OUT_OF_CORE_DIR = CACHE_DIR / 'out_of_core'
+
+VISUALIZATION_DIR = Path('models/visualizations')
+VISUALIZATION_MODES = ['sync', 'parallel', 'background', 'skip']
+PLOT_DPI = 150
+ROC_POINTS = 101
+
+# Permutation importance: repeats per feature, held-out rows used at most
+IMPORTANCE_REPEATS = 10
+IMPORTANCE_MAX_ROWS = 10_000
+
+
+class _ValueSample:
+    """Bounded, approximately uniform sample of a column seen chunk by chunk"""
+    
+    def __init__(self, capacity=OUT_OF_CORE_SAMPLE_ROWS, seed=42):
+        self.capacity = capacity
+        self.rate = 1.0
+        self.parts = []
+        self.size = 0
+        self.rng = np.random.default_rng(seed)
+    
+    def add(self, values):
+        if self.rate < 1.0:
+            values = values[self.rng.random(len(values)) < self.rate]
+        self.parts.append(values)
+        self.size += len(values)
+        # Over capacity: keep each value with probability 1/2, halve the rate
+        while self.size > self.capacity:
+            values = np.concatenate(self.parts)
+            values = values[self.rng.random(len(values)) < 0.5]
+            self.parts = [values]
+            self.size = len(values)
+            self.rate /= 2
+    
+    def values(self):
+        return np.concatenate(self.parts) if self.parts else np.empty(0)
+
+
 class TitanicModelTrainer:
     """Advanced Titanic Survival Prediction Model with Feature Engineering"""
     
@@ -38,15 +188,36 @@ class TitanicModelTrainer:
         self.scaler = StandardScaler()
         self.label_encoders = {}
         self.feature_names = []
+        # Training-set statistics reused when featurizing new passengers
+        self.fill_values = {}
+        self.fare_bin_edges = None
+        # Per model: {'permutation' | 'coefficient' | 'native': ranked importances}
+        self.importances = {}
+        self.forest_compaction = None
+        # Survival statistics over the training passengers (see cohort_cube)
+        self.cohort_cube = None
+        # KD-tree over the scaled training rows (see similar_passengers)
+        self.neighbor_index = None
+        # Accuracy/latency table and how the deployed model was chosen (see model_selection)
+        self.model_selection = None
         
-    def create_features(self, df):
+    def create_features(self, df, is_training=True, lean=False):
         """Advanced feature engineering"""
+        if lean:
+            return self._create_features_lean(df, is_training=is_training)
+        
         df = df.copy()
         
         # Fill missing values
-        df['Age'].fillna(df['Age'].median(), inplace=True)
-        df['Fare'].fillna(df['Fare'].median(), inplace=True)
-        df['Embarked'].fillna(df['Embarked'].mode()[0], inplace=True)
+        if is_training or not self.fill_values:
+            self.fill_values = {
+                'Age': df['Age'].median(),
+                'Fare': df['Fare'].median(),
+                'Embarked': df['Embarked'].mode()[0]
+            }
+        df['Age'] = df['Age'].fillna(self.fill_values['Age'])
+        df['Fare'] = df['Fare'].fillna(self.fill_values['Fare'])
+        df['Embarked'] = df['Embarked'].fillna(self.fill_values['Embarked'])
         
         # Extract titles from names
         df['Title'] = df['Name'].str.extract(r' ([A-Za-z]+)\.', expand=False)
@@ -67,8 +238,15 @@ class TitanicModelTrainer:
         df['AgeGroup'] = pd.cut(df['Age'], bins=[0, 12, 18, 35, 60, 100],
                                 labels=['Child', 'Teen', 'Adult', 'Middle', 'Senior'])
         
-        # Fare bins
-        df['FareBin'] = pd.qcut(df['Fare'], q=5, labels=['Very_Low', 'Low', 'Medium', 'High', 'Very_High'])
+        # Fare bins (quantile edges from training, reused for new passengers)
+        fare_labels = ['Very_Low', 'Low', 'Medium', 'High', 'Very_High']
+        if is_training or self.fare_bin_edges is None:
+            df['FareBin'], edges = pd.qcut(df['Fare'], q=5, labels=fare_labels, retbins=True)
+            if is_training:
+                self.fare_bin_edges = edges
+        else:
+            bins = np.concatenate([[-np.inf], self.fare_bin_edges[1:-1], [np.inf]])
+            df['FareBin'] = pd.cut(df['Fare'], bins=bins, labels=fare_labels)
         
         # Interaction features
         df['Age_Class'] = df['Age'] * df['Pclass']
@@ -87,15 +265,123 @@ class TitanicModelTrainer:
         
         return df
     
-    def prepare_data(self, df, is_training=True):
+    def _create_features_lean(self, df, is_training=True):
+        """
+        Memory-lean create_features for frames of tens of millions of rows
+        
+        Same features, but builds a new frame holding only the model inputs
+        (no copy of the raw columns), with categorical, int8/int16 and float32
+        dtypes; string parsing runs in chunks of LEAN_CHUNK_ROWS.
+        """
+        if is_training or not self.fill_values:
+            self.fill_values = {
+                'Age': df['Age'].median(),
+                'Fare': df['Fare'].median(),
+                'Embarked': df['Embarked'].mode()[0]
+            }
+        
+        out = {}
+        out['Pclass'] = df['Pclass'].to_numpy(dtype=np.int8)
+        out['SibSp'] = df['SibSp'].to_numpy(dtype=np.int8)
+        out['Parch'] = df['Parch'].to_numpy(dtype=np.int8)
+        # Bins are assigned on float64 values so edges match the default path
+        age = df['Age'].to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+        age[np.isnan(age)] = self.fill_values['Age']
+        fare = df['Fare'].to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+        fare[np.isnan(fare)] = self.fill_values['Fare']
+        
+        embarked = df['Embarked'].astype('category')
+        if self.fill_values['Embarked'] not in embarked.cat.categories:
+            embarked = embarked.cat.add_categories([self.fill_values['Embarked']])
+        out['Embarked'] = embarked.fillna(self.fill_values['Embarked']).array
+        
+        out['Title'] = _chunked_categorical(
+            df['Name'],
+            lambda names: names.str.extract(r' ([A-Za-z]+)\.', expand=False).replace(TITLE_REPLACEMENTS)
+        )
+        
+        family_size = out['SibSp'].astype(np.int16) + out['Parch'] + 1
+        out['FamilySize'] = family_size
+        out['IsAlone'] = (family_size == 1).astype(np.int8)
+        out['SmallFamily'] = ((family_size >= 2) & (family_size <= 4)).astype(np.int8)
+        out['LargeFamily'] = (family_size >= 5).astype(np.int8)
+        
+        out['AgeGroup'] = pd.cut(age, bins=[0, 12, 18, 35, 60, 100],
+                                 labels=['Child', 'Teen', 'Adult', 'Middle', 'Senior'])
+        
+        fare_labels = ['Very_Low', 'Low', 'Medium', 'High', 'Very_High']
+        if is_training or self.fare_bin_edges is None:
+            out['FareBin'], edges = pd.qcut(fare, q=5, labels=fare_labels, retbins=True)
+            if is_training:
+                self.fare_bin_edges = edges
+        else:
+            bins = np.concatenate([[-np.inf], self.fare_bin_edges[1:-1], [np.inf]])
+            out['FareBin'] = pd.cut(fare, bins=bins, labels=fare_labels)
+        
+        out['Age'] = age = age.astype(np.float32)
+        out['Fare'] = fare = fare.astype(np.float32)
+        out['Age_Class'] = age * out['Pclass']
+        out['Fare_Per_Person'] = fare / family_size.astype(np.float32)
+        
+        if 'Cabin' in df.columns:
+            out['HasCabin'] = df['Cabin'].notna().to_numpy(dtype=np.int8)
+            out['CabinDeck'] = _chunked_categorical(
+                df['Cabin'], lambda cabins: cabins.str[0].fillna('Unknown')
+            )
+        else:
+            out['HasCabin'] = np.zeros(len(df), dtype=np.int8)
+            out['CabinDeck'] = pd.Categorical(['Unknown'] * len(df))
+        
+        out['Sex_Binary'] = (df['Sex'] == 'male').to_numpy(dtype=np.int8)
+        
+        return pd.DataFrame(out, index=df.index, copy=False)
+    
+    def _encode_categorical(self, col, values, is_training=True):
+        """
+        Label-encode a categorical column through its categories
+        
+        Encodes the (few) category labels instead of every row, producing
+        the same codes and encoder classes as ``astype(str)`` + LabelEncoder.
+        """
+        values = pd.Categorical(values).remove_unused_categories()
+        labels = values.categories.astype(str).tolist()
+        codes = values.codes
+        if (codes < 0).any():
+            # Missing values encode as 'nan', like astype(str); code -1 indexes it
+            labels.append('nan')
+        
+        if is_training:
+            self.label_encoders[col] = LabelEncoder().fit(labels)
+        encoder = self.label_encoders[col]
+        labels = np.where(np.isin(labels, encoder.classes_), labels, encoder.classes_[0])
+        lookup = encoder.transform(labels).astype(np.int16)
+        return lookup[codes]
+    
+    def prepare_data(self, df, is_training=True, lean=False):
         """Prepare data for training or prediction"""
-        df = self.create_features(df)
+        df = self.create_features(df, is_training=is_training, lean=lean)
         
         # Select features
-        categorical_features = ['Embarked', 'Title', 'AgeGroup', 'FareBin', 'CabinDeck']
-        numerical_features = ['Pclass', 'Age', 'SibSp', 'Parch', 'Fare', 
-                             'FamilySize', 'IsAlone', 'SmallFamily', 'LargeFamily',
-                             'Age_Class', 'Fare_Per_Person', 'HasCabin', 'Sex_Binary']
+        categorical_features = CATEGORICAL_FEATURES
+        numerical_features = NUMERICAL_FEATURES
+        
+        self.feature_names = numerical_features + categorical_features
+        
+        if lean:
+            # Fill one float32 matrix column by column, no float64 interleave
+            X = np.empty((len(df), len(self.feature_names)), dtype=np.float32)
+            for i, col in enumerate(self.feature_names):
+                if col in categorical_features:
+                    X[:, i] = self._encode_categorical(col, df[col], is_training=is_training)
+                else:
+                    X[:, i] = df[col].to_numpy()
+            del df
+            if is_training:
+                # partial_fit per chunk keeps the scaler's float64 upcast chunk-sized
+                self.scaler = StandardScaler()
+                for start in range(0, len(X), LEAN_CHUNK_ROWS):
+                    self.scaler.partial_fit(X[start:start + LEAN_CHUNK_ROWS])
+            return self.scaler.transform(X, copy=False)
         
         # Encode categorical features
         for col in categorical_features:
@@ -109,7 +395,6 @@ class TitanicModelTrainer:
                                        else self.label_encoders[col].classes_[0])
                 df[col] = self.label_encoders[col].transform(df[col])
         
-        self.feature_names = numerical_features + categorical_features
         X = df[self.feature_names]
         
         if is_training:
@@ -119,90 +404,67 @@ class TitanicModelTrainer:
         
         return X
     
+    def preprocessing_state(self):
+        """Everything prepare_data learns from the training set"""
+        return {
+            'scaler': self.scaler,
+            'label_encoders': self.label_encoders,
+            'feature_names': self.feature_names,
+            'fill_values': self.fill_values,
+            'fare_bin_edges': self.fare_bin_edges
+        }
+    
+    def restore_preprocessing(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+    
     def train_models(self, X_train, y_train, X_test, y_test):
         """Train multiple models with hyperparameter tuning"""
         print("🚀 Training Advanced ML Models...\n")
+        for name in MODEL_PARAMS:
+            self.models[name] = self.fit_model(name, X_train, y_train)
+        self.evaluate_models(X_test, y_test)
+    
+    def fit_model(self, name, X_train, y_train):
+        """Fit one model from MODEL_PARAMS (the ensemble refits clones of its members)"""
+        params = MODEL_PARAMS[name]
+        if name == 'logistic_regression':
+            print("1️⃣  Training Logistic Regression...")
+            lr = GridSearchCV(LogisticRegression(random_state=42), params, cv=5, scoring='accuracy', n_jobs=-1)
+            with shared_arrays(X_train, y_train) as (X_shared, y_shared):
+                lr.fit(X_shared, y_shared)
+            print(f"   ✅ Best params: {lr.best_params_}")
+            return lr.best_estimator_
         
-        # 1. Logistic Regression
-        print("1️⃣  Training Logistic Regression...")
-        lr_params = {
-            'C': [0.01, 0.1, 1, 10],
-            'penalty': ['l2'],
-            'solver': ['lbfgs'],
-            'max_iter': [1000]
-        }
-        lr = GridSearchCV(LogisticRegression(random_state=42), lr_params, cv=5, scoring='accuracy')
-        lr.fit(X_train, y_train)
-        self.models['logistic_regression'] = lr.best_estimator_
-        print(f"   ✅ Best params: {lr.best_params_}")
-        
-        # 2. Random Forest
-        print("\n2️⃣  Training Random Forest...")
-        rf = RandomForestClassifier(
-            n_estimators=300,
-            max_depth=10,
-            min_samples_split=5,
-            min_samples_leaf=2,
-            random_state=42,
-            n_jobs=-1
-        )
-        rf.fit(X_train, y_train)
-        self.models['random_forest'] = rf
-        print("   ✅ Training complete")
-        
-        # 3. XGBoost
-        print("\n3️⃣  Training XGBoost...")
-        xgb_model = xgb.XGBClassifier(
-            n_estimators=300,
-            learning_rate=0.05,
-            max_depth=6,
-            min_child_weight=3,
-            gamma=0.1,
-            subsample=0.8,
-            colsample_bytree=0.8,
-            objective='binary:logistic',
-            random_state=42,
-            n_jobs=-1
-        )
-        xgb_model.fit(X_train, y_train)
-        self.models['xgboost'] = xgb_model
-        print("   ✅ Training complete")
-        
-        # 4. LightGBM
-        print("\n4️⃣  Training LightGBM...")
-        lgb_model = lgb.LGBMClassifier(
-            n_estimators=300,
-            learning_rate=0.05,
-            max_depth=6,
-            num_leaves=31,
-            min_child_samples=20,
-            subsample=0.8,
-            colsample_bytree=0.8,
-            random_state=42,
-            n_jobs=-1,
-            verbose=-1
-        )
-        lgb_model.fit(X_train, y_train)
-        self.models['lightgbm'] = lgb_model
-        print("   ✅ Training complete")
+        if name == 'random_forest':
+            print("\n2️⃣  Training Random Forest...")
+            model = RandomForestClassifier(**params)
+        elif name == 'xgboost':
+            print("\n3️⃣  Training XGBoost...")
+            model = xgb.XGBClassifier(**params)
+        elif name == 'lightgbm':
+            print("\n4️⃣  Training LightGBM...")
+            model = lgb.LGBMClassifier(**params)
+        elif name == 'ensemble':
+            print("\n5️⃣  Training Stacked Ensemble...")
+            model = VotingClassifier(
+                estimators=[(short, self.models[member]) for short, member in params['members']],
+                voting=params['voting'],
+                n_jobs=params['n_jobs']
+            )
+        else:
+            raise ValueError(f"Unknown model '{name}'")
         
-        # 5. Stacked Ensemble
-        print("\n5️⃣  Training Stacked Ensemble...")
-        ensemble = VotingClassifier(
-            estimators=[
-                ('lr', self.models['logistic_regression']),
-                ('rf', self.models['random_forest']),
-                ('xgb', self.models['xgboost']),
-                ('lgb', self.models['lightgbm'])
-            ],
-            voting='soft',
-            n_jobs=-1
-        )
-        ensemble.fit(X_train, y_train)
-        self.models['ensemble'] = ensemble
+        if name == 'ensemble':
+            with shared_arrays(X_train, y_train) as (X_shared, y_shared):
+                model.fit(X_shared, y_shared)
+        else:
+            model.fit(X_train, y_train)
         print("   ✅ Training complete")
-        
-        # Evaluate all models
+        return model
+    
+    def evaluate_models(self, X_test, y_test):
+        """Print held-out metrics for every model and pick the most accurate"""
         print("\n" + "="*60)
         print("📊 MODEL PERFORMANCE COMPARISON")
         print("="*60)
@@ -235,60 +497,301 @@ class TitanicModelTrainer:
         print(f"🎯 Best Accuracy: {best_accuracy:.4f}")
         print("="*60)
     
-    def generate_visualizations(self, X_test, y_test):
-        """Generate model visualizations"""
-        print("\n📈 Generating Visualizations...")
+    def fit_streaming_statistics(self, chunks):
+        """
+        First out-of-core pass: fill values and fare bin edges
+        
+        Medians and fare quantiles come from a bounded uniform sample
+        (exact up to OUT_OF_CORE_SAMPLE_ROWS rows). Returns the row count.
+        """
+        age, fare = _ValueSample(seed=42), _ValueSample(seed=43)
+        embarked_counts = {}
+        rows = 0
+        for chunk in chunks:
+            age.add(chunk['Age'].to_numpy(dtype=np.float64, na_value=np.nan))
+            fare.add(chunk['Fare'].to_numpy(dtype=np.float64, na_value=np.nan))
+            for value, count in chunk['Embarked'].value_counts().items():
+                embarked_counts[value] = embarked_counts.get(value, 0) + count
+            rows += len(chunk)
+        
+        fares = fare.values()
+        self.fill_values = {
+            'Age': float(np.nanmedian(age.values())),
+            'Fare': float(np.nanmedian(fares)),
+            'Embarked': max(embarked_counts, key=embarked_counts.get)
+        }
+        fares[np.isnan(fares)] = self.fill_values['Fare']
+        _, self.fare_bin_edges = pd.qcut(fares, q=5, retbins=True)
+        return rows
+    
+    def write_feature_matrices(self, chunks, rows, output_dir=OUT_OF_CORE_DIR, test_size=0.2):
+        """
+        Second out-of-core pass: featurize chunks into memory-mapped matrices
         
-        # Create output directory
-        output_dir = Path('models/visualizations')
+        Rows go to train or test .npy memmaps by a seeded random split.
+        Categorical columns are encoded against a growing vocabulary, then
+        remapped to LabelEncoder order and scaled in place chunk by chunk.
+        Returns (X_train, y_train, X_test, y_test) as memmaps.
+        """
+        output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
+        self.feature_names = NUMERICAL_FEATURES + CATEGORICAL_FEATURES
+        n_features = len(self.feature_names)
         
-        y_pred = self.best_model.predict(X_test)
+        is_test = np.random.default_rng(42).random(rows) < test_size
+        n_test = int(is_test.sum())
+        open_memmap = np.lib.format.open_memmap
+        X_train = open_memmap(output_dir / 'X_train.npy', mode='w+', dtype=np.float32, shape=(rows - n_test, n_features))
+        X_test = open_memmap(output_dir / 'X_test.npy', mode='w+', dtype=np.float32, shape=(n_test, n_features))
+        y_train = open_memmap(output_dir / 'y_train.npy', mode='w+', dtype=np.int8, shape=(rows - n_test,))
+        y_test = open_memmap(output_dir / 'y_test.npy', mode='w+', dtype=np.int8, shape=(n_test,))
+        
+        vocab = {col: {} for col in CATEGORICAL_FEATURES}
+        offset = train_pos = test_pos = 0
+        for chunk in chunks:
+            features = self.create_features(chunk, is_training=False, lean=True)
+            block = np.empty((len(chunk), n_features), dtype=np.float32)
+            for i, col in enumerate(self.feature_names):
+                if col in vocab:
+                    values = pd.Categorical(features[col])
+                    labels = values.categories.astype(str).tolist()
+                    if (values.codes < 0).any():
+                        labels.append('nan')
+                    ids = np.array([vocab[col].setdefault(label, len(vocab[col])) for label in labels])
+                    block[:, i] = ids[values.codes]
+                else:
+                    block[:, i] = features[col].to_numpy()
+            
+            test_rows = is_test[offset:offset + len(chunk)]
+            target = chunk['Survived'].to_numpy(dtype=np.int8)
+            n_chunk_test = int(test_rows.sum())
+            n_chunk_train = len(chunk) - n_chunk_test
+            X_train[train_pos:train_pos + n_chunk_train] = block[~test_rows]
+            y_train[train_pos:train_pos + n_chunk_train] = target[~test_rows]
+            X_test[test_pos:test_pos + n_chunk_test] = block[test_rows]
+            y_test[test_pos:test_pos + n_chunk_test] = target[test_rows]
+            offset += len(chunk)
+            train_pos += n_chunk_train
+            test_pos += n_chunk_test
+        
+        # Vocabulary ids -> LabelEncoder codes, and scaler statistics
+        lookups = {}
+        for col, labels in vocab.items():
+            labels = list(labels)
+            self.label_encoders[col] = LabelEncoder().fit(labels)
+            lookups[self.feature_names.index(col)] = self.label_encoders[col].transform(labels).astype(np.float32)
+        
+        self.scaler = StandardScaler()
+        for X in (X_train, X_test):
+            for start in range(0, len(X), LEAN_CHUNK_ROWS):
+                block = X[start:start + LEAN_CHUNK_ROWS]
+                for i, lookup in lookups.items():
+                    block[:, i] = lookup[block[:, i].astype(np.int64)]
+                self.scaler.partial_fit(block)
+        for X in (X_train, X_test):
+            for start in range(0, len(X), LEAN_CHUNK_ROWS):
+                X[start:start + LEAN_CHUNK_ROWS] = self.scaler.transform(X[start:start + LEAN_CHUNK_ROWS])
+            X.flush()
+        
+        return X_train, y_train, X_test, y_test
+    
+    def train_out_of_core(self, data_path, chunksize=LEAN_CHUNK_ROWS, output_dir=OUT_OF_CORE_DIR):
+        """
+        Train LightGBM on a dataset larger than memory
+        
+        Streams ``data_path`` twice (statistics, then features into memmaps)
+        and fits LightGBM from the memory-mapped training matrix; the other
+        models need the full matrix in memory and are skipped.
+        Returns (X_test, y_test) memmaps for evaluation.
+        """
+        print(f"📥 Pass 1/2: streaming statistics from {data_path}")
+        rows = self.fit_streaming_statistics(iter_dataset_chunks(data_path, chunksize))
+        print(f"   Records: {rows:,}")
+        
+        print(f"🔧 Pass 2/2: writing feature matrices to {output_dir}")
+        X_train, y_train, X_test, y_test = self.write_feature_matrices(
+            iter_dataset_chunks(data_path, chunksize), rows, output_dir
+        )
+        print(f"   Train set: {len(X_train):,} samples")
+        print(f"   Test set:  {len(X_test):,} samples")
+        
+        print("\n🚀 Training LightGBM from the memory-mapped matrix...")
+        lgb_model = lgb.LGBMClassifier(**MODEL_PARAMS['lightgbm'])
+        lgb_model.fit(X_train, np.asarray(y_train))
+        self.models = {'lightgbm': lgb_model}
+        self.best_model = lgb_model
+        self.best_model_name = 'lightgbm'
+        
+        y_proba = np.concatenate([
+            lgb_model.predict_proba(X_test[start:start + chunksize])[:, 1]
+            for start in range(0, len(X_test), chunksize)
+        ]) if len(X_test) else np.empty(0)
+        y_pred = (y_proba >= 0.5).astype(np.int8)
+        y_true = np.asarray(y_test)
+        print(f"  Accuracy:  {accuracy_score(y_true, y_pred):.4f}")
+        print(f"  F1-Score:  {f1_score(y_true, y_pred):.4f}")
+        print(f"  ROC-AUC:   {roc_auc_score(y_true, y_proba):.4f}")
+        return X_test, y_test
+    
+    def compact_random_forest(self, X_val, y_val, tolerance=0.005):
+        """
+        Swap the random forest (and the ensemble's copy) for compact versions
+        
+        Trees are pruned to the smallest prefix within ``tolerance`` of the
+        full forest's accuracy on the held-out set.
+        """
+        print("\n🗜️  Compacting random forest...")
+        compact, report = compact_forest(self.models['random_forest'], X_val, y_val, tolerance)
+        if self.best_model is self.models['random_forest']:
+            self.best_model = compact
+        self.models['random_forest'] = compact
+        
+        ensemble = self.models.get('ensemble')
+        if ensemble is not None:
+            for i, (member_name, _) in enumerate(ensemble.estimators):
+                member = ensemble.estimators_[i]
+                if isinstance(member, RandomForestClassifier):
+                    n_trees = prune_tree_count(member, X_val, y_val, tolerance)
+                    ensemble.estimators_[i] = CompactForestClassifier(member, n_trees).fit()
+                    ensemble.named_estimators_[member_name] = ensemble.estimators_[i]
+                    # The constructor param still references the full forest, which
+                    # would otherwise be pickled along with the compact copy
+                    ensemble.estimators[i] = (member_name, ensemble.estimators_[i])
+        
+        self.forest_compaction = report
+        print(f"   Trees:    {report['trees_before']} -> {report['trees_after']} (tolerance {tolerance})")
+        print(f"   Size:     {report['size_bytes_before'] / 1024:.0f} KB -> {report['size_bytes_after'] / 1024:.0f} KB")
+        print(f"   Load:     {report['load_ms_before']:.1f} ms -> {report['load_ms_after']:.1f} ms")
+        print(f"   Accuracy: {report['accuracy_before']:.4f} -> {report['accuracy_after']:.4f}")
+    
+    def select_deployed_model(self, table, budget_ms=None, batch_size=1):
+        """Choose best_model from a latency table (most accurate, optionally within a p99 budget)"""
+        self.model_selection = select_model(table, budget_ms=budget_ms, batch_size=batch_size)
+        self.best_model_name = self.model_selection['selected']
+        self.best_model = self.models[self.best_model_name]
+        
+        print("\n⏱️  ACCURACY / LATENCY (p99 per batch size, ★ deployed)")
+        for line in format_table(self.model_selection):
+            print(line)
+        print(f"\n🚢 Deployed model: {self.best_model_name.upper().replace('_', ' ')} "
+              f"({self.model_selection['reason']})")
+    
+    def compute_cohort_cube(self, df, X):
+        """Aggregate the training passengers and the best model's predictions into a cohort cube"""
+        print("\n🧊 Building cohort cube...")
+        features = self.create_features(df, is_training=False)
+        self.cohort_cube = build_cohort_cube(features, df['Survived'].values,
+                                             self.best_model.predict_proba(X)[:, 1])
+        print(f"   ✅ {self.cohort_cube['count'].size} cells over {self.cohort_cube['rows']} passengers"
+              f" ({self.cohort_cube['excluded_rows']} outside the bins)")
+    
+    def compute_neighbor_index(self, df, X):
+        """Index the scaled training passengers for similar-passenger lookups"""
+        print("\n🧭 Building similar-passenger index...")
+        self.neighbor_index = build_neighbor_index(X, df)
+        print(f"   ✅ KD-tree over {len(X)} passengers x {X.shape[1]} features")
+    
+    def compute_importances(self, X_test, y_test, n_repeats=IMPORTANCE_REPEATS):
+        """
+        Feature importances for every trained model
+        
+        Permutation importance on (a sample of) the held-out set for all
+        models, parallel across features; plus |coefficients| for linear
+        models and ``feature_importances_`` for tree models. Stored in the
+        artifact, already ranked.
+        """
+        print("\n🔍 Computing feature importances...")
+        if len(X_test) > IMPORTANCE_MAX_ROWS:
+            rows = np.sort(np.random.default_rng(42).choice(len(X_test), IMPORTANCE_MAX_ROWS, replace=False))
+            X_test, y_test = X_test[rows], np.asarray(y_test)[rows]
+        
+        self.importances = {}
+        for name, model in self.models.items():
+            result = permutation_importance(model, X_test, y_test, n_repeats=n_repeats,
+                                            random_state=42, n_jobs=-1)
+            importances = {
+                'permutation': ranked_importances(self.feature_names, result.importances_mean,
+                                                  result.importances_std)
+            }
+            if hasattr(model, 'coef_'):
+                importances['coefficient'] = ranked_importances(self.feature_names, np.abs(model.coef_[0]))
+            if hasattr(model, 'feature_importances_'):
+                importances['native'] = ranked_importances(self.feature_names, model.feature_importances_)
+            self.importances[name] = importances
+        print(f"   ✅ Importances for {len(self.importances)} model(s)")
+    
+    def plot_data(self, X_test, y_test, model_checksum=None):
+        """Confusion matrix, ROC points and importances as JSON-ready data"""
         y_proba = self.best_model.predict_proba(X_test)[:, 1]
+        y_pred = (y_proba >= 0.5).astype(int)
+        y_test = np.asarray(y_test)
         
-        # 1. Confusion Matrix
-        plt.figure(figsize=(8, 6))
-        cm = confusion_matrix(y_test, y_pred)
-        sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', cbar=False)
-        plt.title('Confusion Matrix', fontsize=16, fontweight='bold')
-        plt.ylabel('True Label')
-        plt.xlabel('Predicted Label')
-        plt.tight_layout()
-        plt.savefig(output_dir / 'confusion_matrix.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        # 2. ROC Curve
-        plt.figure(figsize=(8, 6))
+        # ROC resampled onto a fixed FPR grid so the payload stays small
         fpr, tpr, _ = roc_curve(y_test, y_proba)
-        roc_auc = roc_auc_score(y_test, y_proba)
-        plt.plot(fpr, tpr, color='darkorange', lw=2, label=f'ROC curve (AUC = {roc_auc:.2f})')
-        plt.plot([0, 1], [0, 1], color='navy', lw=2, linestyle='--')
-        plt.xlim([0.0, 1.0])
-        plt.ylim([0.0, 1.05])
-        plt.xlabel('False Positive Rate')
-        plt.ylabel('True Positive Rate')
-        plt.title('Receiver Operating Characteristic (ROC) Curve', fontsize=16, fontweight='bold')
-        plt.legend(loc="lower right")
-        plt.grid(alpha=0.3)
-        plt.tight_layout()
-        plt.savefig(output_dir / 'roc_curve.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        # 3. Feature Importance
-        if hasattr(self.best_model, 'feature_importances_'):
-            plt.figure(figsize=(10, 8))
-            importance = self.best_model.feature_importances_
-            indices = np.argsort(importance)[::-1][:15]
-            
-            plt.barh(range(len(indices)), importance[indices], color='steelblue')
-            plt.yticks(range(len(indices)), [self.feature_names[i] for i in indices])
-            plt.xlabel('Feature Importance')
-            plt.title('Top 15 Feature Importance', fontsize=16, fontweight='bold')
-            plt.gca().invert_yaxis()
-            plt.tight_layout()
-            plt.savefig(output_dir / 'feature_importance.png', dpi=300, bbox_inches='tight')
-            plt.close()
+        fpr_grid = np.linspace(0, 1, ROC_POINTS)
+        
+        importances = []
+        available = self.importances.get(self.best_model_name, {})
+        kind = default_importance_kind(available)
+        if kind is not None:
+            importances = [
+                {'name': item['name'], 'importance': round(item['importance'], 6)}
+                for item in available[kind][:15]
+            ]
+        
+        return {
+            'model_checksum': model_checksum,
+            'model_name': self.best_model_name,
+            'confusion_matrix': confusion_matrix(y_test, y_pred).tolist(),
+            'roc': {
+                'fpr': np.round(fpr_grid, 4).tolist(),
+                'tpr': np.round(np.interp(fpr_grid, fpr, tpr), 4).tolist(),
+                'auc': round(float(roc_auc_score(y_test, y_proba)), 4)
+            },
+            'importance_kind': kind,
+            'feature_importance': importances
+        }
+    
+    def generate_visualizations(self, X_test, y_test, mode='sync', model_path='models/titanic_model.pkl',
+                                output_dir=VISUALIZATION_DIR):
+        """
+        Visualization stage, run after the model is saved
+        
+        Always writes ``plot_data.json`` (unless mode is 'skip'); PNGs are
+        rendered in-process ('sync'), one process per plot ('parallel') or
+        by a detached process ('background'). Cached by model checksum.
+        """
+        if mode == 'skip':
+            print("\n📈 Visualizations skipped")
+            return
+        
+        print("\n📈 Generating Visualizations...")
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        data_path = output_dir / 'plot_data.json'
+        checksum = file_hash(model_path)
+        
+        if data_path.exists():
+            with open(data_path) as f:
+                cached = json.load(f)
+            if cached.get('model_checksum') == checksum and all(
+                    (output_dir / name).exists() for name in plot_files(cached)):
+                print(f"   ✅ Unchanged model, reusing visualizations in {output_dir}")
+                return
         
+        data = self.plot_data(X_test, y_test, model_checksum=checksum)
+        with open(data_path, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+        
+        if mode == 'background':
+            subprocess.Popen(
+                [sys.executable, str(Path(__file__).resolve()), '--render-plots', str(data_path)],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True
+            )
+            print(f"   ✅ Plot data saved to {data_path}; rendering PNGs in the background")
+            return
+        
+        render_plots(data, output_dir, parallel=(mode == 'parallel'))
         print(f"   ✅ Visualizations saved to {output_dir}")
     
     def save_model(self, output_path='models/titanic_model.pkl'):
@@ -297,10 +800,18 @@ class TitanicModelTrainer:
         
         model_package = {
             'model': self.best_model,
+            'models': self.models,
             'scaler': self.scaler,
             'label_encoders': self.label_encoders,
             'feature_names': self.feature_names,
-            'model_name': self.best_model_name
+            'model_name': self.best_model_name,
+            'fill_values': self.fill_values,
+            'fare_bin_edges': self.fare_bin_edges,
+            'importances': self.importances,
+            'forest_compaction': self.forest_compaction,
+            'cohort_cube': self.cohort_cube,
+            'neighbor_index': self.neighbor_index,
+            'model_selection': self.model_selection
         }
         
         joblib.dump(model_package, output_path)
@@ -314,47 +825,288 @@ class TitanicModelTrainer:
         self.label_encoders = model_package['label_encoders']
         self.feature_names = model_package['feature_names']
         self.best_model_name = model_package['model_name']
+        # Older artifacts only carry the best model
+        self.models = model_package.get('models') or {self.best_model_name: self.best_model}
+        self.fill_values = model_package.get('fill_values', {})
+        self.fare_bin_edges = model_package.get('fare_bin_edges')
+        self.importances = model_package.get('importances') or {}
+        self.cohort_cube = model_package.get('cohort_cube')
+        self.neighbor_index = model_package.get('neighbor_index')
+        self.model_selection = model_package.get('model_selection')
+        # Artifacts without stored importances still rank tree models natively
+        for name, model in self.models.items():
+            if name not in self.importances and hasattr(model, 'feature_importances_'):
+                self.importances[name] = {
+                    'native': ranked_importances(self.feature_names, model.feature_importances_)
+                }
         print(f"✅ Model loaded from {model_path}")
 
 
+def _render_confusion_matrix(data, output_dir):
+    plt.figure(figsize=(8, 6))
+    sns.heatmap(np.array(data['confusion_matrix']), annot=True, fmt='d', cmap='Blues', cbar=False)
+    plt.title('Confusion Matrix', fontsize=16, fontweight='bold')
+    plt.ylabel('True Label')
+    plt.xlabel('Predicted Label')
+    plt.tight_layout()
+    plt.savefig(Path(output_dir) / 'confusion_matrix.png', dpi=PLOT_DPI, bbox_inches='tight')
+    plt.close()
+
+
+def _render_roc_curve(data, output_dir):
+    roc = data['roc']
+    plt.figure(figsize=(8, 6))
+    plt.plot(roc['fpr'], roc['tpr'], color='darkorange', lw=2, label=f"ROC curve (AUC = {roc['auc']:.2f})")
+    plt.plot([0, 1], [0, 1], color='navy', lw=2, linestyle='--')
+    plt.xlim([0.0, 1.0])
+    plt.ylim([0.0, 1.05])
+    plt.xlabel('False Positive Rate')
+    plt.ylabel('True Positive Rate')
+    plt.title('Receiver Operating Characteristic (ROC) Curve', fontsize=16, fontweight='bold')
+    plt.legend(loc="lower right")
+    plt.grid(alpha=0.3)
+    plt.tight_layout()
+    plt.savefig(Path(output_dir) / 'roc_curve.png', dpi=PLOT_DPI, bbox_inches='tight')
+    plt.close()
+
+
+def _render_feature_importance(data, output_dir):
+    importances = data['feature_importance']
+    plt.figure(figsize=(10, 8))
+    plt.barh(range(len(importances)), [item['importance'] for item in importances], color='steelblue')
+    plt.yticks(range(len(importances)), [item['name'] for item in importances])
+    plt.xlabel(f"Feature Importance ({data['importance_kind']})")
+    plt.title('Top 15 Feature Importance', fontsize=16, fontweight='bold')
+    plt.gca().invert_yaxis()
+    plt.tight_layout()
+    plt.savefig(Path(output_dir) / 'feature_importance.png', dpi=PLOT_DPI, bbox_inches='tight')
+    plt.close()
+
+
+PLOT_RENDERERS = {
+    'confusion_matrix.png': _render_confusion_matrix,
+    'roc_curve.png': _render_roc_curve,
+    'feature_importance.png': _render_feature_importance,
+}
+
+
+def plot_files(data):
+    """PNG files the plot data renders to"""
+    return [name for name in PLOT_RENDERERS
+            if name != 'feature_importance.png' or data['feature_importance']]
+
+
+def render_plots(data, output_dir=VISUALIZATION_DIR, parallel=False):
+    """Render PNGs from plot data, optionally one process per plot"""
+    names = plot_files(data)
+    if parallel:
+        # Processes, not threads: pyplot is not thread-safe
+        with ProcessPoolExecutor(max_workers=len(names)) as pool:
+            list(pool.map(_render_plot, names, [data] * len(names), [output_dir] * len(names)))
+    else:
+        for name in names:
+            _render_plot(name, data, output_dir)
+
+
+def _render_plot(name, data, output_dir):
+    PLOT_RENDERERS[name](data, output_dir)
+
+
+# Possible training data locations, in order
+DATA_PATHS = [
+    'train.csv',                    # Root directory
+    'data/train.csv',               # Data subdirectory
+    'data/titanic.csv',             # Alternative name
+]
+
+
+def find_data_path():
+    """First existing training CSV, or None"""
+    for csv_path in DATA_PATHS:
+        if Path(csv_path).exists():
+            return csv_path
+    return None
+
+
 def download_titanic_data():
     """Load Titanic dataset from multiple possible locations"""
-    # Try multiple possible locations
-    possible_paths = [
-        'train.csv',                    # Root directory
-        'data/train.csv',               # Data subdirectory
-        'data/titanic.csv',             # Alternative name
-        Path('data') / 'titanic.csv',   # Using Path object
-    ]
-    
-    for csv_path in possible_paths:
+    for csv_path in DATA_PATHS:
         if Path(csv_path).exists():
             print(f"✅ Loading data from {csv_path}")
-            df = pd.read_csv(csv_path)
+            # Parsed once with explicit dtypes, then served from the binary cache
+            df = load_dataset(csv_path)
             print(f"   Records: {len(df)} | Features: {len(df.columns)}")
             return df
     
+    # Seaborn copy cached by an earlier run
+    seaborn_cache = CACHE_DIR / ('titanic-seaborn.feather' if HAS_PYARROW else 'titanic-seaborn.pkl')
+    if seaborn_cache.exists():
+        print(f"✅ Loading data from {seaborn_cache}")
+        return read_cache(seaborn_cache)
+    
     # Try to load from seaborn as fallback
     try:
         import seaborn as sns
         df = sns.load_dataset('titanic')
-        data_path = Path('data')
-        data_path.mkdir(exist_ok=True)
-        csv_path = data_path / 'titanic.csv'
-        df.to_csv(csv_path, index=False)
-        print(f"✅ Downloaded Titanic dataset to {csv_path}")
+        write_cache(df, seaborn_cache)
+        print(f"✅ Downloaded Titanic dataset to {seaborn_cache}")
         return df
     except:
         print("❌ Dataset not found! Please ensure train.csv is available.")
         return None
 
 
+def train_with_stage_cache(trainer, df, dataset_hash, args, cache):
+    """
+    In-memory training as cached stages
+    
+    features -> one stage per model -> forest compaction -> latency
+    benchmark (then model selection) -> importances, cohort cube and
+    neighbour index. Each stage is keyed by its
+    configuration, the code that computes it and the keys of the stages
+    it consumes. Returns X and the held-out split for later steps.
+    """
+    libraries = {'numpy': np.__version__, 'pandas': pd.__version__, 'sklearn': sklearn.__version__,
+                 'xgboost': xgb.__version__, 'lightgbm': lgb.__version__}
+    
+    def prepare():
+        print("🔧 Preparing data with advanced feature engineering...")
+        X = trainer.prepare_data(df, is_training=True, lean=args.lean)
+        y = df['Survived'].values
+        split = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+        return {'X': X, 'split': split, 'preprocessing': trainer.preprocessing_state()}
+    
+    features, features_key = cache.run('features', {
+        'dataset': dataset_hash,
+        'lean': args.lean,
+        'split': {'test_size': 0.2, 'random_state': 42},
+        'columns': [NUMERICAL_FEATURES, CATEGORICAL_FEATURES, TITLE_REPLACEMENTS],
+        'code': code_version(TitanicModelTrainer.create_features, TitanicModelTrainer._create_features_lean,
+                             TitanicModelTrainer._encode_categorical, TitanicModelTrainer.prepare_data),
+        'libraries': libraries
+    }, prepare)
+    trainer.restore_preprocessing(features['preprocessing'])
+    X = features['X']
+    X_train, X_test, y_train, y_test = features['split']
+    print(f"   Train set: {X_train.shape[0]} samples")
+    print(f"   Test set:  {X_test.shape[0]} samples")
+    
+    # Models: only those whose parameters (or features) changed are refit
+    print("🚀 Training Advanced ML Models...\n")
+    model_keys = {}
+    for name, params in MODEL_PARAMS.items():
+        inputs = {
+            'features': features_key,
+            'params': params,
+            'libraries': libraries,
+            # CV folds, scoring and ensemble wiring live in fit_model, not MODEL_PARAMS
+            'code': code_version(TitanicModelTrainer.fit_model)
+        }
+        if name == 'ensemble':
+            inputs['members'] = {member: model_keys[member] for _, member in params['members']}
+        trainer.models[name], model_keys[name] = cache.run(
+            f'model_{name}', inputs, lambda name=name: trainer.fit_model(name, X_train, y_train)
+        )
+    trainer.evaluate_models(X_test, y_test)
+    
+    if args.compact_forest:
+        def compact():
+            trainer.compact_random_forest(X_test, y_test, tolerance=args.forest_tolerance)
+            return {name: trainer.models[name] for name in ('random_forest', 'ensemble')}, trainer.forest_compaction
+        (compacted, trainer.forest_compaction), compact_key = cache.run('compact_forest', {
+            'models': {name: model_keys[name] for name in ('random_forest', 'ensemble')},
+            'features': features_key,
+            'tolerance': args.forest_tolerance,
+            'code': code_version(CompactForestClassifier, compact_forest, prune_tree_count,
+                                 TitanicModelTrainer.compact_random_forest)
+        }, compact)
+        trainer.models.update(compacted)
+        trainer.best_model = trainer.models[trainer.best_model_name]
+        model_keys.update({name: f"{compact_key}/{name}" for name in compacted})
+    
+    # Latency depends on the machine, so the benchmark is keyed by its CPU budget too
+    threads = plan_resources()['model_threads']
+    table, _ = cache.run('latency', {
+        'models': model_keys,
+        'features': features_key,
+        'batch_sizes': LATENCY_BATCH_SIZES,
+        'threads': threads,
+        'cpus': available_cpus()['available'],
+        'code': code_version(latency_table)
+    }, lambda: latency_table(trainer.models, X_test, y_test, threads=threads))
+    trainer.select_deployed_model(table, budget_ms=args.latency_budget_ms, batch_size=args.latency_batch_size)
+    
+    trainer.importances, _ = cache.run('importances', {
+        'models': model_keys,
+        'features': features_key,
+        'repeats': IMPORTANCE_REPEATS,
+        'max_rows': IMPORTANCE_MAX_ROWS,
+        'code': code_version(TitanicModelTrainer.compute_importances, ranked_importances)
+    }, lambda: (trainer.compute_importances(X_test, y_test), trainer.importances)[1])
+    
+    trainer.cohort_cube, _ = cache.run('cohort_cube', {
+        'model': model_keys[trainer.best_model_name],
+        'features': features_key,
+        'code': code_version(TitanicModelTrainer.compute_cohort_cube, build_cohort_cube)
+    }, lambda: (trainer.compute_cohort_cube(df, X), trainer.cohort_cube)[1])
+    
+    trainer.neighbor_index, _ = cache.run('neighbor_index', {
+        'features': features_key,
+        'code': code_version(TitanicModelTrainer.compute_neighbor_index, build_neighbor_index)
+    }, lambda: (trainer.compute_neighbor_index(df, X), trainer.neighbor_index)[1])
+    
+    return X, X_test, y_test
+
+
 def main():
     """Main training pipeline"""
+    parser = argparse.ArgumentParser(description="Train Titanic survival models")
+    parser.add_argument('--lean', action='store_true',
+                        help="memory-lean feature engineering (categorical/narrow dtypes, float32)")
+    parser.add_argument('--out-of-core', action='store_true',
+                        help="stream the data in chunks and train LightGBM from memory-mapped features")
+    parser.add_argument('--chunksize', type=int, default=LEAN_CHUNK_ROWS,
+                        help="rows per chunk for --out-of-core")
+    parser.add_argument('--compact-forest', action='store_true',
+                        help="prune and flatten the random forest into a compact float32 representation")
+    parser.add_argument('--forest-tolerance', type=float, default=0.005,
+                        help="held-out accuracy the pruned forest may lose (default 0.005)")
+    parser.add_argument('--latency-budget-ms', type=float, default=None,
+                        help="deploy the most accurate model whose p99 latency fits this budget "
+                             "(default: the most accurate model)")
+    parser.add_argument('--latency-batch-size', type=int, choices=LATENCY_BATCH_SIZES, default=1,
+                        help="batch size the latency budget applies to (default 1)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="recompute every pipeline stage instead of reusing cached outputs")
+    parser.add_argument('--visualize', choices=VISUALIZATION_MODES, default='sync',
+                        help="render plots in-process, in parallel, in a background process, or skip them")
+    parser.add_argument('--render-plots', metavar='PLOT_DATA_JSON',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.render_plots:
+        # Background visualization stage started by generate_visualizations
+        with open(args.render_plots) as f:
+            render_plots(json.load(f), Path(args.render_plots).parent)
+        return
+    
     print("\n" + "="*60)
     print("🚢 TITANIC SURVIVAL PREDICTION MODEL TRAINING")
     print("="*60 + "\n")
     
+    if args.out_of_core:
+        data_path = find_data_path()
+        if data_path is None:
+            print("❌ Dataset not found! Out-of-core training needs a CSV (see DATA_PATHS).")
+            return
+        trainer = TitanicModelTrainer()
+        X_test, y_test = trainer.train_out_of_core(data_path, chunksize=args.chunksize)
+        trainer.compute_importances(X_test, y_test)
+        trainer.save_model()
+        trainer.generate_visualizations(X_test, y_test, mode=args.visualize)
+        print("\n✨ Training complete! Ready for deployment.\n")
+        return
+    
     # Load data
     df = download_titanic_data()
     if df is None:
@@ -365,28 +1117,20 @@ def main():
     
     # Initialize trainer
     trainer = TitanicModelTrainer()
+    data_path = find_data_path()
+    dataset_hash = file_hash(data_path) if data_path else frame_hash(df)
+    cache = StageCache(enabled=not args.no_cache)
     
-    # Prepare data
-    print("🔧 Preparing data with advanced feature engineering...")
-    X = trainer.prepare_data(df, is_training=True)
-    y = df['Survived'].values
-    
-    # Split data
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
-    )
-    print(f"   Train set: {X_train.shape[0]} samples")
-    print(f"   Test set:  {X_test.shape[0]} samples")
-    
-    # Train models
-    trainer.train_models(X_train, y_train, X_test, y_test)
-    
-    # Generate visualizations
-    trainer.generate_visualizations(X_test, y_test)
+    # Features, models and derived artifacts; unchanged stages come from the cache
+    X, X_test, y_test = train_with_stage_cache(trainer, df, dataset_hash, args, cache)
     
     # Save model
     trainer.save_model()
     
+    # Generate visualizations (after saving, so they never delay the artifact)
+    trainer.generate_visualizations(X_test, y_test, mode=args.visualize)
+    cache.print_summary()
+    
     print("\n✨ Training complete! Ready for deployment.\n")
 
 
@@ -32,6 +32,8 @@ except ImportError:
     HAS_JOBLIB = False
     print("⚠️  Joblib not available - model won't be saved")
 
+from shared_dataset import shared_arrays
+
 
 class TitanicModelTrainerMinimal:
     """Minimal version without visualization dependencies"""
@@ -84,40 +86,42 @@ class TitanicModelTrainerMinimal:
         """Train multiple models"""
         print("\n🔄 Training models...")
         
-        # Logistic Regression
-        print("  Training Logistic Regression...")
-        lr_params = {'C': [0.001, 0.01, 0.1, 1, 10], 'max_iter': [1000]}
-        lr = GridSearchCV(LogisticRegression(random_state=42), lr_params, cv=5, n_jobs=-1)
-        lr.fit(X_train, y_train)
-        self.models['Logistic Regression'] = lr.best_estimator_
-        
-        # Random Forest
-        print("  Training Random Forest...")
-        rf_params = {'n_estimators': [100, 200], 'max_depth': [5, 10, None],
-                    'min_samples_split': [2, 5]}
-        rf = GridSearchCV(RandomForestClassifier(random_state=42), rf_params, cv=5, n_jobs=-1)
-        rf.fit(X_train, y_train)
-        self.models['Random Forest'] = rf.best_estimator_
-        
-        # XGBoost
-        if HAS_XGBOOST:
-            print("  Training XGBoost...")
-            xgb_params = {'n_estimators': [100, 200], 'max_depth': [3, 5, 7],
-                         'learning_rate': [0.01, 0.1]}
-            xgb_model = GridSearchCV(xgb.XGBClassifier(random_state=42, eval_metric='logloss'),
-                                    xgb_params, cv=5, n_jobs=-1)
-            xgb_model.fit(X_train, y_train)
-            self.models['XGBoost'] = xgb_model.best_estimator_
-        
-        # LightGBM
-        if HAS_LIGHTGBM:
-            print("  Training LightGBM...")
-            lgb_params = {'n_estimators': [100, 200], 'max_depth': [5, 10],
-                         'learning_rate': [0.01, 0.1]}
-            lgb_model = GridSearchCV(lgb.LGBMClassifier(random_state=42, verbose=-1),
-                                    lgb_params, cv=5, n_jobs=-1)
-            lgb_model.fit(X_train, y_train)
-            self.models['LightGBM'] = lgb_model.best_estimator_
+        # CV workers attach to one memory-mapped copy of the training data
+        with shared_arrays(X_train, y_train) as (X_train, y_train):
+            # Logistic Regression
+            print("  Training Logistic Regression...")
+            lr_params = {'C': [0.001, 0.01, 0.1, 1, 10], 'max_iter': [1000]}
+            lr = GridSearchCV(LogisticRegression(random_state=42), lr_params, cv=5, n_jobs=-1)
+            lr.fit(X_train, y_train)
+            self.models['Logistic Regression'] = lr.best_estimator_
+        
+            # Random Forest
+            print("  Training Random Forest...")
+            rf_params = {'n_estimators': [100, 200], 'max_depth': [5, 10, None],
+                        'min_samples_split': [2, 5]}
+            rf = GridSearchCV(RandomForestClassifier(random_state=42), rf_params, cv=5, n_jobs=-1)
+            rf.fit(X_train, y_train)
+            self.models['Random Forest'] = rf.best_estimator_
+        
+            # XGBoost
+            if HAS_XGBOOST:
+                print("  Training XGBoost...")
+                xgb_params = {'n_estimators': [100, 200], 'max_depth': [3, 5, 7],
+                             'learning_rate': [0.01, 0.1]}
+                xgb_model = GridSearchCV(xgb.XGBClassifier(random_state=42, eval_metric='logloss'),
+                                        xgb_params, cv=5, n_jobs=-1)
+                xgb_model.fit(X_train, y_train)
+                self.models['XGBoost'] = xgb_model.best_estimator_
+        
+            # LightGBM
+            if HAS_LIGHTGBM:
+                print("  Training LightGBM...")
+                lgb_params = {'n_estimators': [100, 200], 'max_depth': [5, 10],
+                             'learning_rate': [0.01, 0.1]}
+                lgb_model = GridSearchCV(lgb.LGBMClassifier(random_state=42, verbose=-1),
+                                        lgb_params, cv=5, n_jobs=-1)
+                lgb_model.fit(X_train, y_train)
+                self.models['LightGBM'] = lgb_model.best_estimator_
     
     def evaluate_models(self, X_test, y_test):
         """Evaluate all models"""